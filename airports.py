@@ -0,0 +1,175 @@
+import csv
+import math
+import mmap
+import os
+import struct
+from typing import NamedTuple, Optional, Set
+
+from log import get_logger
+
+log = get_logger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CSV_PATH = os.path.join(DATA_DIR, "airports.csv")
+BIN_PATH = os.path.join(DATA_DIR, "airports.bin")
+
+# Layout of airports.bin, all little-endian:
+#   header   magic, version, record count, hash slot count
+#   records  fixed-size: ICAO, IATA, FAA, name offset/length, latitude, longitude, elevation
+#   slots    open-addressed hash table: 4-byte key, record index + 1 (0 marks an empty slot)
+#   names    UTF-8 airport names, addressed by the records
+_MAGIC = b"APT1"
+_HEADER = struct.Struct("<4sII")
+_RECORD = struct.Struct("<4s3s4sIHffh")
+_SLOT = struct.Struct("<4sI")
+
+
+class Airport(NamedTuple):
+    icao: str
+    iata: str
+    faa: str
+    name: str
+    latitude: float
+    longitude: float
+    elevation_ft: int
+
+
+def _hash(key: bytes) -> int:
+    """32-bit FNV-1a."""
+    value = 0x811C9DC5
+    for byte in key:
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+
+def compile_airports(csv_path: str = CSV_PATH, bin_path: str = BIN_PATH) -> int:
+    """Builds the binary lookup table from the CSV. Returns the number of airports written."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    records, names, keys = [], bytearray(), {}
+    for index, row in enumerate(rows):
+        name = row["name"].encode("utf-8")[:65535]
+        records.append(_RECORD.pack(
+            row["icao"].encode(), row["iata"].encode(), row["faa"].encode(), len(names), len(name),
+            float(row["latitude"]), float(row["longitude"]), round(float(row["elevation_ft"] or 0))
+        ))
+        names += name
+
+    # ICAO codes win over FAA identifiers, which win over IATA codes, when the same string is used twice
+    for column in ("icao", "faa", "iata"):
+        for index, row in enumerate(rows):
+            key = row[column].upper()
+            if key and len(key) <= 4:
+                keys.setdefault(key.encode(), index)
+
+    slot_count = 1 << (len(keys) * 2 - 1).bit_length()
+    slots = [None] * slot_count
+    for key, index in keys.items():
+        slot = _hash(key) & (slot_count - 1)
+        while slots[slot] is not None:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = (key, index + 1)
+
+    temp_path = bin_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(records), slot_count))
+        f.write(b"".join(records))
+        f.write(b"".join(_SLOT.pack(*slot) if slot else _SLOT.pack(b"", 0) for slot in slots))
+        f.write(names)
+    os.replace(temp_path, bin_path)
+    return len(records)
+
+
+class AirportDatabase:
+    """Read-only airport lookups over a memory-mapped airports.bin; nothing is parsed until it is asked for."""
+    def __init__(self, bin_path: str = BIN_PATH):
+        with open(bin_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._slot_count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{bin_path} is not an airport table")
+        self._records_at = _HEADER.size
+        self._slots_at = self._records_at + self.count * _RECORD.size
+        self._names_at = self._slots_at + self._slot_count * _SLOT.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, index: int) -> Airport:
+        icao, iata, faa, name_offset, name_length, latitude, longitude, elevation = _RECORD.unpack_from(
+            self._map, self._records_at + index * _RECORD.size
+        )
+        start = self._names_at + name_offset
+        return Airport(
+            icao.rstrip(b"\0").decode(), iata.rstrip(b"\0").decode(), faa.rstrip(b"\0").decode(),
+            self._map[start:start + name_length].decode("utf-8"), latitude, longitude, elevation
+        )
+
+    def lookup(self, identifier: str) -> Optional[Airport]:
+        """Finds an airport by ICAO, FAA or IATA identifier (in that order of preference)."""
+        key = identifier.strip().upper().encode()
+        if not key or len(key) > 4:
+            return None
+        padded = key.ljust(4, b"\0")
+        mask = self._slot_count - 1
+        slot = _hash(key) & mask
+        while True:
+            slot_key, index = _SLOT.unpack_from(self._map, self._slots_at + slot * _SLOT.size)
+            if index == 0:
+                return None
+            if slot_key == padded:
+                return self._record(index - 1)
+            slot = (slot + 1) & mask
+
+    def normalize(self, identifier: str) -> str:
+        """The ICAO code for any known identifier (LAX -> KLAX); unknown identifiers come back upper-cased."""
+        airport = self.lookup(identifier)
+        return airport.icao if airport and airport.icao else identifier.strip().upper()
+
+    def aliases(self, identifier: str) -> Set[str]:
+        """The identifiers a known airport's controllers use in callsigns: its ICAO code and FAA LID (KJFK -> {KJFK, JFK}).
+
+        IATA codes only resolve an airport, they never name its controllers: SCO is Aktau's IATA code but Scottish
+        Control's callsign, and FRA is Frankfurt's but not the prefix of its controllers."""
+        identifier = identifier.strip().upper()
+        airport = self.lookup(identifier)
+        if airport is None:
+            return {identifier}
+        return {code for code in (airport.icao, airport.faa) if code}
+
+    def close(self):
+        self._map.close()
+
+
+def distance_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in nautical miles."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 3440.065 * math.asin(math.sqrt(a))
+
+
+_database: Optional[AirportDatabase] = None
+
+
+def load(csv_path: str = CSV_PATH, bin_path: str = BIN_PATH) -> AirportDatabase:
+    """Maps the airport table, compiling it first if it is missing or older than the bundled CSV."""
+    global _database
+    if not os.path.exists(bin_path) or os.path.getmtime(bin_path) < os.path.getmtime(csv_path):
+        count = compile_airports(csv_path, bin_path)
+        log.info("Compiled the airport table", airports=count, path=bin_path)
+    _database = AirportDatabase(bin_path)
+    return _database
+
+
+def database() -> Optional[AirportDatabase]:
+    """The loaded airport table, or None if load() has not run (lookups then fall back to the raw identifier)."""
+    return _database
+
+
+def normalize(identifier: str) -> str:
+    return _database.normalize(identifier) if _database else identifier.strip().upper()
+
+
+def lookup(identifier: str) -> Optional[Airport]:
+    return _database.lookup(identifier) if _database else None
@@ -0,0 +1,166 @@
+"""A read-only JSON API over the bot's current VATSIM snapshot, for local tools and dashboards.
+
+    GET /status                  snapshot version and counts
+    GET /airports/{icao}         controllers, ATIS, departures and arrivals (ICAO, FAA or IATA code)
+    GET /controllers/{callsign}  an online controller and its transceivers
+    GET /pilots/{cid}            an online pilot
+    GET /search?q=               pilots and controllers by name, callsign or CID, as /lookup search
+
+Every consumer is served from the snapshot the bot has already decoded and indexed, so polling this
+doesn't add feed downloads. Each body is rendered once per snapshot version; responses carry that version
+as their ETag (If-None-Match gets a 304) and may be cached until the feed's next update.
+"""
+import email.utils
+import json
+from typing import Callable, Optional
+
+from aiohttp import web
+
+import airports
+import metrics
+from cache import TTLCache
+from cogs.airport_cog import airport_traffic
+from vatsim import Snapshot, VatsimFeed
+
+# The feed updates this often; an older snapshot is refreshed before answering
+FEED_INTERVAL = 15
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 50
+SEARCH_RESULTS = 10
+
+
+def snapshot_etag(snapshot: Snapshot) -> str:
+    return f'"{snapshot.version or snapshot.fetched_at}"'
+
+
+def json_response(payload: dict, status: int = 200, headers: Optional[dict] = None) -> web.Response:
+    return web.Response(body=json.dumps(payload).encode(), status=status, content_type="application/json", headers=headers)
+
+
+class SnapshotAPI:
+    """Route handlers over a VatsimFeed; `routes()` lists them for an aiohttp application."""
+    def __init__(self, feed: VatsimFeed):
+        self.feed = feed
+        # (path and query, snapshot version) -> (status, body). Old versions are never asked for again and age out.
+        self.bodies = TTLCache(maxsize=1024, ttl=60)
+
+    def routes(self) -> list:
+        return [
+            web.get("/status", self.status),
+            web.get("/airports/{icao}", self.airport),
+            web.get("/controllers/{callsign}", self.controller),
+            web.get("/pilots/{cid}", self.pilot),
+            web.get("/search", self.search),
+        ]
+
+    async def current_snapshot(self) -> Optional[Snapshot]:
+        snapshot = self.feed.snapshot
+        if snapshot is None or snapshot.age > FEED_INTERVAL:
+            # Shares any download already in flight, and falls back to a stale snapshot if the feed is down
+            snapshot = await self.feed.fetch()
+        return snapshot
+
+    async def respond(self, request: web.Request, render: Callable[[Snapshot], tuple]) -> web.Response:
+        """Answers from the current snapshot; `render(snapshot)` returns (status, payload) and runs once per version."""
+        snapshot = await self.current_snapshot()
+        if snapshot is None:
+            return json_response({"error": "The VATSIM feed is unavailable."}, 503, {"Retry-After": str(FEED_INTERVAL)})
+
+        key = (request.path_qs, snapshot.version or snapshot.fetched_at)
+        cached = self.bodies.get(key)
+        if cached is not None:
+            metrics.CACHE_REQUESTS.inc(cache="api", result="hit")
+        else:
+            metrics.CACHE_REQUESTS.inc(cache="api", result="miss")
+            status, payload = render(snapshot)
+            cached = (status, json.dumps(payload).encode())
+            self.bodies.set(key, cached)
+        status, body = cached
+
+        headers = {
+            "Cache-Control": f"public, max-age={max(0, int(FEED_INTERVAL - snapshot.age))}",
+            "Last-Modified": email.utils.formatdate(snapshot.fetched_at, usegmt=True),
+            "X-Snapshot-Age": str(int(snapshot.age)),
+        }
+        if status == 200:
+            etag = snapshot_etag(snapshot)
+            headers["ETag"] = etag
+            if_none_match = request.headers.get("If-None-Match", "")
+            if if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+                return web.Response(status=304, headers=headers)
+        return web.Response(body=body, status=status, content_type="application/json", headers=headers)
+
+    async def status(self, request: web.Request) -> web.Response:
+        def render(snapshot: Snapshot) -> tuple:
+            return 200, {
+                "version": snapshot.version,
+                "fetched_at": snapshot.fetched_at,
+                "pilots": len(snapshot.pilots),
+                "controllers": len(snapshot.controllers),
+                "atis": len(snapshot.atis),
+            }
+        return await self.respond(request, render)
+
+    async def airport(self, request: web.Request) -> web.Response:
+        # Flight plans use the ICAO code, so LAX and KLAX answer the same
+        icao = airports.normalize(request.match_info["icao"])
+
+        def render(snapshot: Snapshot) -> tuple:
+            controllers, atis_list, departures, arrivals = airport_traffic(icao, snapshot)
+            airport = airports.lookup(icao)
+            if airport is None and not any([controllers, atis_list, departures, arrivals]):
+                return 404, {"error": f"Unknown airport {icao}."}
+            return 200, {
+                "icao": icao,
+                "name": airport.name if airport else None,
+                "controllers": controllers,
+                "atis": atis_list,
+                "departures": departures,
+                "arrivals": arrivals,
+            }
+        return await self.respond(request, render)
+
+    async def controller(self, request: web.Request) -> web.Response:
+        callsign = request.match_info["callsign"].upper()
+
+        def render(snapshot: Snapshot) -> tuple:
+            controller = snapshot.controllers_by_callsign.get(callsign)
+            if controller is None:
+                return 404, {"error": f"{callsign} is not online."}
+            return 200, {**controller, "transceivers": snapshot.transceivers_by_callsign.get(callsign, [])}
+        return await self.respond(request, render)
+
+    async def pilot(self, request: web.Request) -> web.Response:
+        cid = request.match_info["cid"]
+        if not cid.isdigit():
+            return json_response({"error": "A CID is numerical."}, 400)
+
+        def render(snapshot: Snapshot) -> tuple:
+            pilot = snapshot.pilots_by_cid.get(cid)
+            if pilot is None:
+                return 404, {"error": f"No pilot with CID {cid} is online."}
+            return 200, pilot
+        return await self.respond(request, render)
+
+    async def search(self, request: web.Request) -> web.Response:
+        query = request.query.get("q", "").strip()
+        if not MIN_QUERY_LENGTH <= len(query) <= MAX_QUERY_LENGTH:
+            return json_response({"error": f"q must be {MIN_QUERY_LENGTH} to {MAX_QUERY_LENGTH} characters."}, 400)
+
+        def render(snapshot: Snapshot) -> tuple:
+            results = []
+            for callsign, matched, score in snapshot.search_index.search(query, SEARCH_RESULTS):
+                kind = "pilot" if callsign in snapshot.pilots_by_callsign else "controller"
+                results.append({"callsign": callsign, "type": kind, "matched": matched, "score": round(score, 3)})
+            return 200, {"query": query, "results": results}
+        return await self.respond(request, render)
+
+
+async def start_server(feed: VatsimFeed, host: str, port: int) -> web.AppRunner:
+    """Serves the API on host:port and returns the runner so it can be cleaned up."""
+    app = web.Application()
+    app.router.add_routes(SnapshotAPI(feed).routes())
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,118 @@
+"""Compares the installed JSON decoders on vatsim-data.json payloads.
+
+Usage:
+    python -m benchmarks.bench_decode --snapshots recordings --repeat 20
+    python -m benchmarks.bench_decode --pilots 20000 --controllers 2000 --output decode.json
+
+Recorded payloads (from `benchmarks.feed_server record`) are used as-is; without --snapshots a
+synthetic one is generated. Reports median decode time and the memory the decoded feed keeps alive.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import decoding
+
+from . import synthetic
+from .run_loops import git_commit
+
+
+def load_payloads(args) -> list:
+    if args.snapshots:
+        paths = sorted(glob.glob(os.path.join(args.snapshots, "*.json")))
+        if not paths:
+            raise SystemExit(f"No *.json snapshots found in {args.snapshots}")
+        payloads = []
+        for path in paths[:args.limit]:
+            with open(path, "rb") as f:
+                payloads.append(f.read())
+        return payloads
+    print(f"Generating snapshot: {args.pilots} pilots, {args.controllers} controllers...")
+    data = synthetic.generate_snapshot(args.pilots, args.controllers, args.airports, args.seed)
+    return [json.dumps(data).encode()]
+
+
+def measure(decode, payloads: list, repeat: int) -> dict:
+    walls = []
+    for _ in range(repeat):
+        for payload in payloads:
+            started = time.perf_counter()
+            decode(payload)
+            walls.append(time.perf_counter() - started)
+
+    # Memory for one decode of the largest payload: the peak while decoding and what the result holds on to
+    payload = max(payloads, key=len)
+    tracemalloc.start()
+    decoded = decode(payload)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+
+    return {
+        "wall_s": {"median": statistics.median(walls), "min": min(walls), "max": max(walls)},
+        "mb_per_s": len(payload) / statistics.median(walls) / 1e6,
+        "alloc": {"peak_bytes": peak, "retained_bytes": retained},
+    }
+
+
+def run(args) -> dict:
+    payloads = load_payloads(args)
+    decoders = decoding.available()
+    results = {}
+    for name in args.decoders or decoders:
+        if name not in decoders:
+            print(f"Skipping {name}: not installed")
+            continue
+        print(f"Decoding with {name} x{args.repeat}...")
+        results[name] = measure(decoders[name], payloads, args.repeat)
+
+    print(f"\n{'decoder':<12}{'median ms':>12}{'MB/s':>10}{'peak KiB':>12}{'retained KiB':>14}")
+    for name, result in results.items():
+        print(f"{name:<12}{result['wall_s']['median'] * 1000:>12.1f}{result['mb_per_s']:>10.0f}"
+              f"{result['alloc']['peak_bytes'] / 1024:>12.0f}{result['alloc']['retained_bytes'] / 1024:>14.0f}")
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "payloads": len(payloads),
+            "payload_bytes": max(len(payload) for payload in payloads),
+            "params": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "decoders": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the JSON decoders on VATSIM feed payloads.")
+    parser.add_argument("--snapshots", help="Directory of recorded *.json feed payloads.")
+    parser.add_argument("--limit", type=int, default=10, help="Use at most this many recorded payloads.")
+    parser.add_argument("--pilots", type=int, default=20000)
+    parser.add_argument("--controllers", type=int, default=2000)
+    parser.add_argument("--airports", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--decoders", nargs="+", choices=list(decoding.DECODERS), help="Defaults to every installed decoder.")
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compares two benchmark result files, e.g. from the parent commit and the current one.
+
+Usage:
+    python -m benchmarks.compare base.json head.json [--threshold 0.10]
+
+Exits with status 1 if any loop's median wall time regressed by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(base: dict, head: dict, threshold: float) -> bool:
+    regressed = False
+    print(f"{'loop':<28}{'base ms':>12}{'head ms':>12}{'change':>10}{'peak KiB':>12}")
+    for name, head_result in head["loops"].items():
+        base_result = base["loops"].get(name)
+        head_ms = head_result["wall_s"]["median"] * 1000
+        peak_kib = head_result["alloc"]["peak_bytes"] / 1024
+        if not base_result:
+            print(f"{name:<28}{'-':>12}{head_ms:>12.1f}{'new':>10}{peak_kib:>12.0f}")
+            continue
+        base_ms = base_result["wall_s"]["median"] * 1000
+        change = (head_ms - base_ms) / base_ms if base_ms else 0.0
+        flag = " !" if change > threshold else ""
+        regressed = regressed or change > threshold
+        print(f"{name:<28}{base_ms:>12.1f}{head_ms:>12.1f}{change:>+9.1%}{peak_kib:>12.0f}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two run_loops result files.")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown before failing.")
+    args = parser.parse_args(argv)
+
+    base, head = load(args.base), load(args.head)
+    print(f"base: {base['meta'].get('commit')}  head: {head['meta'].get('commit')}")
+    if compare(base, head, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""An in-process fake of the Discord REST endpoints the bot uses, with realistic rate limits.
+
+discord.py's own HTTP client (and its rate limiter) talks to the emulator over localhost, so
+loops driven against it pay for 429s, bucket exhaustion and retries exactly like production:
+
+    emulator = DiscordEmulator()
+    await emulator.start()
+    client = await emulator.login()
+    channel = client.get_partial_messageable(1234)
+    await channel.send("hello")
+    print(emulator.stats())
+"""
+import asyncio
+import datetime
+import itertools
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+import discord
+from aiohttp import web
+
+API_PREFIX = "/api/v10"
+
+@dataclass
+class BucketRule:
+    limit: int
+    period: float
+
+
+# Per-channel buckets for the routes the bot calls, matching Discord's published defaults
+DEFAULT_BUCKETS = {
+    "send": BucketRule(5, 5.0),
+    "edit": BucketRule(5, 5.0),
+    "delete": BucketRule(5, 1.0),
+    "fetch": BucketRule(50, 1.0),
+}
+GLOBAL_LIMIT = BucketRule(50, 1.0)
+
+
+class _Window:
+    """A fixed rate-limit window: `limit` requests, then 429 until `reset_at`."""
+    def __init__(self, rule: BucketRule):
+        self.rule = rule
+        self.remaining = rule.limit
+        self.reset_at = 0.0
+
+    def take(self, now: float) -> bool:
+        if now >= self.reset_at:
+            self.remaining = self.rule.limit
+            self.reset_at = now + self.rule.period
+        if self.remaining == 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class DiscordEmulator:
+    """Serves send/edit/delete/fetch message plus the login call, tracking calls and 429s by route."""
+    def __init__(self, buckets: dict = None, global_limit: BucketRule = GLOBAL_LIMIT, latency: float = 0.0):
+        self.buckets = buckets or DEFAULT_BUCKETS
+        self.global_limit = global_limit
+        self.latency = latency
+        self.messages = {}
+        self.calls = defaultdict(int)
+        self.rate_limited = defaultdict(int)
+        self._windows = {}
+        self._global = _Window(global_limit) if global_limit else None
+        self._ids = itertools.count(int(time.time() * 1000 - 1420070400000) << 22)
+        self._runner = None
+        self.url = None
+
+    # --- Server lifecycle ---
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(API_PREFIX + "/users/@me", self.handle_me)
+        app.router.add_post(API_PREFIX + "/channels/{channel_id}/messages", self.handle_send)
+        app.router.add_get(API_PREFIX + "/channels/{channel_id}/messages/{message_id}", self.handle_fetch)
+        app.router.add_patch(API_PREFIX + "/channels/{channel_id}/messages/{message_id}", self.handle_edit)
+        app.router.add_delete(API_PREFIX + "/channels/{channel_id}/messages/{message_id}", self.handle_delete)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def login(self) -> discord.Client:
+        """Returns a discord.Client whose REST calls go to this emulator."""
+        discord.http.Route.BASE = self.url + API_PREFIX
+        client = discord.Client(intents=discord.Intents.none())
+        await client.login("emulator-token")
+        return client
+
+    def stats(self) -> dict:
+        return {"calls": dict(self.calls), "rate_limited": dict(self.rate_limited), "messages": len(self.messages)}
+
+    # --- Rate limiting ---
+    def _check(self, route: str, channel_id: str):
+        """Returns a 429 response if the route bucket or the global limit is exhausted, else the headers to send."""
+        now = time.time()
+        rule = self.buckets[route]
+        window = self._windows.get((route, channel_id))
+        if window is None:
+            window = self._windows[(route, channel_id)] = _Window(rule)
+
+        if self._global and not self._global.take(now):
+            self.rate_limited[route] += 1
+            retry_after = max(0.0, self._global.reset_at - now)
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": retry_after, "global": True},
+                status=429,
+                headers={"Retry-After": f"{retry_after:.3f}", "X-RateLimit-Global": "true", "X-RateLimit-Scope": "global"},
+            )
+
+        allowed = window.take(now)
+        reset_after = max(0.0, window.reset_at - now)
+        headers = {
+            "X-RateLimit-Limit": str(rule.limit),
+            "X-RateLimit-Remaining": str(window.remaining),
+            "X-RateLimit-Reset": f"{window.reset_at:.3f}",
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": f"{route}-bucket",
+        }
+        if allowed:
+            return headers
+
+        self.rate_limited[route] += 1
+        headers["Retry-After"] = f"{reset_after:.3f}"
+        headers["X-RateLimit-Scope"] = "user"
+        return web.json_response(
+            {"message": "You are being rate limited.", "retry_after": reset_after, "global": False},
+            status=429,
+            headers=headers,
+        )
+
+    async def _enter(self, route: str, channel_id: str):
+        self.calls[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._check(route, channel_id)
+
+    # --- Payloads ---
+    def _message_payload(self, channel_id: str, message_id: str, body: dict, edited: bool = False) -> dict:
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        return {
+            "id": message_id,
+            "channel_id": channel_id,
+            "author": {"id": "1", "username": "emulated-bot", "discriminator": "0000", "avatar": None, "bot": True},
+            "content": body.get("content") or "",
+            "timestamp": now,
+            "edited_timestamp": now if edited else None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": body.get("embeds") or [],
+            "pinned": False,
+            "type": 0,
+            "flags": 0,
+        }
+
+    @staticmethod
+    def _unknown_message() -> web.Response:
+        return web.json_response({"message": "Unknown Message", "code": 10008}, status=404)
+
+    # --- Handlers ---
+    async def handle_me(self, request: web.Request) -> web.Response:
+        return web.json_response({"id": "1", "username": "emulated-bot", "discriminator": "0000", "avatar": None, "bot": True, "flags": 0})
+
+    async def handle_send(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info["channel_id"]
+        result = await self._enter("send", channel_id)
+        if isinstance(result, web.Response):
+            return result
+        body = await request.json()
+        message_id = str(next(self._ids))
+        payload = self._message_payload(channel_id, message_id, body)
+        self.messages[(channel_id, message_id)] = payload
+        return web.json_response(payload, headers=result)
+
+    async def handle_fetch(self, request: web.Request) -> web.Response:
+        channel_id, message_id = request.match_info["channel_id"], request.match_info["message_id"]
+        result = await self._enter("fetch", channel_id)
+        if isinstance(result, web.Response):
+            return result
+        payload = self.messages.get((channel_id, message_id))
+        if payload is None:
+            # Messages that predate the emulator (e.g. tracker rows from a fixture) exist on first touch
+            payload = self.messages[(channel_id, message_id)] = self._message_payload(channel_id, message_id, {})
+        return web.json_response(payload, headers=result)
+
+    async def handle_edit(self, request: web.Request) -> web.Response:
+        channel_id, message_id = request.match_info["channel_id"], request.match_info["message_id"]
+        result = await self._enter("edit", channel_id)
+        if isinstance(result, web.Response):
+            return result
+        if (channel_id, message_id) not in self.messages:
+            return self._unknown_message()
+        payload = self._message_payload(channel_id, message_id, await request.json(), edited=True)
+        self.messages[(channel_id, message_id)] = payload
+        return web.json_response(payload, headers=result)
+
+    async def handle_delete(self, request: web.Request) -> web.Response:
+        channel_id, message_id = request.match_info["channel_id"], request.match_info["message_id"]
+        result = await self._enter("delete", channel_id)
+        if isinstance(result, web.Response):
+            return result
+        if self.messages.pop((channel_id, message_id), None) is None:
+            return self._unknown_message()
+        return web.Response(status=204, headers=result)
@@ -0,0 +1,123 @@
+"""End-to-end notification latency against a local feed server (benchmarks.feed_server).
+
+Runs vatsim_checker on a fixed cadence against the real HTTP fetch path and stub Discord
+channels, then matches every notification to the server's controller-connect events:
+    python -m benchmarks.feed_server serve --synthetic --speed 10 --storm-every 2 --storm-size 200 &
+    python -m benchmarks.e2e --server http://127.0.0.1:8080 --duration 60 --cycle 5 --output e2e.json
+"""
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import time
+
+import aiohttp
+
+import airports
+import database
+from cogs import atc_cog
+from vatsim import VatsimFeed
+
+from . import synthetic
+from .run_loops import git_commit
+from .stubs import SleepRecorder, StageTimer, StubBot, TimedProxy
+
+CALLSIGN_PATTERN = re.compile(r"\*\*`([^`]+)`\*\*")
+
+
+def percentile(values: list, fraction: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def run(args) -> dict:
+    airports.load() # As the bot does at startup
+    storage = await synthetic.create_storage(args.storage, "vatsim-e2e-")
+
+    feed = VatsimFeed(f"{args.server}/v3/vatsim-data.json")
+    first = await feed.fetch()
+    if first is None:
+        raise SystemExit(f"Feed server at {args.server} did not return a snapshot.")
+    layout = await synthetic.populate_database(storage, first.data, args.rules, 0, 0, args.guilds)
+
+    timer = StageTimer()
+    bot = StubBot(TimedProxy(feed, timer, "feed"), storage, layout, timer, args.latency)
+    cog = atc_cog.AtcCog(bot)
+    cog.pause = SleepRecorder(timer).sleep
+    cog.cog_unload()
+    # Start from what is already online so only controllers that connect during the run count
+    await cog.vatsim_checker.coro(cog)
+    bot.sent.clear()
+
+    started = time.time()
+    cycles = []
+    while time.time() - started < args.duration:
+        timer.reset()
+        cycle_started = time.perf_counter()
+        await cog.vatsim_checker.coro(cog)
+        cycles.append({"wall_s": time.perf_counter() - cycle_started, "stages_s": dict(timer.seconds)})
+        await asyncio.sleep(max(0.0, args.cycle - cycles[-1]["wall_s"]))
+    await storage.close()
+    await feed.close()
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{args.server}/events", params={"since": str(started)}) as response:
+            events = await response.json()
+
+    first_sent = {}
+    for sent_at, _, _, embed in bot.sent:
+        for callsign in CALLSIGN_PATTERN.findall(embed.description or "") if embed else []:
+            first_sent.setdefault(callsign, sent_at)
+
+    latencies = [
+        first_sent[event["callsign"]] - event["time"]
+        for event in events
+        if event["type"] == "connect" and event["callsign"] in first_sent
+    ]
+    walls = [cycle["wall_s"] for cycle in cycles]
+    return {
+        "meta": {"commit": git_commit(), "timestamp": started, "params": vars(args)},
+        "cycles": {
+            "count": len(cycles),
+            "median_s": statistics.median(walls) if walls else None,
+            "max_s": max(walls) if walls else None,
+            "samples": cycles,
+        },
+        "notification_latency_s": {
+            "matched": len(latencies),
+            "connect_events": sum(1 for event in events if event["type"] == "connect"),
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "max": max(latencies) if latencies else None,
+        },
+        "messages_sent": len(bot.sent),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure notification latency against a local feed server.")
+    parser.add_argument("--server", default="http://127.0.0.1:8080")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run.")
+    parser.add_argument("--cycle", type=float, default=15, help="Seconds between vatsim_checker cycles.")
+    parser.add_argument("--rules", type=int, default=2000)
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per Discord REST call.")
+    parser.add_argument("--storage", choices=sorted(database.STORAGE_BACKENDS), default="sqlite")
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"Results written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
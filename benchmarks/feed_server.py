@@ -0,0 +1,176 @@
+"""A local stand-in for data.vatsim.net that replays recorded or synthetic snapshots.
+
+Serve generated snapshots 10x faster than real time, with a storm of 200 controllers
+connecting and disconnecting every 4th update:
+    python -m benchmarks.feed_server serve --synthetic --speed 10 --storm-every 4 --storm-size 200
+
+Replay snapshots recorded from the live network:
+    python -m benchmarks.feed_server record --out recordings --count 40
+    python -m benchmarks.feed_server serve --snapshots recordings
+
+Then start the bot (or benchmarks.e2e) with
+    VATSIM_DATA_URL=http://127.0.0.1:8080/v3/vatsim-data.json
+"""
+import argparse
+import asyncio
+import datetime
+import glob
+import json
+import os
+import random
+import time
+
+import aiohttp
+from aiohttp import web
+
+from vatsim import VATSIM_DATA_URL
+from . import synthetic
+
+FEED_INTERVAL = 15  # seconds between updates of the real feed
+
+
+class ReplayFeed:
+    """Cycles through snapshots on a timer and injects controller connect/disconnect storms."""
+    def __init__(self, snapshots: list, speed: float = 1.0, storm_every: int = 0, storm_size: int = 0, seed: int = 0):
+        self.snapshots = snapshots
+        self.interval = FEED_INTERVAL / speed
+        self.storm_every = storm_every
+        self.storm_size = storm_size
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.events = []
+        self.requests = 0
+        self._extra_controllers = []
+        self._payload = b""
+        self._publish()
+
+    def _publish(self):
+        data = dict(self.snapshots[self.tick % len(self.snapshots)])
+        if self.storm_every and self.tick and self.tick % self.storm_every == 0:
+            self._storm(data)
+        data["controllers"] = data["controllers"] + self._extra_controllers
+        data["general"] = dict(data.get("general", {}), update_timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat())
+        self._payload = json.dumps(data).encode()
+
+    def _storm(self, data: dict):
+        """Disconnects the previous storm's controllers and connects a fresh batch."""
+        now = time.time()
+        for controller in self._extra_controllers:
+            self.events.append({"type": "disconnect", "callsign": controller["callsign"], "time": now})
+        airports = data.get("_synthetic_airports") or sorted({c["callsign"].split("_")[0] for c in data["controllers"]}) or ["ZZZZ"]
+        self._extra_controllers = [
+            synthetic.make_controller(2_000_000 + self.tick * self.storm_size + n, airports, self.rng)
+            for n in range(self.storm_size)
+        ]
+        for controller in self._extra_controllers:
+            self.events.append({"type": "connect", "callsign": controller["callsign"], "time": now})
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.tick += 1
+            self._publish()
+
+    async def handle_feed(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        return web.Response(body=self._payload, content_type="application/json")
+
+    async def handle_events(self, request: web.Request) -> web.Response:
+        since = float(request.query.get("since", 0))
+        return web.json_response([event for event in self.events if event["time"] >= since])
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "tick": self.tick,
+            "interval_s": self.interval,
+            "requests": self.requests,
+            "payload_bytes": len(self._payload),
+            "events": len(self.events),
+        })
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v3/vatsim-data.json", self.handle_feed)
+        app.router.add_get("/events", self.handle_events)
+        app.router.add_get("/stats", self.handle_stats)
+
+        async def start_ticker(app):
+            app["ticker"] = asyncio.create_task(self.run())
+
+        async def stop_ticker(app):
+            app["ticker"].cancel()
+
+        app.on_startup.append(start_ticker)
+        app.on_cleanup.append(stop_ticker)
+        return app
+
+
+def load_snapshots(directory: str) -> list:
+    paths = sorted(glob.glob(os.path.join(directory, "*.json")))
+    if not paths:
+        raise SystemExit(f"No *.json snapshots found in {directory}")
+    snapshots = []
+    for path in paths:
+        with open(path, "rb") as f:
+            snapshots.append(json.loads(f.read()))
+    return snapshots
+
+
+async def record(out: str, count: int, interval: float):
+    """Saves `count` consecutive live snapshots so they can be replayed offline."""
+    os.makedirs(out, exist_ok=True)
+    async with aiohttp.ClientSession() as session:
+        for n in range(count):
+            async with session.get(VATSIM_DATA_URL) as response:
+                response.raise_for_status()
+                body = await response.read()
+            path = os.path.join(out, f"{n:05d}.json")
+            with open(path, "wb") as f:
+                f.write(body)
+            print(f"Recorded {path} ({len(body)} bytes)")
+            if n + 1 < count:
+                await asyncio.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay VATSIM data feed snapshots locally.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Serve snapshots over HTTP.")
+    source = serve.add_mutually_exclusive_group(required=True)
+    source.add_argument("--snapshots", help="Directory of recorded vatsim-data.json files, replayed in name order.")
+    source.add_argument("--synthetic", action="store_true", help="Serve generated snapshots.")
+    serve.add_argument("--pilots", type=int, default=20000)
+    serve.add_argument("--controllers", type=int, default=2000)
+    serve.add_argument("--frames", type=int, default=1, help="Distinct synthetic snapshots to cycle through.")
+    serve.add_argument("--speed", type=float, default=1.0, help="Replay speed; 10 publishes every 1.5s.")
+    serve.add_argument("--storm-every", type=int, default=0, help="Inject a connect/disconnect storm every N updates.")
+    serve.add_argument("--storm-size", type=int, default=100, help="Controllers per storm.")
+    serve.add_argument("--seed", type=int, default=0)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+
+    rec = commands.add_parser("record", help="Record live snapshots for later replay.")
+    rec.add_argument("--out", required=True)
+    rec.add_argument("--count", type=int, default=20)
+    rec.add_argument("--interval", type=float, default=FEED_INTERVAL)
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        asyncio.run(record(args.out, args.count, args.interval))
+        return
+
+    if args.snapshots:
+        snapshots = load_snapshots(args.snapshots)
+    else:
+        snapshots = [
+            synthetic.generate_snapshot(args.pilots, args.controllers, seed=args.seed + frame)
+            for frame in range(args.frames)
+        ]
+    feed = ReplayFeed(snapshots, args.speed, args.storm_every, args.storm_size, args.seed)
+    print(f"Serving {len(snapshots)} snapshot(s) on http://{args.host}:{args.port}/v3/vatsim-data.json every {feed.interval:.2f}s")
+    web.run_app(feed.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
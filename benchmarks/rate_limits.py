@@ -0,0 +1,91 @@
+"""Measures tracker loop cycle time under Discord rate limits at several tracker counts.
+
+Each size gets a fresh database and a fresh DiscordEmulator, then one cycle of each tracker loop:
+    python -m benchmarks.rate_limits --sizes 1000 10000 50000 --guilds 200 --output rate_limits.json
+
+The loops' fixed asyncio.sleep calls are recorded rather than awaited unless --real-sleeps is set,
+so the reported wall time isolates the cost of the REST calls and 429 back-off.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import database
+
+from . import synthetic
+from .discord_emulator import DiscordEmulator
+from .run_loops import Harness, git_commit
+from .stubs import EmulatedBot, StageTimer, StubFeed
+
+TRACKER_LOOPS = ["update_controller_trackers", "update_flight_trackers"]
+
+
+async def measure_size(size: int, data: dict, args) -> dict:
+    storage = await synthetic.create_storage(args.storage, "vatsim-ratelimit-")
+    layout = await synthetic.populate_database(storage, data, 0, size, size, args.guilds, args.online_ratio)
+
+    emulator = DiscordEmulator(latency=args.latency)
+    await emulator.start()
+    client = await emulator.login()
+    try:
+        timer = StageTimer()
+        harness = Harness(EmulatedBot(StubFeed(data, timer), storage, layout, timer, client), data, timer, args.real_sleeps)
+        harness.tracker_counts = (size, size)
+        await harness.setup()
+
+        loops = {}
+        for name in TRACKER_LOOPS:
+            calls_before = dict(emulator.calls)
+            limited_before = dict(emulator.rate_limited)
+            timer.reset()
+            started = time.perf_counter()
+            await harness.run_once(name)
+            wall = time.perf_counter() - started
+            loops[name] = {
+                "wall_s": wall,
+                "discord_s": timer.seconds.get("discord", 0.0),
+                "sleep_requested_s": timer.seconds.get("sleep_requested", 0.0),
+                "calls": {route: count - calls_before.get(route, 0) for route, count in emulator.calls.items()},
+                "rate_limited": {route: count - limited_before.get(route, 0) for route, count in emulator.rate_limited.items()},
+                "trackers_per_s": size / wall if wall else None,
+            }
+            print(f"{size:>7} {name:<28} {wall:>9.2f}s  429s={sum(loops[name]['rate_limited'].values())}")
+        return loops
+    finally:
+        await storage.close()
+        await client.close()
+        await emulator.stop()
+
+
+async def run(args) -> dict:
+    data = synthetic.generate_snapshot(args.pilots, args.controllers, seed=args.seed)
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = await measure_size(size, data, args)
+    return {"meta": {"commit": git_commit(), "timestamp": time.time(), "params": vars(args)}, "sizes": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tracker loop cycle time against the Discord REST emulator.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Trackers per table.")
+    parser.add_argument("--guilds", type=int, default=200, help="Guilds to spread trackers over (5 channels each).")
+    parser.add_argument("--pilots", type=int, default=20000)
+    parser.add_argument("--controllers", type=int, default=2000)
+    parser.add_argument("--online-ratio", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated network latency per REST call.")
+    parser.add_argument("--storage", choices=sorted(database.STORAGE_BACKENDS), default="sqlite")
+    parser.add_argument("--real-sleeps", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
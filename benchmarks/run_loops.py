@@ -0,0 +1,211 @@
+"""Runs the polling loops against synthetic load and writes machine-readable timings.
+
+Usage:
+    python -m benchmarks.run_loops --pilots 20000 --controllers 2000 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import airports
+import database
+from cogs import airport_cog, atc_cog, flight_tracker_cog
+
+from . import synthetic
+from .discord_emulator import DiscordEmulator
+from .stubs import EmulatedBot, SleepRecorder, StageTimer, StubBot, StubFeed, StubInteraction, TimedProxy
+
+LOOPS = ["vatsim_checker", "update_controller_trackers", "update_flight_trackers", "airport_activity"]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def busiest_airport(snapshot: dict) -> str:
+    counts = {}
+    for pilot in snapshot["pilots"]:
+        if pilot["flight_plan"]:
+            counts[pilot["flight_plan"]["departure"]] = counts.get(pilot["flight_plan"]["departure"], 0) + 1
+    return max(counts, key=counts.get)
+
+
+class Harness:
+    """Builds the cogs around stub Discord objects and runs one cycle of a loop at a time."""
+    def __init__(self, bot, data: dict, timer: StageTimer, real_sleeps: bool):
+        self.timer = timer
+        self.data = data
+        self.bot = bot
+        self.sleeper = SleepRecorder(self.timer, real_sleeps)
+        self.icao = busiest_airport(data)
+
+    async def setup(self):
+        self.atc = atc_cog.AtcCog(self.bot)
+        self.flights = flight_tracker_cog.FlightTrackerCog(self.bot)
+        self.airports = airport_cog.AirportCog(self.bot)
+        self.atc.pause = self.flights.pause = self.sleeper.sleep
+        # The benchmark drives each cycle itself
+        self.atc.cog_unload()
+        self.flights.cog_unload()
+        self.atc.db_manager = TimedProxy(self.atc.db_manager, self.timer, "db")
+        self.flights.db_manager = TimedProxy(self.flights.db_manager, self.timer, "db")
+
+    def workload(self, name: str) -> int:
+        """The number of items a cycle processes, used for throughput."""
+        if name == "vatsim_checker":
+            return len(self.data["controllers"])
+        if name == "update_controller_trackers":
+            return self.tracker_counts[1]
+        if name == "update_flight_trackers":
+            return self.tracker_counts[0]
+        return 1
+
+    async def run_once(self, name: str):
+        if name == "vatsim_checker":
+            # Every cycle starts cold so repeats measure the same amount of work
+            self.atc.previously_notified = set()
+            await self.atc.vatsim_checker.coro(self.atc)
+        elif name == "update_controller_trackers":
+            # Forget what the messages show so every cycle edits them, as after a cold start
+            self.bot.state.tracker_fingerprints.clear()
+            await self.atc.update_controller_trackers.coro(self.atc)
+        elif name == "update_flight_trackers":
+            self.bot.state.tracker_fingerprints.clear()
+            await self.flights.update_flight_trackers.coro(self.flights)
+        elif name == "airport_activity":
+            # Render from scratch each cycle; a cached page would only measure the dictionary lookup
+            self.airports.activity_pages.clear()
+            await self.airports.airport_activity.callback(self.airports, StubInteraction(self.timer), self.icao)
+
+    async def measure(self, name: str, repeat: int) -> dict:
+        walls = []
+        stage_samples = []
+        calls = {}
+        for _ in range(repeat):
+            self.timer.reset()
+            started = time.perf_counter()
+            await self.run_once(name)
+            wall = time.perf_counter() - started
+            walls.append(wall)
+            stages = {stage: self.timer.seconds.get(stage, 0.0) for stage in ("feed", "db", "discord")}
+            stages["compute"] = max(0.0, wall - sum(stages.values()))
+            stages["sleep_requested"] = self.timer.seconds.get("sleep_requested", 0.0)
+            stage_samples.append(stages)
+            calls = dict(self.timer.calls)
+
+        tracemalloc.start()
+        await self.run_once(name)
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot_stats = tracemalloc.take_snapshot().statistics("filename")
+        tracemalloc.stop()
+
+        median_wall = statistics.median(walls)
+        items = self.workload(name)
+        return {
+            "wall_s": {"median": median_wall, "min": min(walls), "max": max(walls), "samples": walls},
+            "stages_s": {stage: statistics.median(s[stage] for s in stage_samples) for stage in stage_samples[0]},
+            "calls": calls,
+            "alloc": {
+                "peak_bytes": peak,
+                "retained_bytes": current,
+                "live_blocks": sum(stat.count for stat in snapshot_stats),
+            },
+            "throughput": {"items": items, "items_per_s": items / median_wall if median_wall else None},
+        }
+
+
+async def run(args) -> dict:
+    airports.load() # As the bot does at startup
+    storage = await synthetic.create_storage(args.storage)
+
+    print(f"Generating snapshot: {args.pilots} pilots, {args.controllers} controllers...")
+    data = synthetic.generate_snapshot(args.pilots, args.controllers, args.airports, args.seed)
+    layout = await synthetic.populate_database(
+        storage, data, args.rules, args.flight_trackers, args.controller_trackers, args.guilds, args.online_ratio, args.seed
+    )
+
+    timer = StageTimer()
+    emulator = client = None
+    if args.discord == "emulator":
+        emulator = DiscordEmulator(latency=args.latency)
+        await emulator.start()
+        client = await emulator.login()
+        bot = EmulatedBot(StubFeed(data, timer), storage, layout, timer, client)
+    else:
+        bot = StubBot(StubFeed(data, timer), storage, layout, timer, args.latency)
+
+    harness = Harness(bot, data, timer, args.real_sleeps)
+    harness.tracker_counts = (args.flight_trackers, args.controller_trackers)
+    await harness.setup()
+
+    results = {}
+    try:
+        for name in args.loops:
+            print(f"Running {name} x{args.repeat}...")
+            results[name] = await harness.measure(name, args.repeat)
+            print(f"--> median {results[name]['wall_s']['median'] * 1000:.1f} ms")
+    finally:
+        await storage.close()
+        if emulator:
+            await client.close()
+            await emulator.stop()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "params": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "loops": results,
+        "discord": emulator.stats() if emulator else None,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the bot's polling loops against synthetic VATSIM load.")
+    parser.add_argument("--pilots", type=int, default=20000)
+    parser.add_argument("--controllers", type=int, default=2000)
+    parser.add_argument("--airports", type=int, default=1500)
+    parser.add_argument("--rules", type=int, default=500, help="Rows in the notifications table.")
+    parser.add_argument("--flight-trackers", type=int, default=1000)
+    parser.add_argument("--controller-trackers", type=int, default=500)
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--online-ratio", type=float, default=0.5, help="Share of trackers whose CID is online.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per Discord REST call.")
+    parser.add_argument("--discord", choices=["stub", "emulator"], default="stub",
+                        help="Stub channels, or discord.py's HTTP client against the rate-limited REST emulator.")
+    parser.add_argument("--storage", choices=sorted(database.STORAGE_BACKENDS), default="sqlite",
+                        help="Storage backend; 'memory' takes the database out of the measurement.")
+    parser.add_argument("--real-sleeps", action="store_true", help="Actually wait out the loops' fixed sleeps.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--loops", nargs="+", choices=LOOPS, default=LOOPS)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"Results written to {args.output}")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Stand-ins for the Discord objects and feed the cogs talk to, with per-stage timing."""
+import asyncio
+import inspect
+import itertools
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import discord
+
+from cache import GuildSettingsCache
+from decoding import decode_feed
+from state import RuntimeState
+from vatsim import Snapshot
+
+
+class StageTimer:
+    """Accumulates wall time and call counts per named stage."""
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def reset(self):
+        self.seconds.clear()
+        self.calls.clear()
+
+    @contextmanager
+    def measure(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] += time.perf_counter() - started
+            self.calls[stage] += 1
+
+
+class TimedProxy:
+    """Wraps an object so every coroutine method call is timed under one stage."""
+    def __init__(self, target, timer: StageTimer, stage: str):
+        self._target = target
+        self._timer = timer
+        self._stage = stage
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        async def timed(*args, **kwargs):
+            with self._timer.measure(self._stage):
+                return await attribute(*args, **kwargs)
+        return timed
+
+
+class SleepRecorder:
+    """Stands in for a cog's `pause` so its fixed sleeps are recorded instead of awaited."""
+    def __init__(self, timer: StageTimer, real_sleeps: bool = False):
+        self._timer = timer
+        self._real_sleeps = real_sleeps
+
+    async def sleep(self, delay, result=None):
+        self._timer.seconds["sleep_requested"] += delay
+        self._timer.calls["sleep_requested"] += 1
+        if self._real_sleeps:
+            await asyncio.sleep(delay)
+        return result
+
+
+def _not_found() -> discord.NotFound:
+    return discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+
+
+class StubMessage:
+    def __init__(self, channel: "StubChannel", message_id: int):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, content=None, embed=None, **kwargs):
+        await self.channel._call("edit")
+        if self.id in self.channel.deleted:
+            raise _not_found()
+        if embed is not None:
+            embed.to_dict()
+        return self
+
+    async def delete(self):
+        await self.channel._call("delete")
+        self.channel.deleted.add(self.id)
+
+
+class StubChannel:
+    """A text channel whose REST calls cost `latency` seconds each and are counted by route."""
+    _ids = itertools.count(9_000_000_000)
+
+    def __init__(self, channel_id: int, guild: "StubGuild", timer: StageTimer, latency: float = 0.0, sent: list = None):
+        self.id = channel_id
+        self.guild = guild
+        self.name = f"channel-{channel_id}"
+        self.mention = f"<#{channel_id}>"
+        self.deleted = set()
+        self._timer = timer
+        self._latency = latency
+        self._sent = sent
+
+    async def _call(self, route: str):
+        with self._timer.measure("discord"):
+            self._timer.calls[f"discord.{route}"] += 1
+            if self._latency:
+                await asyncio.sleep(self._latency)
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await self._call("send")
+        if embed is not None:
+            embed.to_dict()
+        if self._sent is not None:
+            self._sent.append((time.time(), self.id, content, embed))
+        return StubMessage(self, next(self._ids))
+
+    async def fetch_message(self, message_id: int):
+        await self._call("fetch")
+        if message_id in self.deleted:
+            raise _not_found()
+        return StubMessage(self, message_id)
+
+
+class StubRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+        self.mention = f"<@&{role_id}>"
+
+
+class StubGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.member_count = 100
+        self.owner = None
+        self.owner_id = 1
+
+    def get_role(self, role_id: int):
+        return StubRole(role_id)
+
+
+class StubFeed:
+    """A VatsimFeed that decodes a pre-serialized snapshot instead of downloading it."""
+    def __init__(self, data: dict, timer: StageTimer):
+        self._payload = json.dumps(data).encode()
+        self._timer = timer
+        self.snapshot = None
+
+    async def fetch(self):
+        with self._timer.measure("feed"):
+            snapshot = Snapshot(decode_feed(self._payload), previous=self.snapshot)
+            snapshot.build_indexes()
+            self.snapshot = snapshot
+        return snapshot
+
+
+class StubBot:
+    """Implements the slice of commands.Bot the cogs use."""
+    def __init__(self, feed: StubFeed, db, layout: dict, timer: StageTimer, latency: float = 0.0):
+        self.vatsim = feed
+        self.db = db
+        self.guild_settings = GuildSettingsCache(db)
+        self.state = RuntimeState(directory=None)
+        self.sent = []
+        self._guilds = {guild_id: StubGuild(guild_id) for guild_id in layout["guilds"]}
+        self._channels = {
+            channel_id: StubChannel(channel_id, self._guilds[guild_id], timer, latency, self.sent)
+            for guild_id, channel_ids in layout["channels"].items()
+            for channel_id in channel_ids
+        }
+
+    @property
+    def guilds(self):
+        return list(self._guilds.values())
+
+    def get_guild(self, guild_id: int):
+        return self._guilds.get(guild_id)
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+    async def change_presence(self, **kwargs):
+        pass
+
+    async def fetch_user(self, user_id: int):
+        return None
+
+    async def wait_until_ready(self):
+        await asyncio.Event().wait()
+
+
+class StubInteraction:
+    """Just enough of discord.Interaction to invoke a deferred slash command callback."""
+    def __init__(self, timer: StageTimer):
+        self._timer = timer
+        self.guild_id = None
+        self.guild = None
+        self.command = None
+        self.response = SimpleNamespace(defer=self._noop)
+        self.followup = SimpleNamespace(send=self._followup)
+
+    async def _noop(self, *args, **kwargs):
+        pass
+
+    async def _followup(self, content=None, embed=None, **kwargs):
+        with self._timer.measure("discord"):
+            self._timer.calls["discord.followup"] += 1
+            if embed is not None:
+                embed.to_dict()
+
+
+class EmulatedBot(StubBot):
+    """A StubBot whose channels are real discord.py PartialMessageables talking to a DiscordEmulator."""
+    def __init__(self, feed, db, layout: dict, timer: StageTimer, client: discord.Client):
+        super().__init__(feed, db, layout, timer)
+        self._client = client
+        self._channel_guilds = {channel_id: guild_id for guild_id, channel_ids in layout["channels"].items() for channel_id in channel_ids}
+        request = client.http.request
+
+        async def timed_request(*args, **kwargs):
+            # Includes discord.py's own rate-limit waits and retries
+            with timer.measure("discord"):
+                return await request(*args, **kwargs)
+        client.http.request = timed_request
+
+    def get_channel(self, channel_id: int):
+        guild_id = self._channel_guilds.get(channel_id)
+        if guild_id is None:
+            return None
+        return self._client.get_partial_messageable(channel_id, guild_id=guild_id)
@@ -0,0 +1,183 @@
+"""Synthetic VATSIM snapshots and database tables for offline benchmarks."""
+import datetime
+import random
+import os
+import sqlite3
+import string
+import tempfile
+
+import database
+
+POSITION_SUFFIXES = ["DEL", "GND", "TWR", "APP", "DEP", "CTR"]
+BANNED_FREQUENCIES = ["199.998", "199.997", "199.999"]
+
+
+def make_airports(count: int, rng: random.Random) -> list:
+    """Returns `count` unique 4-letter identifiers; about a third are US-style K codes."""
+    airports = set()
+    while len(airports) < count:
+        first = "K" if rng.random() < 0.35 else rng.choice("CEFLORSUVWYZ")
+        airports.add(first + "".join(rng.choices(string.ascii_uppercase, k=3)))
+    return sorted(airports)
+
+
+def _logon_time(rng: random.Random) -> str:
+    started = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=rng.randint(1, 600))
+    return started.strftime("%Y-%m-%dT%H:%M:%S.0000000Z")
+
+
+def _frequency(rng: random.Random) -> str:
+    return f"{rng.randint(118, 135)}.{rng.choice(range(0, 1000, 5)):03d}"
+
+
+def make_pilot(cid: int, airports: list, rng: random.Random) -> dict:
+    departure, arrival = rng.sample(airports, 2)
+    pilot = {
+        "cid": cid,
+        "name": f"Pilot {cid}",
+        "callsign": "".join(rng.choices(string.ascii_uppercase, k=3)) + str(rng.randint(1, 9999)),
+        "latitude": rng.uniform(-60, 70),
+        "longitude": rng.uniform(-180, 180),
+        "altitude": rng.choice([0, rng.randint(0, 41000)]),
+        "groundspeed": rng.choice([0, rng.randint(0, 520)]),
+        "heading": rng.randint(0, 359),
+        "logon_time": _logon_time(rng),
+        "flight_plan": None,
+    }
+    if rng.random() < 0.9:
+        pilot["flight_plan"] = {
+            "departure": departure,
+            "arrival": arrival,
+            "aircraft_short": rng.choice(["A320", "B738", "B77W", "C172", "A359", "E175"]),
+            "route": " ".join("".join(rng.choices(string.ascii_uppercase, k=5)) for _ in range(rng.randint(2, 12))),
+        }
+    return pilot
+
+
+def make_controller(cid: int, airports: list, rng: random.Random) -> dict:
+    airport = rng.choice(airports)
+    base = airport[1:] if airport.startswith("K") and rng.random() < 0.5 else airport
+    suffix = "OBS" if rng.random() < 0.05 else rng.choice(POSITION_SUFFIXES)
+    frequency = rng.choice(BANNED_FREQUENCIES) if suffix == "OBS" else _frequency(rng)
+    return {
+        "cid": cid,
+        "name": f"Controller {cid}",
+        "callsign": f"{base}_{rng.randint(1, 99)}_{suffix}" if rng.random() < 0.2 else f"{base}_{suffix}",
+        "frequency": frequency,
+        "facility": POSITION_SUFFIXES.index(suffix) + 1 if suffix in POSITION_SUFFIXES else 0,
+        "rating": rng.randint(1, 12),
+        "logon_time": _logon_time(rng),
+        "text_atis": [f"{base} controller message line {n}" for n in range(rng.randint(0, 3))] or None,
+    }
+
+
+def make_atis(airport: str, rng: random.Random) -> dict:
+    code = rng.choice(string.ascii_uppercase)
+    return {
+        "cid": rng.randint(800000, 1900000),
+        "name": "ATIS",
+        "callsign": f"{airport}_ATIS",
+        "frequency": _frequency(rng),
+        "atis_code": code,
+        "logon_time": _logon_time(rng),
+        "text_atis": [f"{airport} INFORMATION {code}", "WIND 270 AT 10 VISIBILITY 10", "ALTIMETER 2992"],
+    }
+
+
+def generate_snapshot(pilots: int = 20000, controllers: int = 2000, airports: int = 1500, seed: int = 0) -> dict:
+    """Builds a feed dict shaped like https://data.vatsim.net/v3/vatsim-data.json."""
+    rng = random.Random(seed)
+    airport_list = make_airports(airports, rng)
+    pilot_cids = rng.sample(range(800000, 1900000), pilots)
+    controller_cids = rng.sample(range(1900000, 2000000), controllers)
+    atis_airports = rng.sample(airport_list, max(1, len(airport_list) // 10))
+    return {
+        "general": {
+            "version": 3,
+            "update_timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "connected_clients": pilots + controllers,
+        },
+        "pilots": [make_pilot(cid, airport_list, rng) for cid in pilot_cids],
+        "controllers": [make_controller(cid, airport_list, rng) for cid in controller_cids],
+        "atis": [make_atis(airport, rng) for airport in atis_airports],
+        "_synthetic_airports": airport_list,
+    }
+
+
+async def create_storage(backend: str, prefix: str = "vatsim-bench-") -> database.Storage:
+    """A fresh storage backend; SQLite gets its own file in a temporary directory."""
+    if backend == "sqlite":
+        storage = database.DatabaseManager(os.path.join(tempfile.mkdtemp(prefix=prefix), "bench.db"))
+        await storage.setup()
+        return storage
+    return await database.create_storage(backend)
+
+
+async def populate_database(storage: database.Storage, snapshot: dict, rules: int, flight_trackers: int,
+                            controller_trackers: int, guilds: int = 50, online_ratio: float = 0.5, seed: int = 0) -> dict:
+    """Fills a freshly set up storage backend with synthetic rows.
+
+    Returns the guild and channel ids used so the Discord stubs can be built to match."""
+    rng = random.Random(seed)
+    guild_ids = [10_000 + n for n in range(guilds)]
+    channel_ids = {guild_id: [guild_id * 100 + n for n in range(5)] for guild_id in guild_ids}
+
+    def pick_target():
+        guild_id = rng.choice(guild_ids)
+        return guild_id, rng.choice(channel_ids[guild_id])
+
+    def pick_cids(people: list, count: int) -> list:
+        online = [str(p["cid"]) for p in people]
+        cids = []
+        for _ in range(count):
+            if online and rng.random() < online_ratio:
+                cids.append(rng.choice(online))
+            else:
+                cids.append(str(rng.randint(100000, 799999)))
+        return cids
+
+    # Recorded snapshots have no airport list, so fall back to the staffed callsign prefixes
+    airports = snapshot.get("_synthetic_airports") or sorted({c["callsign"].split("_")[0] for c in snapshot["controllers"]})
+    rule_rows = []
+    for _ in range(rules):
+        guild_id, channel_id = pick_target()
+        identifier = rng.choice(airports)
+        if identifier.startswith("K") and rng.random() < 0.3:
+            identifier = identifier[1:]
+        rule_rows.append((guild_id, identifier, channel_id, rng.choice([None, guild_id + 1]), rng.random() < 0.5))
+
+    def tracker_rows(people: list, count: int) -> list:
+        rows = []
+        for n, cid in enumerate(pick_cids(people, count)):
+            guild_id, channel_id = pick_target()
+            rows.append((guild_id, channel_id, 5_000_000 + n, cid, rng.random() < 0.3, rng.choice([None, guild_id + 1])))
+        return rows
+
+    flight_rows = tracker_rows(snapshot["pilots"], flight_trackers)
+    controller_rows = tracker_rows(snapshot["controllers"], controller_trackers)
+
+    if isinstance(storage, database.DatabaseManager):
+        # One transaction instead of a commit per row keeps large sweeps quick to set up
+        with sqlite3.connect(storage.path) as db:
+            db.executemany(
+                "INSERT INTO notifications (guild_id, airport_icao, channel_id, role_id, delete_on_offline) VALUES (?, ?, ?, ?, ?)",
+                rule_rows
+            )
+            db.executemany(
+                "INSERT INTO flight_trackers (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id) VALUES (?, ?, ?, ?, ?, ?)",
+                flight_rows
+            )
+            db.executemany(
+                "INSERT INTO controller_trackers (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id) VALUES (?, ?, ?, ?, ?, ?)",
+                controller_rows
+            )
+            db.commit()
+    else:
+        for row in rule_rows:
+            await storage.add_notification(*row)
+        for row in flight_rows:
+            await storage.add_flight_tracker(*row)
+        for row in controller_rows:
+            await storage.add_controller_tracker(*row)
+
+    return {"guilds": guild_ids, "channels": channel_ids}
@@ -1,34 +1,159 @@
 import os
+import argparse
+import asyncio
+import hashlib
+import json
+import time
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
-from database import DatabaseManager
+import airports
+import api
+import decoding
+import log
+import metrics
+from cache import GuildSettingsCache
+from database import create_storage
+from sender import PacedSender
+from state import RuntimeState
+from vatsim import VatsimFeed, TRANSCEIVERS_URL, VATSIM_DATA_URL
 
 load_dotenv()
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
+# Point this at a local replay server (python -m benchmarks.feed_server) to run without the live network
+DATA_URL = os.getenv("VATSIM_DATA_URL", VATSIM_DATA_URL)
+# Backs /lookup frequency and controller coverage; set it empty to skip the extra download
+TRANSCEIVERS_FEED_URL = os.getenv("VATSIM_TRANSCEIVERS_URL", TRANSCEIVERS_URL) or None
+# Set to serve Prometheus metrics on http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# Set to serve the read-only JSON API (see api.py) on http://API_HOST:API_PORT
+API_PORT = os.getenv("API_PORT")
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+# "sqlite" (default) or "memory", which keeps nothing across restarts
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+# "msgspec", "orjson" or "json"; unset picks the fastest one installed
+JSON_DECODER = os.getenv("JSON_DECODER")
+# DEBUG, INFO, WARNING or ERROR; and "text" or "json" (one object per line, for log collectors)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+# Fingerprint of the last command tree pushed to Discord, used to skip redundant syncs
+COMMAND_HASH_FILE = ".command_tree.sha256"
+
+PROCESS_STARTED = time.perf_counter()
+STARTUP_PHASE_SECONDS = metrics.Gauge("bot_startup_phase_seconds", "Duration of each startup phase of the current process.")
+logger = log.get_logger("bot")
+
+def command_tree_fingerprint(tree: discord.app_commands.CommandTree) -> str:
+    """Hashes the payload tree.sync() would upload, so unchanged definitions can skip the sync."""
+    payload = sorted((command.to_dict() for command in tree.get_commands()), key=lambda c: (c.get('type', 1), c['name']))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
 
 class MyBot(commands.AutoShardedBot):
-    def __init__(self):
+    def __init__(self, force_sync: bool = False):
         intents = discord.Intents.default()
-        super().__init__(command_prefix="!", intents=intents)
+        super().__init__(command_prefix="!", intents=intents, http_trace=metrics.discord_trace_config())
+        decoding.use(JSON_DECODER)
+        logger.info("Decoding the VATSIM feed", decoder=decoding.BACKEND)
+        self.vatsim = VatsimFeed(DATA_URL, TRANSCEIVERS_FEED_URL)
+        self.state = RuntimeState()
+        self.sender = PacedSender()
+        self.db = None
+        self.guild_settings = None
+        self.metrics_runner = None
+        self.api_runner = None
+        self.force_sync = force_sync
+        self.startup_timings = {}
+        metrics.SNAPSHOT_AGE_SECONDS.set_function(lambda: self.vatsim.snapshot.age if self.vatsim.snapshot else float("nan"))
+
+    def record_startup_phase(self, phase: str, started: float):
+        self.startup_timings[phase] = time.perf_counter() - started
+        STARTUP_PHASE_SECONDS.set(self.startup_timings[phase], phase=phase)
 
     async def setup_hook(self):
-        db_manager = DatabaseManager()
-        await db_manager.setup()
+        started = time.perf_counter()
+        # One storage instance shared by every cog
+        self.db = await create_storage(STORAGE_BACKEND)
+        self.guild_settings = GuildSettingsCache(self.db)
+        self.record_startup_phase("db", started)
+
+        # Pick up where a crashed process left off: last snapshot, tracker fingerprints, loop cursors
+        started = time.perf_counter()
+        await asyncio.to_thread(self.state.load, self.vatsim)
+        self.record_startup_phase("state", started)
+
+        # Memory-maps the bundled airport table (compiling it from data/airports.csv on first run)
+        started = time.perf_counter()
+        await asyncio.to_thread(airports.load)
+        self.record_startup_phase("airports", started)
         
         # Load cogs
+        started = time.perf_counter()
         await self.load_extension("cogs.atc_cog")
         await self.load_extension("cogs.lookup_cog")
         await self.load_extension("cogs.airport_cog")
         await self.load_extension("cogs.flight_tracker_cog")        
+        await self.load_extension("cogs.atis_cog")
+        await self.load_extension("cogs.board_cog")
+        await self.load_extension("cogs.tracker_io_cog")
+        await self.load_extension("cogs.admin_cog")
+        await self.load_extension("cogs.maintenance_cog")
+        self.record_startup_phase("cogs", started)
+
+        started = time.perf_counter()
+        await self.sync_command_tree()
+        self.record_startup_phase("sync", started)
+
+        if METRICS_PORT:
+            self.metrics_runner = await metrics.start_server(METRICS_HOST, int(METRICS_PORT))
+            logger.info("Serving metrics", url=f"http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        if API_PORT:
+            self.api_runner = await api.start_server(self.vatsim, API_HOST, int(API_PORT))
+            logger.info("Serving the snapshot API", url=f"http://{API_HOST}:{API_PORT}")
+
+    async def sync_command_tree(self):
+        """Syncs the global command tree only when its fingerprint differs from the last sync."""
+        fingerprint = command_tree_fingerprint(self.tree)
+        try:
+            with open(COMMAND_HASH_FILE) as f:
+                last_fingerprint = f.read().strip()
+        except FileNotFoundError:
+            last_fingerprint = None
+
+        if fingerprint == last_fingerprint and not self.force_sync:
+            logger.info("Command tree unchanged, skipping sync")
+            return
 
         await self.tree.sync()
+        with open(COMMAND_HASH_FILE, "w") as f:
+            f.write(fingerprint)
+        logger.info("Command tree synced")
+
+    async def close(self):
+        if self.metrics_runner:
+            await self.metrics_runner.cleanup()
+        if self.api_runner:
+            await self.api_runner.cleanup()
+        await self.state.save(self.vatsim)
+        await super().close()
+        await self.vatsim.close()
+        if self.db:
+            await self.db.close()
 
 
     async def on_ready(self):
-        print(f'Logged in as {self.user} (ID: {self.user.id})')
-        print('-------')
+        if "ready" not in self.startup_timings:
+            self.record_startup_phase("ready", PROCESS_STARTED)
+            logger.info("Startup complete", **{f"{phase}_ms": round(seconds * 1000) for phase, seconds in self.startup_timings.items()})
+        logger.info("Logged in", user=str(self.user), user_id=self.user.id)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the VATSIM ATC bot.")
+    parser.add_argument("--sync", action="store_true", help="Sync slash commands with Discord even if they have not changed.")
+    args = parser.parse_args()
 
-bot = MyBot()
-bot.run(DISCORD_TOKEN)
\ No newline at end of file
+    log.setup(LOG_LEVEL, LOG_FORMAT)
+    bot = MyBot(force_sync=args.sync)
+    # Without log_handler=None discord.py adds its own blocking stderr handler
+    bot.run(DISCORD_TOKEN, log_handler=None)
\ No newline at end of file
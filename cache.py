@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import metrics
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A dict-like cache whose entries expire after `ttl` seconds, evicting the least recently used past `maxsize`."""
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class GuildSettingsCache:
+    """Per-guild settings read through a TTLCache. Writes go through here so the cached copy is dropped.
+
+    A guild's settings are a dict; today that is just "manager_role_id"."""
+    def __init__(self, storage, maxsize: int = 1024, ttl: float = 300.0):
+        self.storage = storage
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get(self, guild_id: int) -> dict:
+        settings = self._cache.get(guild_id, _MISSING)
+        if settings is not _MISSING:
+            metrics.CACHE_REQUESTS.inc(cache="guild_settings", result="hit")
+            return settings
+        metrics.CACHE_REQUESTS.inc(cache="guild_settings", result="miss")
+        settings = {"manager_role_id": await self.storage.get_management_role(guild_id)}
+        self._cache.set(guild_id, settings)
+        return settings
+
+    async def get_management_role(self, guild_id: int) -> int | None:
+        return (await self.get(guild_id))["manager_role_id"]
+
+    async def set_management_role(self, guild_id: int, role_id: int):
+        await self.storage.set_management_role(guild_id, role_id)
+        self._cache.invalidate(guild_id)
+
+    def invalidate(self, guild_id: int):
+        self._cache.invalidate(guild_id)
@@ -0,0 +1,37 @@
+import os
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+import profiler
+
+MAX_ATTACHMENT_BYTES = 8 * 1024 * 1024
+
+class AdminCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @app_commands.command(name="profile", description="Sample the bot's event loop and produce a flamegraph file (bot owner only).")
+    @app_commands.describe(seconds="How long to sample for, in seconds.")
+    @app_commands.default_permissions(administrator=True)
+    async def profile(self, interaction: discord.Interaction, seconds: app_commands.Range[int, 1, 300] = 30):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can run the profiler.", ephemeral=True)
+            return
+        if profiler.is_running():
+            await interaction.response.send_message("A profile is already running.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        path, sample_count = await profiler.profile_event_loop(seconds)
+
+        message = f"✅ Collected {sample_count} samples over {seconds}s. Saved to `{path}` (folded stacks for flamegraph.pl or speedscope)."
+        if os.path.getsize(path) <= MAX_ATTACHMENT_BYTES:
+            await interaction.followup.send(message, file=discord.File(path), ephemeral=True)
+        else:
+            await interaction.followup.send(message, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(AdminCog(bot))
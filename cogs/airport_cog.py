@@ -4,72 +4,182 @@ from discord.ext import commands
 import datetime
 import aiohttp
 
-VATSIM_DATA_URL = "https://data.vatsim.net/v3/vatsim-data.json"
+import airports
+import metrics
+from cache import TTLCache
+from matching import callsign_prefixes
+from tracing import CommandTrace
+from .utils import stale_notice
+
+BANNED_FREQUENCIES = ("199.998", "199.997", "199.999")
+FLIGHTS_PER_PAGE = 20
+# Discord's limit on an embed field value
+FIELD_CHARACTERS = 1024
+
+
+def chunk_lines(lines: list, limit: int = FIELD_CHARACTERS) -> list:
+    """Joins lines into as few field values as fit Discord's field limit."""
+    chunks, current = [], ""
+    for line in lines:
+        if current and len(current) + len(line) + 1 > limit:
+            chunks.append(current)
+            current = ""
+        current += ("\n" if current else "") + line[:limit]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def flight_line(pilot: dict, arrow: str, other_end: str) -> str:
+    flight_plan = pilot['flight_plan']
+    aircraft = flight_plan.get('aircraft_short') or "?"
+    return f"**`{pilot['callsign']}`** {arrow} {flight_plan[other_end]} ({aircraft})"
+
+
+def airport_traffic(icao: str, snapshot) -> tuple:
+    """Returns (controllers, atis, departures, arrivals) for an airport, each sorted by callsign."""
+    # Controllers may use any of the airport's codes in their callsign (KLAX_TWR, LAX_APP)
+    prefixes = callsign_prefixes(icao)
+    controllers = sorted(
+        (c for c in snapshot.controllers if c['callsign'].startswith(prefixes) and c['frequency'] not in BANNED_FREQUENCIES),
+        key=lambda c: c['callsign']
+    )
+    atis_list = sorted((a for a in snapshot.atis if a['callsign'].startswith(prefixes)), key=lambda a: a['callsign'])
+
+    # Flight plans use the full ICAO
+    departures, arrivals = [], []
+    for pilot in snapshot.pilots:
+        flight_plan = pilot.get('flight_plan')
+        if not flight_plan:
+            continue
+        if flight_plan['departure'] == icao:
+            departures.append(pilot)
+        if flight_plan['arrival'] == icao:
+            arrivals.append(pilot)
+    departures.sort(key=lambda p: p['callsign'])
+    arrivals.sort(key=lambda p: p['callsign'])
+    return controllers, atis_list, departures, arrivals
+
+
+def render_activity(icao: str, snapshot) -> list:
+    """Renders every page of an airport's activity: an overview, then departures, then arrivals."""
+    controllers, atis_list, departures, arrivals = airport_traffic(icao, snapshot)
+    airport = airports.lookup(icao)
+    title = f"Activity at {icao} ({airport.name})" if airport else f"Activity at {icao}"
+    # Pages are shared by everyone asking about this snapshot, so they carry its time rather than the request's
+    timestamp = datetime.datetime.fromtimestamp(snapshot.fetched_at, datetime.timezone.utc)
+
+    def new_page() -> discord.Embed:
+        return discord.Embed(title=title, color=discord.Color.og_blurple(), timestamp=timestamp)
+
+    overview = new_page()
+    overview.add_field(name="📡 Controllers", value=str(len(controllers)), inline=True)
+    overview.add_field(name="🛫 Departures", value=str(len(departures)), inline=True)
+    overview.add_field(name="🛬 Arrivals", value=str(len(arrivals)), inline=True)
+    controller_lines = [f"**`{c['callsign']}`** ({c['frequency']}) - {c['name']}" for c in controllers]
+    for value in chunk_lines(controller_lines) or ["None"]:
+        overview.add_field(name="📡 Online Controllers", value=value, inline=False)
+    if atis_list:
+        for value in chunk_lines([f"**`{a['callsign']}`** ({a['frequency']})" for a in atis_list]):
+            overview.add_field(name="📄 Active ATIS", value=value, inline=False)
+    if not any([controllers, atis_list, departures, arrivals]):
+        overview.description = "No online activity found for this airport."
+    pages = [overview]
+
+    for name, flights, arrow, other_end in (("🛫 Departures", departures, "→", "arrival"), ("🛬 Arrivals", arrivals, "←", "departure")):
+        for start in range(0, len(flights), FLIGHTS_PER_PAGE):
+            batch = flights[start:start + FLIGHTS_PER_PAGE]
+            page = new_page()
+            label = f"{name} ({start + 1}-{start + len(batch)} of {len(flights)})"
+            for value in chunk_lines([flight_line(p, arrow, other_end) for p in batch]):
+                page.add_field(name=label, value=value, inline=False)
+            pages.append(page)
+
+    for number, page in enumerate(pages, start=1):
+        page.set_footer(text=f"Page {number}/{len(pages)}")
+    return pages
+
+
+class ActivityView(discord.ui.View):
+    """Previous/next buttons over pages that were already rendered; paging never touches the feed."""
+    def __init__(self, pages: list):
+        super().__init__(timeout=300)
+        self.pages = pages
+        self.index = 0
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index == len(self.pages) - 1
+
+    async def show(self, interaction: discord.Interaction, index: int):
+        self.index = index
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.pages[index], view=self)
+
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, max(self.index - 1, 0))
+
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, min(self.index + 1, len(self.pages) - 1))
+
 
 class AirportCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # (ICAO, snapshot version) -> rendered pages. Old versions are simply never asked for again and age out.
+        self.activity_pages = TTLCache(maxsize=256, ttl=300)
+
+    def get_activity_pages(self, icao: str, snapshot) -> list:
+        key = (icao, snapshot.version or snapshot.fetched_at)
+        pages = self.activity_pages.get(key)
+        if pages is not None:
+            metrics.CACHE_REQUESTS.inc(cache="activity_pages", result="hit")
+            return pages
+        metrics.CACHE_REQUESTS.inc(cache="activity_pages", result="miss")
+        # Rendering doesn't await, so concurrent queries for the same airport can't race to render it twice
+        pages = render_activity(icao, snapshot)
+        self.activity_pages.set(key, pages)
+        return pages
 
     @app_commands.command(name="activity", description="Shows all online activity for a specific airport.")
-    @app_commands.describe(icao="The 4-letter ICAO code of the airport (e.g., KLAX).")
+    @app_commands.describe(icao="The ICAO, FAA or IATA code of the airport (e.g., KLAX or LAX).")
     async def airport_activity(self, interaction: discord.Interaction, icao: str):
+        trace = CommandTrace(interaction)
         await interaction.response.defer(ephemeral=True)
-        icao = icao.upper()
+        trace.lap("defer")
+        # Accepts ICAO, FAA or IATA identifiers (LAX -> KLAX); flight plans use the ICAO code
+        icao = airports.normalize(icao)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200:
-                        await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
-                        return
-                    vatsim_data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError:
             await interaction.followup.send("An error occurred while trying to contact the VATSIM API.", ephemeral=True)
             return
+        if snapshot is None:
+            await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
+            return
+        trace.lap_fetch(snapshot)
 
-        # Handle both 4-letter and 3-letter identifiers
-        short_icao = icao[1:] if len(icao) == 4 else None
-        banned_frequencies = ["199.998", "199.997", "199.999"]
-
-        controllers = [
-            c for c in vatsim_data.get('controllers', []) 
-            if (c['callsign'].startswith(icao) or (short_icao and c['callsign'].startswith(short_icao)))
-            and c['frequency'] not in banned_frequencies
-        ]
-        atis_list = [a for a in vatsim_data.get('atis', []) if a['callsign'].startswith(icao) or (short_icao and a['callsign'].startswith(short_icao))]
-        
-        # Flight plans use the full ICAO
-        departures = [p for p in vatsim_data.get('pilots', []) if p.get('flight_plan') and p['flight_plan']['departure'] == icao]
-        arrivals = [p for p in vatsim_data.get('pilots', []) if p.get('flight_plan') and p['flight_plan']['arrival'] == icao]
-
-        embed = discord.Embed(
-            title=f"Activity at {icao}",
-            color=discord.Color.og_blurple(),
-            timestamp=datetime.datetime.now(datetime.timezone.utc)
-        )
-
-        if controllers:
-            controller_text = "\n".join(f"**`{c['callsign']}`** ({c['frequency']}) - {c['name']}" for c in sorted(controllers, key=lambda x: x['callsign']))
-            embed.add_field(name="📡 Online Controllers", value=controller_text, inline=False)
+        pages = self.get_activity_pages(icao, snapshot)
+        trace.lap("filter")
+        if len(pages) == 1:
+            await interaction.followup.send(stale_notice(snapshot), embed=pages[0], ephemeral=True)
         else:
-            embed.add_field(name="📡 Online Controllers", value="None", inline=False)
-
-        if atis_list:
-            atis_text = "\n".join(f"**`{a['callsign']}`** ({a['frequency']})" for a in sorted(atis_list, key=lambda x: x['callsign']))
-            embed.add_field(name="📄 Active ATIS", value=atis_text, inline=False)
-
-        if departures:
-            dep_text = " ".join(f"`{p['callsign']}`" for p in departures[:20]) # Limit to 20 to avoid huge fields
-            embed.add_field(name="🛫 Departures", value=dep_text, inline=False)
+            await interaction.followup.send(stale_notice(snapshot), embed=pages[0], view=ActivityView(pages), ephemeral=True)
+        trace.finish()
 
-        if arrivals:
-            arr_text = " ".join(f"`{p['callsign']}`" for p in arrivals[:20])
-            embed.add_field(name="🛬 Arrivals", value=arr_text, inline=False)
-
-        if not any([controllers, atis_list, departures, arrivals]):
-            embed.description = "No online activity found for this airport."
-
-        await interaction.followup.send(embed=embed, ephemeral=True)
+    @airport_activity.autocomplete('icao')
+    async def airport_activity_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        snapshot = self.bot.vatsim.snapshot
+        if not snapshot:
+            return []
+        return [
+            app_commands.Choice(name=icao, value=icao)
+            for icao in snapshot.airport_index.search(current, limit=25)
+        ]
 
 
 async def setup(bot: commands.Bot):
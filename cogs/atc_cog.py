@@ -9,20 +9,24 @@ from typing import List
 import asyncio
 
 
-from database import DatabaseManager
+import metrics
+from indexes import GuildPrefixIndex
+from log import get_logger
+from matching import RuleMatcher, callsign_prefixes, parse_identifier
+from state import checkpoint, embed_fingerprint
 from .utils import create_controller_embed
 
-VATSIM_DATA_URL = "https://data.vatsim.net/v3/vatsim-data.json"
+log = get_logger(__name__)
 
 # --- Permission Check from db ---
 async def check_manager_permissions(interaction: discord.Interaction) -> bool:
     if interaction.user.guild_permissions.administrator:
         return True
     
-    db_manager = DatabaseManager()
-    manager_role_id = await db_manager.get_management_role(interaction.guild_id)
+    # Cached per guild, and get_role checks the member's role ids without building Role objects
+    manager_role_id = await interaction.client.guild_settings.get_management_role(interaction.guild_id)
     
-    if manager_role_id and any(role.id == manager_role_id for role in interaction.user.roles):
+    if manager_role_id and interaction.user.get_role(manager_role_id) is not None:
         return True
         
     await interaction.response.send_message("You need to be an Administrator or have the manager role to use this command.", ephemeral=True)
@@ -33,7 +37,7 @@ class RemoveNotificationView(discord.ui.View):
     def __init__(self, bot: commands.Bot, notifications: list):
         super().__init__(timeout=180)
         self.bot = bot
-        self.db_manager = DatabaseManager()
+        self.db_manager = bot.db
         
         options = []
         for notification in notifications:
@@ -57,29 +61,44 @@ class RemoveNotificationView(discord.ui.View):
 class AtcCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db_manager = DatabaseManager()
+        self.db_manager = bot.db
+        self.tracker_index = GuildPrefixIndex()
         self.vatsim_checker.start()
         self.previously_notified = set()
+        self.rule_matcher = RuleMatcher()
+        self._matcher_rules = None
+        # Paces tracker edits; the benchmarks swap in a recorder rather than wait it out
+        self.pause = asyncio.sleep
         self.update_controller_trackers.start()
 
+    async def cog_load(self):
+        # Autocomplete is served from memory; the index is kept in sync on every add/remove
+        trackers = await self.db_manager.get_all_controller_trackers()
+        self.tracker_index.load((t[1], t[4]) for t in trackers)
+
     def cog_unload(self):
         self.vatsim_checker.cancel()
         self.update_controller_trackers.cancel()
 
+    @commands.Cog.listener()
+    async def on_storage_purged(self):
+        # Rules are re-read every cycle already; only the autocomplete index needs rebuilding
+        await self.cog_load()
+
     atcnotify = app_commands.Group(name="atcnotify", description="Commands for ATC notifications.")
 
     @tasks.loop(minutes=4)
+    @metrics.timed_loop("vatsim_checker")
+    @checkpoint("vatsim_checker")
     async def vatsim_checker(self):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200:
-                        print(f"Error fetching VATSIM data: Status {response.status}")
-                        return
-                    data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError as e:
-            print(f"AIOHTTP Error fetching VATSIM data: {e}")
+            log.warning("Error fetching VATSIM data", loop="vatsim_checker", error=e)
             return
+        if snapshot is None:
+            return
+        data = snapshot.data
 
         try:
             total_guilds = len(self.bot.guilds)
@@ -90,37 +109,34 @@ class AtcCog(commands.Cog):
             activity = discord.Activity(name=activity_string, type=discord.ActivityType.watching)
             await self.bot.change_presence(activity=activity)
         except Exception as e:
-            print(f"Error updating presence: {e}")
+            log.warning("Error updating presence", error=e)
 
         current_controllers = {controller['callsign'] for controller in data.get('controllers', [])}
         all_rules = await self.db_manager.get_all_notifications()
+        metrics.NOTIFICATION_RULES.set(len(all_rules))
         
         pending_notifications = defaultdict(list)
 
         banned_frequencies = ["199.998", "199.997", "199.999"]
-        
-        for rule in all_rules:
-            rule_id, guild_id, airport_icao, channel_id, role_id, delete_pref = rule
-            for controller in data.get('controllers', []):
-                callsign = controller['callsign']
-                
-                if "OBS" in callsign.upper() or controller['frequency'] in banned_frequencies:
-                    continue
 
-                db_identifier = airport_icao
-                callsign_base = callsign.split('_')[0]
+        # Recompile the trie only when the rules themselves have changed
+        if all_rules != self._matcher_rules:
+            self.rule_matcher = RuleMatcher((rule[0], rule[2]) for rule in all_rules)
+            self._matcher_rules = all_rules
+        rules_by_id = {rule[0]: rule for rule in all_rules}
 
-                # Create a set of valid identifiers to check against
-                identifiers_to_check = {db_identifier}
-                # If user entered a 4-letter ICAO, also check for its 3-letter version
-                if len(db_identifier) == 4:
-                    identifiers_to_check.add(db_identifier[1:])
+        for controller in data.get('controllers', []):
+            callsign = controller['callsign']
 
-                match_found = callsign_base in identifiers_to_check
-                
-                if match_found and (rule_id, callsign) not in self.previously_notified:
-                    key = (rule_id, guild_id, channel_id, role_id, airport_icao, delete_pref)
-                    pending_notifications[key].append(controller)
+            if "OBS" in callsign.upper() or controller['frequency'] in banned_frequencies:
+                continue
+
+            for rule_id in self.rule_matcher.match(callsign):
+                if (rule_id, callsign) in self.previously_notified:
+                    continue
+                _, guild_id, airport_icao, channel_id, role_id, delete_pref = rules_by_id[rule_id]
+                key = (rule_id, guild_id, channel_id, role_id, airport_icao, delete_pref)
+                pending_notifications[key].append(controller)
         
         for (rule_id, guild_id, channel_id, role_id, airport_icao, delete_pref), controllers_list in pending_notifications.items():
             guild = self.bot.get_guild(guild_id)
@@ -129,7 +145,7 @@ class AtcCog(commands.Cog):
             if not all([guild, channel]): 
                 continue
 
-            print(f"!!! MATCH FOUND: {[c['callsign'] for c in controllers_list]} for rule ID {rule_id}. Sending combined notification...")
+            log.info("Rule matched, sending notification", guild_id=guild_id, rule_id=rule_id, callsigns=",".join(c['callsign'] for c in controllers_list))
 
             title = f"📡 ATC Online at {airport_icao}"
             description = ""
@@ -138,27 +154,27 @@ class AtcCog(commands.Cog):
             
             embed = discord.Embed(title=title, description=description, color=discord.Color.blue(), timestamp=datetime.datetime.now(datetime.timezone.utc))
             
-            prefixes_to_check = {airport_icao}
-            # If the identifier is a 3-letter code (common for US airports), also check for its 'K'-prefixed version.
-            if len(airport_icao) == 3:
-                prefixes_to_check.add(f"K{airport_icao}")
-            # If the identifier is a 4-letter 'K' code, also check for its 3-letter version.
-            elif len(airport_icao) == 4 and airport_icao.startswith('K'):
-                prefixes_to_check.add(airport_icao[1:])
+            # Includes the 'K'-prefixed form of 3-letter US codes and the 3-letter form of 'K' codes
+            prefixes_to_check = callsign_prefixes(airport_icao)
+            covers_many = "," in airport_icao or "*" in airport_icao
 
             matching_atis_list = []
             for atis in data.get('atis', []):
-                if any(atis['callsign'].startswith(prefix) for prefix in prefixes_to_check):
+                if atis['callsign'].startswith(prefixes_to_check):
                     matching_atis_list.append(atis)
 
 
             # If an ATIS was found for the airport
             if matching_atis_list:
                 for atis in sorted(matching_atis_list, key=lambda a: a['callsign']):
-                    atis_type_name = atis['callsign'].replace(f"{airport_icao}_", "").replace("_ATIS", "")
+                    atis_base = atis['callsign'].split('_')[0]
+                    atis_type_name = atis['callsign'].replace(f"{atis_base}_", "").replace("_ATIS", "")
                     if atis_type_name in ['D', 'A']:
                         atis_type_name = {'D': 'Departure', 'A': 'Arrival'}.get(atis_type_name, atis_type_name)
                     atis_field_name = f"ATIS ({atis_type_name})" if atis_type_name else "ATIS"
+                    if covers_many:
+                        # Rules covering several airports need to say which one this ATIS is for
+                        atis_field_name = f"{atis_base} {atis_field_name}"
                     
                     atis_lines = atis.get('text_atis')
                     if atis_lines:
@@ -198,7 +214,7 @@ class AtcCog(commands.Cog):
                     if delete_pref:
                         await self.db_manager.add_active_notification(rule_id, sent_message.id, channel.id, controller['callsign'])
             except discord.Forbidden:
-                print(f"Error: Missing permissions to send message in G:{guild.id} C:{channel.id}")
+                log.warning("Missing permissions to send notification", guild_id=guild.id, channel_id=channel.id, rule_id=rule_id)
                 try:
                     owner = guild.owner
                     if not owner: # Fallback if owner is not cached
@@ -215,12 +231,12 @@ class AtcCog(commands.Cog):
                     error_embed.set_footer(text="Please update my role permissions in that channel.")
                     
                     await owner.send(embed=error_embed)
-                    print(f"--> Sent permission error DM to owner {owner} for guild {guild.id}")
+                    log.info("Sent permission error DM to guild owner", guild_id=guild.id, owner_id=owner.id)
                 except (discord.Forbidden, discord.HTTPException, AttributeError):
                     # If it fails to send not much I can do sucks to suck :/
-                    print(f"--> Could not send permission error DM to owner of guild {guild.id}.")
+                    log.warning("Could not send permission error DM to guild owner", guild_id=guild.id)
             except Exception as e:
-                print(f"An error occurred sending notification: {e}")
+                log.exception("Error sending notification", guild_id=guild_id, channel_id=channel_id, rule_id=rule_id)
 
         offline_callsigns = {notified[1] for notified in self.previously_notified} - current_controllers
         for callsign in offline_callsigns:
@@ -233,27 +249,30 @@ class AtcCog(commands.Cog):
                     if channel:
                         message = await channel.fetch_message(message_id)
                         await message.delete()
-                        print(f"Deleted notification message {message_id} for offline controller {callsign}.")
+                        log.info("Deleted notification for offline controller", channel_id=channel_id, message_id=message_id, callsign=callsign)
                 except (discord.NotFound, discord.Forbidden):
                     pass
                 except Exception as e:
-                    print(f"Could not delete notification message {message_id}: {e}")
+                    log.warning("Could not delete notification message", channel_id=channel_id, message_id=message_id, error=e)
                 
                 await self.db_manager.remove_active_notification_by_callsign(callsign)
 
         self.previously_notified = {notified for notified in self.previously_notified if notified[1] in current_controllers}
+        self.bot.state.previously_notified = self.previously_notified
 
     @vatsim_checker.before_loop
     async def before_vatsim_checker(self):
         await self.bot.wait_until_ready()
-        print("Rehydrating notification cache from database...")
+        log.info("Rehydrating notification cache from database")
         try:
             # This loads already-notified controllers (for deletion) into memory on startup
             active_pairs = await self.db_manager.get_all_active_rule_callsign_pairs()
-            self.previously_notified = set(active_pairs)
-            print(f"--> Rehydrated {len(self.previously_notified)} active notifications from the database.")
+            # After a warm restart this also covers rules without delete_message, which are not in the DB
+            self.previously_notified = set(active_pairs) | self.bot.state.previously_notified
+            log.info("Rehydrated active notifications", count=len(self.previously_notified))
         except Exception as e:
-            print(f"Error during notification cache rehydration: {e}")
+            log.exception("Error rehydrating the notification cache")
+        await self.bot.state.wait_for_cursor("vatsim_checker", self.vatsim_checker.minutes * 60)
 
     # --- Commands ---
     @app_commands.command(name="help", description="Shows information about the ATC Notifier Bot.")
@@ -263,7 +282,7 @@ class AtcCog(commands.Cog):
             description="This bot provides notifications when VATSIM ATC for a specific airport comes online.",
             color=discord.Color.dark_green()
         )
-        embed.add_field(name="/atcnotify add `identifier` `channel` `[role]` `[delete_message]`", value="Sets up a new notification. The `role` and `delete_message` parameters are optional. Requires manager permissions.", inline=False)
+        embed.add_field(name="/atcnotify add `identifier` `channel` `[role]` `[delete_message]`", value="Sets up a new notification. `identifier` can list several airports (`KJFK,KLGA,KEWR`) or use a wildcard (`EG*`). The `role` and `delete_message` parameters are optional. Requires manager permissions.", inline=False)
         embed.add_field(name="/atcnotify remove", value="Shows a list of your server's notifications to remove one. Requires manager permissions.", inline=False)
         embed.add_field(name="/atcnotify list", value="Lists all currently configured notifications for this server.", inline=False)
         embed.add_field(name="/atcnotify config-role `role`", value="Sets a role that can manage notifications (Admin only).", inline=False)
@@ -271,15 +290,20 @@ class AtcCog(commands.Cog):
         embed.add_field(name="/untrack-pilot `cid`", value="Stops tracking a pilot by CID.", inline=False)
         embed.add_field(name="/track-controller `cid` `channel` `[role]` `[delete_on_offline]`", value="Tracks a controller by CID and posts updates in the specified channel. The `role` and `delete_on_offline` parameters are optional.", inline=False)
         embed.add_field(name="/untrack-controller `cid`", value="Stops tracking a controller by CID.", inline=False)
+        embed.add_field(name="/trackers import `file` `[channel]` `[kind]`", value="Creates up to 500 pilot and controller trackers from a CSV or JSON file. `/trackers export` downloads them in the same format. Requires manager permissions.", inline=False)
         embed.add_field(name="/lookup atc `callsign`", value="Looks up a specific online controller.", inline=False)
         embed.add_field(name="/lookup atis `airport`", value="Gets the current ATIS for an airport.", inline=False)
+        embed.add_field(name="/lookup search `query`", value="Finds online pilots and controllers by part of a name, callsign or CID, even misspelt.", inline=False)
+        embed.add_field(name="/lookup frequency `frequency`", value="Shows the controllers on a frequency and the pilots tuned to it.", inline=False)
+        embed.add_field(name="/atis subscribe `airport` `channel`", value="Posts an ATIS board that updates whenever the ATIS changes. Requires manager permissions.", inline=False)
+        embed.add_field(name="/board create `name` `channel`", value="Posts a roster board that shows up to 100 members in one live message. Manage it with `/board add`, `/board remove` and `/board delete`. Requires manager permissions.", inline=False)
         embed.add_field(name="activity", value="Shows all online activity for a specific airport.", inline=False)
         embed.set_footer(text="Made by Im2Slothy#0 - Support Discord https://discord.gg/RQBhmWEzTx")
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @atcnotify.command(name="add", description="Add an ATC Airport or Center notification.")
     @app_commands.describe(
-        identifier="The airport ICAO or Center prefix (e.g., KORD, CLE).", 
+        identifier="Airports or prefixes, comma-separated, * for wildcards (e.g., KORD, ZNY, KJFK,KLGA,KEWR, EG*).", 
         channel="The channel to send notifications in.", 
         role="The role to ping for the notification (Optional).",
         delete_message="Set to True to delete the notification message when the controller goes offline."
@@ -289,12 +313,14 @@ class AtcCog(commands.Cog):
         # Defer the interaction immediately.
         await interaction.response.defer()
 
-        if len(identifier) < 3 or len(identifier) > 4:
-            await interaction.followup.send("The identifier must be 3 or 4 letters long.", ephemeral=True)
+        try:
+            terms = parse_identifier(identifier)
+        except ValueError as e:
+            await interaction.followup.send(str(e), ephemeral=True)
             return
         
         role_id = role.id if role else None
-        identifier_upper = identifier.upper()
+        identifier_upper = ",".join(terms)
 
         # Check if this exact notification already exists to prevent duplicates.
         exists = await self.db_manager.notification_exists(interaction.guild_id, identifier_upper, channel.id, role_id)
@@ -348,7 +374,7 @@ class AtcCog(commands.Cog):
     @app_commands.describe(role="The role that will be allowed to manage notifications.")
     @app_commands.checks.has_permissions(administrator=True)
     async def config_role(self, interaction: discord.Interaction, role: discord.Role):
-        await self.db_manager.set_management_role(interaction.guild_id, role.id)
+        await self.bot.guild_settings.set_management_role(interaction.guild_id, role.id)
         await interaction.response.send_message(f"✅ The {role.mention} role can now manage ATC notifications.", ephemeral=True)
         
     @app_commands.command(name="track-controller", description="Continuously track a controller's status in a specific channel.")
@@ -376,7 +402,8 @@ class AtcCog(commands.Cog):
         
         role_id = role.id if role else None
         await self.db_manager.add_controller_tracker(interaction.guild_id, channel.id, message.id, cid, delete_on_offline, role_id)
-        
+        self.tracker_index.add(interaction.guild_id, cid)
+
         response_text = f"✅ Controller tracker for CID `{cid}` created in {channel.mention}."
         if role:
             response_text += f"\n*I will ping {role.mention} when the controller comes online.*"
@@ -410,41 +437,36 @@ class AtcCog(commands.Cog):
             pass
 
         await self.db_manager.remove_controller_tracker(tracker_id)
+        self.tracker_index.remove(interaction.guild_id, cid)
         await interaction.followup.send(f"✅ The controller tracker for CID `{cid}` has been removed.", ephemeral=True)
 
     @untrack_controller.autocomplete('cid')
     async def untrack_controller_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        trackers = await self.db_manager.get_all_controller_trackers()
-        guild_trackers = [t for t in trackers if t[1] == interaction.guild_id]
-
-        choices = [
-            app_commands.Choice(name=f"CID: {tracker[4]}", value=str(tracker[4]))
-            for tracker in guild_trackers
+        # limit of 25... Discord L
+        return [
+            app_commands.Choice(name=f"CID: {cid}", value=cid)
+            for cid in self.tracker_index.search(interaction.guild_id, current, limit=25)
         ]
 
-        # Filter choices based on what the user is currently typing
-        if current:
-            return [choice for choice in choices if current.lower() in choice.value.lower()]
-        
-        return choices[:25] # limit of 25... Discord L
-
     # --- BACKGROUND LOOP FOR CONTROLLER TRACKING ---
 
     @tasks.loop(minutes=4)
+    @metrics.timed_loop("update_controller_trackers")
+    @checkpoint("update_controller_trackers")
     async def update_controller_trackers(self):
         all_trackers = await self.db_manager.get_all_controller_trackers()
+        metrics.TRACKERS.set(len(all_trackers), kind="controller")
         if not all_trackers:
             return
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200: return
-                    vatsim_data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError:
             return
+        if snapshot is None: return
             
-        controllers_by_cid = {str(c['cid']): c for c in vatsim_data.get('controllers', [])}
+        controllers_by_cid = snapshot.controllers_by_cid
+        transceivers_by_callsign = snapshot.transceivers_by_callsign
 
         for tracker_data in all_trackers:
             tracker_id, guild_id, channel_id, message_id, cid, delete_on_offline, role_id, ping_sent = tracker_data
@@ -452,12 +474,13 @@ class AtcCog(commands.Cog):
             channel = self.bot.get_channel(channel_id)
             if not channel:
                 await self.db_manager.remove_controller_tracker(tracker_id)
+                self.tracker_index.remove(guild_id, cid)
                 continue
 
             controller_data = controllers_by_cid.get(cid)
 
             if controller_data: # Controller is ONLINE
-                embed = create_controller_embed(controller_data)
+                embed = create_controller_embed(controller_data, transceivers_by_callsign.get(controller_data['callsign'].upper()))
                 content_to_send = None
 
                 if role_id and not ping_sent:
@@ -468,21 +491,28 @@ class AtcCog(commands.Cog):
                             content_to_send = role.mention
                     await self.db_manager.set_controller_tracker_ping_status(tracker_id, True)
 
+                fingerprint = embed_fingerprint(content_to_send, embed)
+                if message_id and self.bot.state.tracker_unchanged("controller", tracker_id, message_id, fingerprint):
+                    continue # The message already shows this, no need to touch Discord
+
                 if message_id:
                     try:
                         message = await channel.fetch_message(message_id)
                         await message.edit(content=content_to_send, embed=embed)
-                        await asyncio.sleep(1) 
+                        self.bot.state.remember_tracker("controller", tracker_id, message_id, fingerprint)
+                        await self.pause(1)
                     except discord.NotFound:
                         # Message was deleted, so we'll post a new one
                         new_message = await channel.send(content=content_to_send, embed=embed)
                         await self.db_manager.update_tracker_message(tracker_id, new_message.id)
+                        self.bot.state.remember_tracker("controller", tracker_id, new_message.id, fingerprint)
                     except discord.Forbidden:
                         continue 
                 else: # No message_id, means we need to post a new one
                     try:
                         new_message = await channel.send(content=content_to_send, embed=embed)
                         await self.db_manager.update_tracker_message(tracker_id, new_message.id)
+                        self.bot.state.remember_tracker("controller", tracker_id, new_message.id, fingerprint)
                     except discord.Forbidden:
                         continue
 
@@ -491,21 +521,26 @@ class AtcCog(commands.Cog):
                     await self.db_manager.set_controller_tracker_ping_status(tracker_id, False)
 
                 if message_id:
+                    if not delete_on_offline:
+                        embed = discord.Embed(
+                            title="📡 Controller Offline",
+                            description=f"The controller with CID `{cid}` is not currently connected to VATSIM.",
+                            color=discord.Color.red(),
+                            timestamp=datetime.datetime.now(datetime.timezone.utc)
+                        )
+                        embed.set_footer(text="Last Updated")
+                        fingerprint = embed_fingerprint(None, embed)
+                        if self.bot.state.tracker_unchanged("controller", tracker_id, message_id, fingerprint):
+                            continue
                     try:
                         message = await channel.fetch_message(message_id)
                         if delete_on_offline:
                             await message.delete()
                             await self.db_manager.clear_tracker_message(tracker_id)
                         else:
-                            embed = discord.Embed(
-                                title="📡 Controller Offline",
-                                description=f"The controller with CID `{cid}` is not currently connected to VATSIM.",
-                                color=discord.Color.red(),
-                                timestamp=datetime.datetime.now(datetime.timezone.utc)
-                            )
-                            embed.set_footer(text="Last Updated")
                             await message.edit(content=None, embed=embed)
-                            await asyncio.sleep(2)
+                            self.bot.state.remember_tracker("controller", tracker_id, message_id, fingerprint)
+                            await self.pause(2)
                     except (discord.NotFound, discord.Forbidden):
                         # If we can't find or access the message, clear it from the DB
                         await self.db_manager.clear_tracker_message(tracker_id)
@@ -513,27 +548,26 @@ class AtcCog(commands.Cog):
     @update_controller_trackers.before_loop
     async def before_update_controller_trackers(self):
         await self.bot.wait_until_ready()
+        await self.bot.state.wait_for_cursor("update_controller_trackers", self.update_controller_trackers.minutes * 60)
 
     # --- HELPER METHODS FOR CONTROLLER TRACKING ---
     
     async def update_specific_controller_tracker(self, message_id: int, channel_id: int, cid: str):
         """Manually triggers an update for a single controller tracker."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200: return
-                    vatsim_data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError:
             return
+        if snapshot is None: return
 
-        controller_data = next((c for c in vatsim_data.get('controllers', []) if str(c['cid']) == cid), None)
+        controller_data = snapshot.controllers_by_cid.get(cid)
         
         channel = self.bot.get_channel(channel_id)
         if not channel: return
         try:
             message = await channel.fetch_message(message_id)
             if controller_data:
-                embed = create_controller_embed(controller_data)
+                embed = create_controller_embed(controller_data, snapshot.transceivers_by_callsign.get(controller_data['callsign'].upper()))
                 # We don't handle pings here since this is a manual, one-off update
                 await message.edit(content=None, embed=embed)
             else:
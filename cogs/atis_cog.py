@@ -0,0 +1,222 @@
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+import aiohttp
+import asyncio
+import hashlib
+
+import metrics
+from log import get_logger
+from matching import callsign_prefixes
+from .atc_cog import check_manager_permissions
+from .utils import create_atis_board_embed
+
+log = get_logger(__name__)
+
+
+def board_hash(atis_list: list, atis_hashes: dict) -> str:
+    """Hashes the set of ATIS shown on a board, from the per-callsign hashes the snapshot already computed."""
+    parts = sorted(f"{atis['callsign']}:{atis_hashes[atis['callsign']]}" for atis in atis_list)
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+class AtisCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.db_manager = bot.db
+        # Subscription id -> [id, guild_id, channel_id, airport_icao, message_id, atis_hash]
+        self.subscriptions = {}
+        # Per-callsign ATIS hashes from the previous cycle, None until the first one has run
+        self.previous_hashes = None
+        # Airport -> the board hash computed for it last cycle, reused while none of its ATIS change
+        self.board_hashes = {}
+        self.update_atis_boards.start()
+
+    async def cog_load(self):
+        for subscription in await self.db_manager.get_all_atis_subscriptions():
+            self.subscriptions[subscription[0]] = list(subscription)
+        metrics.ATIS_SUBSCRIPTIONS.set(len(self.subscriptions))
+
+    def cog_unload(self):
+        self.update_atis_boards.cancel()
+
+    @commands.Cog.listener()
+    async def on_storage_purged(self):
+        self.subscriptions.clear()
+        await self.cog_load()
+
+    atis = app_commands.Group(name="atis", description="Live ATIS boards that update when the ATIS changes.")
+
+    def matching_atis(self, snapshot, airport: str) -> list:
+        prefixes = callsign_prefixes(airport)
+        return [atis for atis in snapshot.atis if atis['callsign'].startswith(prefixes)]
+
+    async def post_board(self, subscription: list, embed: discord.Embed, new_hash: str):
+        """Edits the board message (or posts a new one) and records what it now shows."""
+        subscription_id, guild_id, channel_id, airport, message_id, _ = subscription
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            log.info("Channel not found, removing ATIS board", guild_id=guild_id, channel_id=channel_id, subscription_id=subscription_id)
+            await self.db_manager.remove_atis_subscription(subscription_id)
+            self.subscriptions.pop(subscription_id, None)
+            return
+
+        try:
+            if message_id:
+                try:
+                    # A partial message saves fetching the old one just to edit it
+                    await channel.get_partial_message(message_id).edit(embed=embed)
+                except discord.NotFound:
+                    message_id = None
+            if not message_id:
+                message = await channel.send(embed=embed)
+                message_id = message.id
+        except discord.Forbidden:
+            log.warning("Missing permissions to update ATIS board", guild_id=guild_id, channel_id=channel_id, subscription_id=subscription_id)
+            return
+        except discord.HTTPException as e:
+            # The stored hash stays behind, so the next cycle tries this board again
+            log.warning("Error updating ATIS board", guild_id=guild_id, channel_id=channel_id, subscription_id=subscription_id, error=e)
+            return
+
+        subscription[4], subscription[5] = message_id, new_hash
+        await self.db_manager.update_atis_subscription(subscription_id, message_id, new_hash)
+
+    @tasks.loop(minutes=1)
+    @metrics.timed_loop("update_atis_boards")
+    async def update_atis_boards(self):
+        if not self.subscriptions:
+            return
+        try:
+            snapshot = await self.bot.vatsim.fetch()
+        except aiohttp.ClientError as e:
+            log.warning("Error fetching VATSIM data", loop="update_atis_boards", error=e)
+            return
+        if snapshot is None:
+            return
+
+        current_hashes = snapshot.atis_hashes
+        previous_hashes = self.previous_hashes
+        self.previous_hashes = current_hashes
+
+        changed = None
+        if previous_hashes is not None:
+            changed = {
+                callsign for callsign in current_hashes.keys() | previous_hashes.keys()
+                if current_hashes.get(callsign) != previous_hashes.get(callsign)
+            }
+
+        by_airport = {}
+        for subscription in self.subscriptions.values():
+            by_airport.setdefault(subscription[3], []).append(subscription)
+
+        board_hashes = {}
+        for airport, subscriptions in by_airport.items():
+            atis_list = None
+            new_hash = self.board_hashes.get(airport)
+            # Only airports whose ATIS changed since last cycle need their board hash recomputed
+            if new_hash is None or changed is None or any(callsign.startswith(callsign_prefixes(airport)) for callsign in changed):
+                atis_list = self.matching_atis(snapshot, airport)
+                new_hash = board_hash(atis_list, current_hashes)
+            board_hashes[airport] = new_hash
+
+            embed = None
+            for subscription in subscriptions:
+                # Compared per board, so one that failed to post (or was stale at startup) is retried
+                # even when its airport's ATIS hasn't changed since
+                if subscription[5] == new_hash:
+                    continue
+                if embed is None:
+                    if atis_list is None:
+                        atis_list = self.matching_atis(snapshot, airport)
+                    embed = create_atis_board_embed(airport, atis_list)
+                await self.post_board(subscription, embed, new_hash)
+                await asyncio.sleep(1)
+        self.board_hashes = board_hashes
+
+        metrics.ATIS_SUBSCRIPTIONS.set(len(self.subscriptions))
+
+    @update_atis_boards.before_loop
+    async def before_update_atis_boards(self):
+        await self.bot.wait_until_ready()
+
+    @atis.command(name="subscribe", description="Post an ATIS board for an airport that updates whenever its ATIS changes.")
+    @app_commands.describe(airport="The ICAO code of the airport (e.g., KPHL).", channel="The channel to post the board in.")
+    @app_commands.check(check_manager_permissions)
+    async def subscribe(self, interaction: discord.Interaction, airport: str, channel: discord.TextChannel):
+        await interaction.response.defer(ephemeral=True)
+
+        airport = airport.upper()
+        if len(airport) < 3 or len(airport) > 4 or not airport.isalnum():
+            await interaction.followup.send("The airport must be a 3 or 4 letter code.", ephemeral=True)
+            return
+        if any(s[1:4] == [interaction.guild_id, channel.id, airport] for s in self.subscriptions.values()):
+            await interaction.followup.send(f"There is already an ATIS board for **{airport}** in {channel.mention}.", ephemeral=True)
+            return
+
+        try:
+            snapshot = await self.bot.vatsim.fetch()
+        except aiohttp.ClientError:
+            await interaction.followup.send("An error occurred while trying to contact the VATSIM API.", ephemeral=True)
+            return
+        if snapshot is None:
+            await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
+            return
+
+        atis_list = self.matching_atis(snapshot, airport)
+        try:
+            message = await channel.send(embed=create_atis_board_embed(airport, atis_list))
+        except discord.Forbidden:
+            await interaction.followup.send(f"I don't have permission to send messages in {channel.mention}.", ephemeral=True)
+            return
+
+        new_hash = board_hash(atis_list, snapshot.atis_hashes)
+        subscription_id = await self.db_manager.add_atis_subscription(interaction.guild_id, channel.id, airport, message.id, new_hash)
+        self.subscriptions[subscription_id] = [subscription_id, interaction.guild_id, channel.id, airport, message.id, new_hash]
+        metrics.ATIS_SUBSCRIPTIONS.set(len(self.subscriptions))
+        await interaction.followup.send(f"✅ The ATIS board for **{airport}** in {channel.mention} will update whenever the ATIS changes.", ephemeral=True)
+
+    @atis.command(name="unsubscribe", description="Stop updating this server's ATIS boards for an airport.")
+    @app_commands.describe(airport="The ICAO code of the airport.")
+    @app_commands.check(check_manager_permissions)
+    async def unsubscribe(self, interaction: discord.Interaction, airport: str):
+        airport = airport.upper()
+        removed = [s for s in self.subscriptions.values() if s[1] == interaction.guild_id and s[3] == airport]
+        if not removed:
+            await interaction.response.send_message(f"There is no ATIS board for **{airport}** in this server.", ephemeral=True)
+            return
+        for subscription in removed:
+            await self.db_manager.remove_atis_subscription(subscription[0])
+            self.subscriptions.pop(subscription[0], None)
+        metrics.ATIS_SUBSCRIPTIONS.set(len(self.subscriptions))
+        await interaction.response.send_message(f"✅ Stopped updating {len(removed)} ATIS board(s) for **{airport}**.", ephemeral=True)
+
+    @atis.command(name="list", description="List this server's ATIS boards.")
+    async def list_boards(self, interaction: discord.Interaction):
+        boards = [s for s in self.subscriptions.values() if s[1] == interaction.guild_id]
+        if not boards:
+            await interaction.response.send_message("There are no ATIS boards in this server.", ephemeral=True)
+            return
+        description = "\n".join(f"• **{s[3]}** -> <#{s[2]}>" for s in sorted(boards, key=lambda s: s[3]))
+        embed = discord.Embed(title=f"ATIS Boards for {interaction.guild.name}", description=description, color=discord.Color.og_blurple())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @subscribe.autocomplete('airport')
+    async def subscribe_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        snapshot = self.bot.vatsim.snapshot
+        if not snapshot:
+            return []
+        return [
+            app_commands.Choice(name=icao, value=icao)
+            for icao in snapshot.airport_index.search(current, limit=25)
+        ]
+
+    @unsubscribe.autocomplete('airport')
+    async def unsubscribe_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        current = current.upper()
+        airports = sorted({s[3] for s in self.subscriptions.values() if s[1] == interaction.guild_id and s[3].startswith(current)})
+        return [app_commands.Choice(name=icao, value=icao) for icao in airports[:25]]
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(AtisCog(bot))
@@ -0,0 +1,292 @@
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+import aiohttp
+import asyncio
+import datetime
+import hashlib
+
+import metrics
+from log import get_logger
+from state import embed_fingerprint
+from .atc_cog import check_manager_permissions
+
+log = get_logger(__name__)
+
+MAX_MEMBERS = 100
+# Discord allows 10 embeds and 6000 characters of embed text per message
+MAX_EMBEDS = 10
+EMBED_CHARACTERS = 5800
+DESCRIPTION_CHARACTERS = 4000
+
+
+def member_line(cid: str, snapshot) -> tuple:
+    """Returns (sort_key, line) for one board member; online controllers first, then pilots."""
+    controller = snapshot.controllers_by_cid.get(cid)
+    if controller:
+        return (0, controller['callsign']), f"📡 **`{controller['callsign']}`** ({controller['frequency']}) - {controller['name']} (`{cid}`)"
+    pilot = snapshot.pilots_by_cid.get(cid)
+    if pilot:
+        flight_plan = pilot.get('flight_plan')
+        route = f" {flight_plan['departure']} → {flight_plan['arrival']}" if flight_plan else ""
+        # Rounded so a board isn't re-rendered for every few feet and knots
+        altitude = round(pilot['altitude'], -2)
+        return (1, pilot['callsign']), f"✈️ **`{pilot['callsign']}`**{route} · {altitude:,} ft · {pilot['groundspeed'] // 10 * 10} kts - {pilot['name']} (`{cid}`)"
+    return None, None
+
+
+def render_board(name: str, cids: list, snapshot) -> list:
+    """Renders the whole board as a few embeds for a single message."""
+    online = []
+    offline = []
+    for cid in cids:
+        sort_key, line = member_line(cid, snapshot)
+        if line:
+            online.append((sort_key, line))
+        else:
+            offline.append(cid)
+    online.sort()
+
+    lines = [line for _, line in online]
+    if offline:
+        lines.append(f"⚫ Offline: {', '.join(f'`{cid}`' for cid in sorted(offline))}")
+    if not lines:
+        lines.append("No members yet. Add some with `/board add`.")
+
+    embeds = []
+    description = ""
+    total = 0
+    for index, line in enumerate(lines):
+        if len(description) + len(line) + 1 > DESCRIPTION_CHARACTERS:
+            embeds.append(description)
+            total += len(description)
+            description = ""
+        if total + len(description) + len(line) > EMBED_CHARACTERS or len(embeds) == MAX_EMBEDS:
+            note = f"…and {len(lines) - index} more"
+            if len(embeds) == MAX_EMBEDS:
+                embeds[-1] += note
+            else:
+                description += note
+            break
+        description += line + "\n"
+    if description and len(embeds) < MAX_EMBEDS:
+        embeds.append(description)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    rendered = []
+    for page, text in enumerate(embeds, start=1):
+        title = f"📋 {name} ({len(online)}/{len(cids)} online)" if page == 1 else None
+        embed = discord.Embed(title=title, description=text, color=discord.Color.og_blurple())
+        rendered.append(embed)
+    rendered[-1].timestamp = now
+    rendered[-1].set_footer(text="Last Updated")
+    return rendered
+
+
+def board_fingerprint(embeds: list) -> str:
+    return hashlib.sha1("".join(embed_fingerprint(None, embed) for embed in embeds).encode()).hexdigest()
+
+
+class BoardCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.db_manager = bot.db
+        # Board id -> [id, guild_id, channel_id, name, message_id, fingerprint]
+        self.boards = {}
+        # Board id -> member CIDs in the order they were added
+        self.members = {}
+        self.update_boards.start()
+
+    async def cog_load(self):
+        for board in await self.db_manager.get_all_boards():
+            self.boards[board[0]] = list(board)
+            self.members[board[0]] = []
+        for board_id, cid in await self.db_manager.get_all_board_members():
+            self.members.setdefault(board_id, []).append(cid)
+        metrics.BOARDS.set(len(self.boards))
+
+    def cog_unload(self):
+        self.update_boards.cancel()
+
+    @commands.Cog.listener()
+    async def on_storage_purged(self):
+        # Boards in a deleted channel or departed guild are gone from storage
+        self.boards.clear()
+        self.members.clear()
+        await self.cog_load()
+
+    board = app_commands.Group(name="board", description="Roster boards: many tracked members in one live message.")
+
+    def find_board(self, guild_id: int, name: str):
+        name = name.lower()
+        return next((b for b in self.boards.values() if b[1] == guild_id and b[3].lower() == name), None)
+
+    async def post_board(self, board: list, embeds: list, fingerprint: str):
+        """One edit (or one send) per board, then the fingerprint is recorded."""
+        board_id, guild_id, channel_id, name, message_id, _ = board
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            log.info("Channel not found, removing board", guild_id=guild_id, channel_id=channel_id, board_id=board_id)
+            await self.db_manager.remove_board(board_id)
+            self.boards.pop(board_id, None)
+            self.members.pop(board_id, None)
+            return
+
+        try:
+            if message_id:
+                try:
+                    await channel.get_partial_message(message_id).edit(embeds=embeds)
+                except discord.NotFound:
+                    message_id = None
+            if not message_id:
+                message = await channel.send(embeds=embeds)
+                message_id = message.id
+        except discord.Forbidden:
+            log.warning("Missing permissions to update board", guild_id=guild_id, channel_id=channel_id, board_id=board_id)
+            return
+        except discord.HTTPException as e:
+            # Left with its old fingerprint, so the next cycle tries this board again
+            log.warning("Error updating board", guild_id=guild_id, channel_id=channel_id, board_id=board_id, error=e)
+            return
+
+        board[4], board[5] = message_id, fingerprint
+        await self.db_manager.update_board_message(board_id, message_id, fingerprint)
+
+    @tasks.loop(minutes=2)
+    @metrics.timed_loop("update_boards")
+    async def update_boards(self):
+        if not self.boards:
+            return
+        try:
+            snapshot = await self.bot.vatsim.fetch()
+        except aiohttp.ClientError as e:
+            log.warning("Error fetching VATSIM data", loop="update_boards", error=e)
+            return
+        if snapshot is None:
+            return
+
+        for board in list(self.boards.values()):
+            embeds = render_board(board[3], self.members.get(board[0], []), snapshot)
+            fingerprint = board_fingerprint(embeds)
+            if fingerprint == board[5]:
+                continue # Nobody on this board changed
+            await self.post_board(board, embeds, fingerprint)
+            await asyncio.sleep(1)
+
+    @update_boards.before_loop
+    async def before_update_boards(self):
+        await self.bot.wait_until_ready()
+
+    async def refresh(self, board: list):
+        """Re-renders one board straight away after its members change."""
+        snapshot = self.bot.vatsim.snapshot
+        if snapshot is None:
+            try:
+                snapshot = await self.bot.vatsim.fetch()
+            except aiohttp.ClientError:
+                return
+            if snapshot is None:
+                return
+        embeds = render_board(board[3], self.members.get(board[0], []), snapshot)
+        await self.post_board(board, embeds, board_fingerprint(embeds))
+
+    @board.command(name="create", description="Create a roster board that shows many tracked members in one message.")
+    @app_commands.describe(name="A name for the board (e.g., vACC Staff).", channel="The channel to post the board in.")
+    @app_commands.check(check_manager_permissions)
+    async def create(self, interaction: discord.Interaction, name: app_commands.Range[str, 1, 50], channel: discord.TextChannel):
+        await interaction.response.defer(ephemeral=True)
+        if self.find_board(interaction.guild_id, name):
+            await interaction.followup.send(f"A board called **{name}** already exists in this server.", ephemeral=True)
+            return
+
+        board_id = await self.db_manager.add_board(interaction.guild_id, channel.id, name, None)
+        board = self.boards[board_id] = [board_id, interaction.guild_id, channel.id, name, None, None]
+        self.members[board_id] = []
+        metrics.BOARDS.set(len(self.boards))
+        await self.refresh(board)
+        await interaction.followup.send(f"✅ Created the board **{name}** in {channel.mention}. Add members with `/board add`.", ephemeral=True)
+
+    @board.command(name="add", description="Add a VATSIM member to a roster board.")
+    @app_commands.describe(name="The board to add to.", cid="The VATSIM CID to add.")
+    @app_commands.check(check_manager_permissions)
+    async def add(self, interaction: discord.Interaction, name: str, cid: str):
+        board = self.find_board(interaction.guild_id, name)
+        if not board:
+            await interaction.response.send_message(f"There is no board called **{name}** in this server.", ephemeral=True)
+            return
+        if not cid.isdigit():
+            await interaction.response.send_message("Please provide a valid numerical VATSIM CID.", ephemeral=True)
+            return
+        members = self.members.setdefault(board[0], [])
+        if cid in members:
+            await interaction.response.send_message(f"`{cid}` is already on **{board[3]}**.", ephemeral=True)
+            return
+        if len(members) >= MAX_MEMBERS:
+            await interaction.response.send_message(f"A board can hold at most {MAX_MEMBERS} members.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        await self.db_manager.add_board_member(board[0], cid)
+        members.append(cid)
+        await self.refresh(board)
+        await interaction.followup.send(f"✅ Added `{cid}` to **{board[3]}**.", ephemeral=True)
+
+    @board.command(name="remove", description="Remove a VATSIM member from a roster board.")
+    @app_commands.describe(name="The board to remove from.", cid="The VATSIM CID to remove.")
+    @app_commands.check(check_manager_permissions)
+    async def remove(self, interaction: discord.Interaction, name: str, cid: str):
+        board = self.find_board(interaction.guild_id, name)
+        if not board or cid not in self.members.get(board[0], []):
+            await interaction.response.send_message(f"`{cid}` is not on a board called **{name}**.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        await self.db_manager.remove_board_member(board[0], cid)
+        self.members[board[0]].remove(cid)
+        await self.refresh(board)
+        await interaction.followup.send(f"✅ Removed `{cid}` from **{board[3]}**.", ephemeral=True)
+
+    @board.command(name="delete", description="Delete a roster board and its message.")
+    @app_commands.describe(name="The board to delete.")
+    @app_commands.check(check_manager_permissions)
+    async def delete(self, interaction: discord.Interaction, name: str):
+        board = self.find_board(interaction.guild_id, name)
+        if not board:
+            await interaction.response.send_message(f"There is no board called **{name}** in this server.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        board_id, _, channel_id, _, message_id, _ = board
+        channel = self.bot.get_channel(channel_id)
+        if channel and message_id:
+            try:
+                await channel.get_partial_message(message_id).delete()
+            except (discord.NotFound, discord.Forbidden):
+                pass
+        await self.db_manager.remove_board(board_id)
+        self.boards.pop(board_id, None)
+        self.members.pop(board_id, None)
+        metrics.BOARDS.set(len(self.boards))
+        await interaction.followup.send(f"✅ Deleted the board **{board[3]}**.", ephemeral=True)
+
+    @board.command(name="list", description="List this server's roster boards.")
+    async def list_boards(self, interaction: discord.Interaction):
+        boards = sorted((b for b in self.boards.values() if b[1] == interaction.guild_id), key=lambda b: b[3].lower())
+        if not boards:
+            await interaction.response.send_message("There are no roster boards in this server.", ephemeral=True)
+            return
+        description = "\n".join(f"• **{b[3]}** ({len(self.members.get(b[0], []))} members) -> <#{b[2]}>" for b in boards)
+        embed = discord.Embed(title=f"Roster Boards for {interaction.guild.name}", description=description, color=discord.Color.og_blurple())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @add.autocomplete('name')
+    @remove.autocomplete('name')
+    @delete.autocomplete('name')
+    async def board_name_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        current = current.lower()
+        names = sorted(b[3] for b in self.boards.values() if b[1] == interaction.guild_id and b[3].lower().startswith(current))
+        return [app_commands.Choice(name=name, value=name) for name in names[:25]]
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(BoardCog(bot))
@@ -6,20 +6,36 @@ import datetime
 import asyncio
 from typing import Optional
 
-from database import DatabaseManager
+import metrics
+from flight_phase import FlightPhaseTracker
+from indexes import GuildPrefixIndex
+from log import get_logger
+from state import checkpoint, embed_fingerprint
 from .utils import create_pilot_embed
 
-VATSIM_DATA_URL = "https://data.vatsim.net/v3/vatsim-data.json"
+log = get_logger(__name__)
 
 class FlightTrackerCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db_manager = DatabaseManager()
+        self.db_manager = bot.db
+        self.tracker_index = GuildPrefixIndex()
+        self.phases = FlightPhaseTracker()
+        # Paces tracker edits, as AtcCog.pause
+        self.pause = asyncio.sleep
         self.update_flight_trackers.start()
 
+    async def cog_load(self):
+        trackers = await self.db_manager.get_all_flight_trackers()
+        self.tracker_index.load((t[1], t[4]) for t in trackers)
+
     def cog_unload(self):
         self.update_flight_trackers.cancel()
 
+    @commands.Cog.listener()
+    async def on_storage_purged(self):
+        await self.cog_load()
+
     @app_commands.command(name="track-pilot", description="Continuously track a pilot's flight in a specific channel.")
     @app_commands.describe(
         cid="The VATSIM CID of the pilot to track.", 
@@ -55,6 +71,7 @@ class FlightTrackerCog(commands.Cog):
         # Add to database
         role_id = role.id if role else None
         await self.db_manager.add_flight_tracker(interaction.guild_id, channel.id, message.id, cid, delete_on_offline, role_id)
+        self.tracker_index.add(interaction.guild_id, cid)
         
         response_text = f"✅ Flight tracker for CID `{cid}` has been created in {channel.mention}."
         if role:
@@ -69,23 +86,26 @@ class FlightTrackerCog(commands.Cog):
 
 
     @tasks.loop(minutes=5)
+    @metrics.timed_loop("update_flight_trackers")
+    @checkpoint("update_flight_trackers")
     async def update_flight_trackers(self):
         all_trackers = await self.db_manager.get_all_flight_trackers()
+        metrics.TRACKERS.set(len(all_trackers), kind="pilot")
         if not all_trackers:
             return
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200:
-                        print(f"Error fetching VATSIM data for flight trackers: Status {response.status}")
-                        return
-                    vatsim_data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError as e:
-            print(f"AIOHTTP Error fetching VATSIM data for flight trackers: {e}")
+            log.warning("Error fetching VATSIM data", loop="update_flight_trackers", error=e)
+            return
+        if snapshot is None:
             return
             
-        pilots_by_cid = {str(p['cid']): p for p in vatsim_data.get('pilots', [])}
+        pilots_by_cid = snapshot.pilots_by_cid
+        # Classify every tracked pilot in one go; a CID tracked by several servers is only counted once
+        tracked_pilots = [pilots_by_cid[cid] for cid in {t[4] for t in all_trackers} if cid in pilots_by_cid]
+        phase_events = self.phases.update(tracked_pilots, snapshot.fetched_at)
 
         for tracker_data in all_trackers:
             tracker_id, guild_id, channel_id, message_id, cid, delete_on_offline, role_id, ping_sent = tracker_data
@@ -93,13 +113,17 @@ class FlightTrackerCog(commands.Cog):
             channel = self.bot.get_channel(channel_id)
             if not channel:
                 await self.db_manager.remove_flight_tracker(tracker_id)
-                print(f"Removed tracker {tracker_id} because channel {channel_id} was not found.")
+                self.tracker_index.remove(guild_id, cid)
+                log.info("Channel not found, removing flight tracker", guild_id=guild_id, channel_id=channel_id, tracker_id=tracker_id, cid=cid)
                 continue
             
             pilot_data = pilots_by_cid.get(cid)
             
             if pilot_data: # Pilot is ONLINE
-                embed = create_pilot_embed(pilot_data)
+                if cid in phase_events:
+                    await self.send_phase_alert(channel, guild_id, role_id, pilot_data, phase_events[cid])
+
+                embed = create_pilot_embed(pilot_data, self.phases.phase_name(cid))
                 content_to_send = None
 
                 # Check if we need to send a ping for the first time
@@ -112,22 +136,29 @@ class FlightTrackerCog(commands.Cog):
                     # Mark ping as sent to prevent re-pinging on next update
                     await self.db_manager.set_flight_tracker_ping_status(tracker_id, True)
 
+                fingerprint = embed_fingerprint(content_to_send, embed)
+                if message_id and self.bot.state.tracker_unchanged("pilot", tracker_id, message_id, fingerprint):
+                    continue # The message already shows this, no need to touch Discord
+
                 if message_id:
                     try:
                         message = await channel.fetch_message(message_id)
                         # On subsequent updates, content_to_send will be None, removing the ping
                         await message.edit(content=content_to_send, embed=embed)
-                        await asyncio.sleep(1)
+                        self.bot.state.remember_tracker("pilot", tracker_id, message_id, fingerprint)
+                        await self.pause(1)
                     except discord.NotFound:
                         # Message was deleted, so we'll post a new one
                         new_message = await channel.send(content=content_to_send, embed=embed)
                         await self.db_manager.update_flight_tracker_message(tracker_id, new_message.id)
+                        self.bot.state.remember_tracker("pilot", tracker_id, new_message.id, fingerprint)
                     except discord.Forbidden:
                         continue
                 else: # No message_id, need to post a new one
                     try:
                         new_message = await channel.send(content=content_to_send, embed=embed)
                         await self.db_manager.update_flight_tracker_message(tracker_id, new_message.id)
+                        self.bot.state.remember_tracker("pilot", tracker_id, new_message.id, fingerprint)
                     except discord.Forbidden:
                         continue
 
@@ -137,34 +168,38 @@ class FlightTrackerCog(commands.Cog):
                     await self.db_manager.set_flight_tracker_ping_status(tracker_id, False)
 
                 if message_id:
+                    if not delete_on_offline:
+                        embed = self.create_offline_embed(cid)
+                        fingerprint = embed_fingerprint(None, embed)
+                        if self.bot.state.tracker_unchanged("pilot", tracker_id, message_id, fingerprint):
+                            continue
                     try:
                         message = await channel.fetch_message(message_id)
                         if delete_on_offline:
                             await message.delete()
                             await self.db_manager.clear_flight_tracker_message(tracker_id)
                         else:
-                            embed = self.create_offline_embed(cid)
                             # Edit with no content to remove any lingering pings
                             await message.edit(content=None, embed=embed)
-                            await asyncio.sleep(2)
+                            self.bot.state.remember_tracker("pilot", tracker_id, message_id, fingerprint)
+                            await self.pause(2)
                     except (discord.NotFound, discord.Forbidden):
                         await self.db_manager.clear_flight_tracker_message(tracker_id)
 
     @update_flight_trackers.before_loop
     async def before_update_flight_trackers(self):
         await self.bot.wait_until_ready()
+        await self.bot.state.wait_for_cursor("update_flight_trackers", self.update_flight_trackers.minutes * 60)
 
     async def update_specific_tracker(self, guild_id, channel_id, message_id, cid):
         """Manually triggers an update for a single tracker."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200: return
-                    vatsim_data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError:
             return
+        if snapshot is None: return
 
-        pilot_data = next((p for p in vatsim_data.get('pilots', []) if str(p['cid']) == cid), None)
+        pilot_data = snapshot.pilots_by_cid.get(cid)
 
         channel = self.bot.get_channel(channel_id)
         if not channel: return
@@ -175,12 +210,38 @@ class FlightTrackerCog(commands.Cog):
             return
 
         if pilot_data:
-            embed = create_pilot_embed(pilot_data)
+            embed = create_pilot_embed(pilot_data, self.phases.phase_name(cid))
         else:
             embed = self.create_offline_embed(cid)
         
         await message.edit(embed=embed)
 
+    async def send_phase_alert(self, channel: discord.abc.Messageable, guild_id: int, role_id: Optional[int], pilot_data: dict, event: str):
+        """Posts a short departed/landed message, pinging the tracker's role if it has one."""
+        flight_plan = pilot_data.get('flight_plan') or {}
+        if event == "departed":
+            text = f"🛫 **{pilot_data['callsign']}** has departed"
+            if flight_plan.get('departure'):
+                text += f" {flight_plan['departure']}"
+            if flight_plan.get('arrival'):
+                text += f" for {flight_plan['arrival']}"
+        else:
+            text = f"🛬 **{pilot_data['callsign']}** has landed"
+            if flight_plan.get('arrival'):
+                text += f" at {flight_plan['arrival']}"
+
+        guild = self.bot.get_guild(guild_id)
+        role = guild.get_role(role_id) if guild and role_id else None
+        if role:
+            text = f"{role.mention} {text}"
+        try:
+            await channel.send(content=text + ".")
+        except discord.Forbidden:
+            log.warning("Missing permissions to send phase alert", guild_id=guild_id, channel_id=channel.id, event=event, cid=pilot_data['cid'])
+        except discord.HTTPException as e:
+            # A failed alert mustn't end the update loop; the tracker embed still shows the phase
+            log.warning("Error sending phase alert", guild_id=guild_id, channel_id=channel.id, event=event, cid=pilot_data['cid'], error=e)
+
     def create_offline_embed(self, cid):
         embed = discord.Embed(
             title=f"✈️ Pilot Offline",
@@ -214,27 +275,20 @@ class FlightTrackerCog(commands.Cog):
             # If we can't delete the message, that's okay, we'll still remove the tracker
             pass 
         except Exception as e:
-            print(f"Could not delete tracker message {message_id}: {e}")
+            log.warning("Could not delete flight tracker message", guild_id=interaction.guild_id, channel_id=channel_id, message_id=message_id, error=e)
 
         # Remove from database
         await self.db_manager.remove_flight_tracker(tracker_id)
+        self.tracker_index.remove(interaction.guild_id, cid)
         await interaction.followup.send(f"✅ The flight tracker for CID `{cid}` has been removed.", ephemeral=True)
 
     @untrack_pilot.autocomplete('cid')
     async def untrack_pilot_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        trackers = await self.db_manager.get_all_flight_trackers()
-        guild_trackers = [t for t in trackers if t[1] == interaction.guild_id]
-
-        choices = [
-            app_commands.Choice(name=f"CID: {tracker[4]}", value=str(tracker[4]))
-            for tracker in guild_trackers
+        return [
+            app_commands.Choice(name=f"CID: {cid}", value=cid)
+            for cid in self.tracker_index.search(interaction.guild_id, current, limit=25)
         ]
 
-        if current:
-            return [choice for choice in choices if current.lower() in choice.value.lower()]
-        
-        return choices[:25]
-
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(FlightTrackerCog(bot))
@@ -4,9 +4,10 @@ from discord.ext import commands
 import aiohttp
 import datetime
 
-from .utils import create_controller_embed, create_pilot_embed
-
-VATSIM_DATA_URL = "https://data.vatsim.net/v3/vatsim-data.json"
+from matching import callsign_prefixes
+from vatsim import format_frequency
+from tracing import CommandTrace
+from .utils import create_controller_embed, create_pilot_embed, stale_notice
 
 class LookupCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -17,64 +18,70 @@ class LookupCog(commands.Cog):
     @lookup.command(name="atc", description="Look up a specific, currently online ATC controller.")
     @app_commands.describe(callsign="The full callsign of the controller (e.g., PHL_TWR).")
     async def lookup_atc(self, interaction: discord.Interaction, callsign: str):
+        trace = CommandTrace(interaction)
         await interaction.response.defer(ephemeral=True)
+        trace.lap("defer")
         
         # Fetches fresh data every time
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200:
-                        await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
-                        return
-                    data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError:
             await interaction.followup.send("An error occurred while trying to contact the VATSIM API.", ephemeral=True)
             return
+        if snapshot is None:
+            await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
+            return
+        trace.lap_fetch(snapshot)
 
-        found_controller = None
-        for controller in data.get('controllers', []):
-            if controller['callsign'].upper() == callsign.upper():
-                found_controller = controller
-                break
+        found_controller = snapshot.controllers_by_callsign.get(callsign.upper())
         
         if not found_controller:
             await interaction.followup.send(f"No controller found with the callsign `{callsign.upper()}`.")
             return
 
-        embed = create_controller_embed(found_controller)
+        embed = create_controller_embed(found_controller, snapshot.transceivers_by_callsign.get(found_controller['callsign'].upper()))
         # Override footer and timestamp for lookup context
         logon_time = datetime.datetime.fromisoformat(found_controller['logon_time'].replace('Z', '+00:00'))
         embed.set_footer(text="Logged on at (UTC)").timestamp = logon_time
-        await interaction.followup.send(embed=embed)
+        trace.lap("filter")
+        await interaction.followup.send(stale_notice(snapshot), embed=embed)
+        trace.finish()
+
+    @lookup_atc.autocomplete('callsign')
+    async def lookup_atc_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        snapshot = self.bot.vatsim.snapshot
+        if not snapshot:
+            return []
+        return [
+            app_commands.Choice(name=callsign, value=callsign)
+            for callsign in snapshot.callsign_index.search(current, limit=25)
+        ]
 
 
     @lookup.command(name="atis", description="Get the current ATIS for an airport.")
     @app_commands.describe(airport="The ICAO code of the airport (e.g., KPHL).")
     async def lookup_atis(self, interaction: discord.Interaction, airport: str):
+        trace = CommandTrace(interaction)
         await interaction.response.defer(ephemeral=True)
+        trace.lap("defer")
         
         # Fetches fresh data every time
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200:
-                        await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
-                        return
-                    data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError:
             await interaction.followup.send("An error occurred while trying to contact the VATSIM API.", ephemeral=True)
             return
+        if snapshot is None:
+            await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
+            return
+        trace.lap_fetch(snapshot)
 
-        airport_upper = airport.upper()
-        prefixes_to_check = {airport_upper}
-        if len(airport_upper) == 3:
-            prefixes_to_check.add(f"K{airport_upper}")
-        elif len(airport_upper) == 4 and airport_upper.startswith('K'):
-            prefixes_to_check.add(airport_upper[1:])
+        # The airport's ICAO code and FAA identifier (KPHL and PHL), from the bundled airport table
+        prefixes_to_check = callsign_prefixes(airport)
 
         matching_atis_list = []
-        for atis in data.get('atis', []):
-            if any(atis['callsign'].startswith(prefix) for prefix in prefixes_to_check):
+        for atis in snapshot.atis:
+            if atis['callsign'].startswith(prefixes_to_check):
                 matching_atis_list.append(atis)
         
         if not matching_atis_list:
@@ -88,7 +95,7 @@ class LookupCog(commands.Cog):
         )
         # Bless Gemini for being smart asf
         for atis in sorted(matching_atis_list, key=lambda a: a['callsign']):
-            atis_type_name = atis['callsign'].replace(f"{airport.upper()}_", "").replace("_ATIS", "")
+            atis_type_name = atis['callsign'].replace(f"{atis['callsign'].split('_')[0]}_", "").replace("_ATIS", "")
             if atis_type_name in ['D', 'A']:
                 atis_type_name = {'D': 'Departure', 'A': 'Arrival'}.get(atis_type_name, atis_type_name)
             
@@ -97,30 +104,29 @@ class LookupCog(commands.Cog):
             atis_text = '\n'.join(atis['text_atis'])
             embed.add_field(name=atis_field_name, value=f"```\n{atis_text}\n```", inline=False)
             
-        await interaction.followup.send(embed=embed)
+        trace.lap("filter")
+        await interaction.followup.send(stale_notice(snapshot), embed=embed)
+        trace.finish()
         
     @lookup.command(name="pilot", description="Look up a specific, currently online pilot.")
     @app_commands.describe(cid="The VATSIM CID of the pilot to look up.")
     async def lookup_pilot(self, interaction: discord.Interaction, cid: str):
+        trace = CommandTrace(interaction)
         await interaction.response.defer(ephemeral=True)
+        trace.lap("defer")
 
         # Fetches fresh data every time
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(VATSIM_DATA_URL) as response:
-                    if response.status != 200:
-                        await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
-                        return
-                    data = await response.json()
+            snapshot = await self.bot.vatsim.fetch()
         except aiohttp.ClientError:
             await interaction.followup.send("An error occurred while trying to contact the VATSIM API.", ephemeral=True)
             return
+        if snapshot is None:
+            await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
+            return
+        trace.lap_fetch(snapshot)
 
-        found_pilot = None
-        for pilot in data.get('pilots', []):
-            if str(pilot['cid']) == cid:
-                found_pilot = pilot
-                break
+        found_pilot = snapshot.pilots_by_cid.get(cid)
 
         if not found_pilot:
             await interaction.followup.send(f"No online pilot found with the CID `{cid}`.", ephemeral=True)
@@ -130,7 +136,139 @@ class LookupCog(commands.Cog):
         # Override footer and timestamp for lookup context
         logon_time = datetime.datetime.fromisoformat(found_pilot['logon_time'].replace('Z', '+00:00'))
         embed.set_footer(text="Logged on at (UTC)").timestamp = logon_time
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        trace.lap("filter")
+        await interaction.followup.send(stale_notice(snapshot), embed=embed, ephemeral=True)
+        trace.finish()
+
+    @lookup_pilot.autocomplete('cid')
+    async def lookup_pilot_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        snapshot = self.bot.vatsim.snapshot
+        if not snapshot:
+            return []
+        choices = []
+        # The pilot index matches on CID as well as name, so typing either finds the pilot
+        for cid in snapshot.pilot_index.search(current, limit=25):
+            pilot = snapshot.pilots_by_cid[cid]
+            label = f"{cid} - {pilot['name']} ({pilot['callsign']})"
+            choices.append(app_commands.Choice(name=label[:100], value=cid))
+        return choices
+
+    @lookup.command(name="search", description="Find online pilots and controllers by part of a name, callsign or CID.")
+    @app_commands.describe(query="A name, callsign or CID; partial and misspelt ones work too (e.g., jon smth, DAL12).")
+    async def lookup_search(self, interaction: discord.Interaction, query: app_commands.Range[str, 2, 50]):
+        trace = CommandTrace(interaction)
+        await interaction.response.defer(ephemeral=True)
+        trace.lap("defer")
+
+        try:
+            snapshot = await self.bot.vatsim.fetch()
+        except aiohttp.ClientError:
+            await interaction.followup.send("An error occurred while trying to contact the VATSIM API.", ephemeral=True)
+            return
+        if snapshot is None:
+            await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
+            return
+        trace.lap_fetch(snapshot)
+
+        callsigns = []
+        # CIDs aren't in the trigram index; an exact one goes first
+        exact = snapshot.controllers_by_cid.get(query.strip()) or snapshot.pilots_by_cid.get(query.strip())
+        if exact:
+            callsigns.append(exact['callsign'].upper())
+        callsigns.extend(callsign for callsign, _, _ in snapshot.search_index.search(query, limit=10) if callsign not in callsigns)
+
+        lines = []
+        for callsign in callsigns[:10]:
+            controller = snapshot.controllers_by_callsign.get(callsign)
+            if controller:
+                lines.append(f"📡 **`{controller['callsign']}`** ({controller['frequency']}) - {controller['name']} (`{controller['cid']}`)")
+                continue
+            pilot = snapshot.pilots_by_callsign.get(callsign)
+            if pilot:
+                flight_plan = pilot.get('flight_plan')
+                route = f" {flight_plan['departure']} → {flight_plan['arrival']}" if flight_plan else ""
+                lines.append(f"✈️ **`{pilot['callsign']}`**{route} - {pilot['name']} (`{pilot['cid']}`)")
+
+        if not lines:
+            await interaction.followup.send(f"Nobody online matches `{query}`.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title=f"🔎 Online matches for \"{query}\"",
+            description="\n".join(lines),
+            color=discord.Color.og_blurple(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        embed.set_footer(text="Best matches first. Use /lookup pilot or /lookup atc for the full details.")
+        trace.lap("filter")
+        await interaction.followup.send(stale_notice(snapshot), embed=embed, ephemeral=True)
+        trace.finish()
+
+    @lookup.command(name="frequency", description="See who is on a frequency: the controllers and ATIS on it and the pilots tuned to it.")
+    @app_commands.describe(frequency="The frequency in MHz (e.g., 118.500).")
+    async def lookup_frequency(self, interaction: discord.Interaction, frequency: str):
+        normalized = format_frequency(frequency)
+        if normalized is None:
+            await interaction.response.send_message("Please provide a frequency in MHz, like `118.500`.", ephemeral=True)
+            return
+
+        trace = CommandTrace(interaction)
+        await interaction.response.defer(ephemeral=True)
+        trace.lap("defer")
+
+        try:
+            snapshot = await self.bot.vatsim.fetch()
+        except aiohttp.ClientError:
+            await interaction.followup.send("An error occurred while trying to contact the VATSIM API.", ephemeral=True)
+            return
+        if snapshot is None:
+            await interaction.followup.send("Could not retrieve data from VATSIM.", ephemeral=True)
+            return
+        trace.lap_fetch(snapshot)
+
+        callsigns = snapshot.frequency_index.get(normalized, [])
+        atis_by_callsign = {a['callsign'].upper(): a for a in snapshot.atis}
+        stations, pilots = [], []
+        for callsign in callsigns:
+            station = snapshot.controllers_by_callsign.get(callsign.upper()) or atis_by_callsign.get(callsign.upper())
+            if station:
+                stations.append(station)
+            else:
+                pilots.append(callsign)
+
+        if not callsigns:
+            await interaction.followup.send(f"Nobody is on `{normalized}` right now.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title=f"📻 {normalized} MHz",
+            color=discord.Color.og_blurple(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        if stations:
+            station_text = "\n".join(f"**`{s['callsign']}`** - {s['name']}" for s in stations)
+            embed.add_field(name="📡 Stations", value=station_text[:1024], inline=False)
+        if pilots:
+            shown = " ".join(f"`{callsign}`" for callsign in pilots[:60])
+            if len(pilots) > 60:
+                shown += f" …and {len(pilots) - 60} more"
+            embed.add_field(name=f"✈️ Tuned In ({len(pilots)})", value=shown[:1024], inline=False)
+        if not snapshot.transceivers:
+            embed.set_footer(text="Only primary frequencies are known; the transceivers feed isn't loaded.")
+
+        trace.lap("filter")
+        await interaction.followup.send(stale_notice(snapshot), embed=embed, ephemeral=True)
+        trace.finish()
+
+    @lookup_frequency.autocomplete('frequency')
+    async def lookup_frequency_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        snapshot = self.bot.vatsim.snapshot
+        if not snapshot:
+            return []
+        return [
+            app_commands.Choice(name=frequency, value=frequency)
+            for frequency in snapshot.frequency_choices.search(current, limit=25)
+        ]
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,87 @@
+import asyncio
+
+import discord
+from discord.ext import commands, tasks
+
+import metrics
+from log import get_logger
+
+log = get_logger(__name__)
+
+
+class MaintenanceCog(commands.Cog):
+    """Keeps the database in step with the guilds and channels the bot can actually see."""
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.db_manager = bot.db
+        self.reconcile.start()
+        self.compact_database.start()
+
+    def cog_unload(self):
+        self.reconcile.cancel()
+        self.compact_database.cancel()
+
+    async def purge(self, reason: str, guild_ids=(), channel_ids=()):
+        """Deletes the rows and tells the other cogs to reload anything they hold in memory."""
+        guild_ids, channel_ids = set(guild_ids), set(channel_ids)
+        deleted = await self.db_manager.purge(guild_ids, channel_ids)
+        for guild_id in guild_ids:
+            self.bot.guild_settings.invalidate(guild_id)
+        metrics.PURGED_ROWS.inc(deleted, reason=reason)
+        if deleted:
+            log.info("Purged rows", reason=reason, rows=deleted, guilds=len(guild_ids), channels=len(channel_ids))
+            self.bot.dispatch("storage_purged")
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        await self.purge("guild_remove", guild_ids=[guild.id])
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        await self.purge("channel_delete", channel_ids=[channel.id])
+
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        await self.purge("channel_delete", channel_ids=[payload.thread_id])
+
+    @tasks.loop(hours=6)
+    @metrics.timed_loop("reconcile")
+    async def reconcile(self):
+        """Catches whatever was removed while the bot was offline or missed an event."""
+        guilds = {guild.id: guild for guild in self.bot.guilds}
+        if not guilds:
+            return # An empty guild list means the gateway hasn't settled, not that every guild left
+
+        dead_guilds, dead_channels = set(), set()
+        for guild_id, channel_id in await self.db_manager.get_referenced_channels():
+            guild = guilds.get(guild_id)
+            if guild is None:
+                dead_guilds.add(guild_id)
+            elif guild.unavailable or channel_id is None:
+                continue # An outage isn't a deletion
+            elif guild.get_channel_or_thread(channel_id) is None:
+                dead_channels.add(channel_id)
+
+        if dead_guilds or dead_channels:
+            await self.purge("reconcile", dead_guilds, dead_channels)
+
+    @reconcile.before_loop
+    async def before_reconcile(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(hours=24)
+    @metrics.timed_loop("compact_database")
+    async def compact_database(self):
+        freed = await self.db_manager.compact()
+        if freed:
+            log.info("Compacted the database", pages_freed=freed)
+
+    @compact_database.before_loop
+    async def before_compact_database(self):
+        await self.bot.wait_until_ready()
+        # Let the first reconciliation delete what it is going to before compacting
+        await asyncio.sleep(600)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MaintenanceCog(bot))
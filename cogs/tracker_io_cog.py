@@ -0,0 +1,273 @@
+import asyncio
+import csv
+import io
+import json
+from typing import Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from log import get_logger
+from .atc_cog import check_manager_permissions
+
+MAX_IMPORT_ROWS = 500
+MAX_IMPORT_BYTES = 1024 * 1024
+# Columns of an import or export file; an export can be imported again as-is
+FIELDS = ["type", "cid", "channel_id", "role_id", "delete_on_offline"]
+TRUE_VALUES = {"true", "yes", "y", "1"}
+FALSE_VALUES = {"false", "no", "n", "0", ""}
+# Placeholder message ids are written back this many at a time
+FILL_BATCH = 25
+
+log = get_logger(__name__)
+
+
+def read_rows(raw: bytes, filename: str) -> list:
+    """Reads an uploaded CSV or JSON file into a list of row dicts."""
+    text = raw.decode("utf-8-sig")
+    if filename.lower().endswith(".json") or text.lstrip().startswith(("[", "{")):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get("trackers")
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ValueError("A JSON import must be a list of objects, or an object with a `trackers` list.")
+        return data
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def parse_row(row: dict, default_kind: str, default_channel_id: Optional[int]) -> tuple:
+    """Returns (kind, channel_id, cid, delete_on_offline, role_id), raising ValueError for a bad row."""
+    row = {str(key).strip().lower(): "" if value is None else str(value).strip() for key, value in row.items()}
+    kind = (row.get("type") or default_kind).lower()
+    if kind not in ("pilot", "controller"):
+        raise ValueError(f"type must be pilot or controller, not `{kind}`")
+    cid = row.get("cid", "")
+    if not cid.isdigit():
+        raise ValueError(f"`{cid}` is not a numerical VATSIM CID")
+
+    channel_id = row.get("channel_id") or row.get("channel") or ""
+    if not channel_id and default_channel_id is None:
+        raise ValueError("no channel_id, and no channel was given to the command")
+    channel_id = channel_id.strip("<#>")
+    if channel_id and not channel_id.isdigit():
+        raise ValueError(f"`{channel_id}` is not a channel id")
+    role_id = (row.get("role_id") or row.get("role") or "").strip("<@&>")
+    if role_id and not role_id.isdigit():
+        raise ValueError(f"`{role_id}` is not a role id")
+
+    delete_on_offline = row.get("delete_on_offline", "").lower()
+    if delete_on_offline not in TRUE_VALUES | FALSE_VALUES:
+        raise ValueError(f"delete_on_offline must be true or false, not `{delete_on_offline}`")
+
+    return (
+        kind,
+        int(channel_id) if channel_id else default_channel_id,
+        cid,
+        delete_on_offline in TRUE_VALUES,
+        int(role_id) if role_id else None,
+    )
+
+
+def placeholder_embed(kind: str, cid: str) -> discord.Embed:
+    title = "Flight Tracker" if kind == "pilot" else "Controller Tracker"
+    return discord.Embed(title=f"Initializing {title} for CID: {cid}", description="Waiting for the next update...", color=discord.Color.light_grey())
+
+
+class TrackerIOCog(commands.Cog):
+    """Bulk import and export of flight and controller trackers."""
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.db_manager = bot.db
+        # Placeholder jobs still posting; held so they aren't garbage collected mid-run
+        self.jobs = set()
+
+    def cog_unload(self):
+        for job in self.jobs:
+            job.cancel()
+
+    trackers = app_commands.Group(name="trackers", description="Import or export this server's pilot and controller trackers.")
+
+    def check_channel(self, guild: discord.Guild, channel_id: int) -> Optional[str]:
+        channel = guild.get_channel(channel_id)
+        if not isinstance(channel, discord.TextChannel):
+            return f"<#{channel_id}> is not a text channel in this server"
+        permissions = channel.permissions_for(guild.me)
+        if not (permissions.send_messages and permissions.embed_links):
+            return f"I can't post embeds in {channel.mention}"
+        return None
+
+    @trackers.command(name="import", description="Create many trackers at once from a CSV or JSON file.")
+    @app_commands.describe(
+        file="CSV or JSON with the columns type, cid, channel_id, role_id, delete_on_offline (only cid is required).",
+        channel="Channel for rows that don't name one.",
+        kind="Tracker type for rows that don't name one."
+    )
+    @app_commands.choices(kind=[app_commands.Choice(name="Pilot", value="pilot"), app_commands.Choice(name="Controller", value="controller")])
+    @app_commands.check(check_manager_permissions)
+    async def import_trackers(self, interaction: discord.Interaction, file: discord.Attachment, channel: Optional[discord.TextChannel] = None, kind: str = "pilot"):
+        if file.size > MAX_IMPORT_BYTES:
+            await interaction.response.send_message(f"The file is too large; imports are limited to {MAX_IMPORT_BYTES // 1024} KiB.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            rows = read_rows(await file.read(), file.filename)
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            await interaction.followup.send(f"I couldn't read that file: {e}", ephemeral=True)
+            return
+        if len(rows) > MAX_IMPORT_ROWS:
+            await interaction.followup.send(f"An import can hold at most {MAX_IMPORT_ROWS} trackers; this file has {len(rows)}.", ephemeral=True)
+            return
+
+        guild = interaction.guild
+        errors = []
+        channel_errors = {}
+        parsed = {"pilot": {}, "controller": {}}
+        for line, row in enumerate(rows, start=1):
+            try:
+                row_kind, channel_id, cid, delete_on_offline, role_id = parse_row(row, kind, channel.id if channel else None)
+            except ValueError as e:
+                errors.append(f"Row {line}: {e}")
+                continue
+            if channel_id not in channel_errors:
+                channel_errors[channel_id] = self.check_channel(guild, channel_id)
+            if channel_errors[channel_id]:
+                errors.append(f"Row {line}: {channel_errors[channel_id]}")
+                continue
+            if role_id and guild.get_role(role_id) is None:
+                errors.append(f"Row {line}: <@&{role_id}> is not a role in this server")
+                continue
+            if cid in parsed[row_kind]:
+                errors.append(f"Row {line}: {row_kind} `{cid}` is listed twice")
+                continue
+            parsed[row_kind][cid] = (channel_id, cid, delete_on_offline, role_id)
+
+        storage = {
+            "pilot": (self.db_manager.get_tracked_flight_cids, self.db_manager.add_flight_trackers, "FlightTrackerCog"),
+            "controller": (self.db_manager.get_tracked_controller_cids, self.db_manager.add_controller_trackers, "AtcCog"),
+        }
+        created = {}
+        skipped = 0
+        for row_kind, by_cid in parsed.items():
+            if not by_cid:
+                continue
+            get_tracked, add_trackers, cog_name = storage[row_kind]
+            tracked = await get_tracked(interaction.guild_id, by_cid)
+            skipped += len(tracked)
+            new_rows = [row for cid, row in by_cid.items() if cid not in tracked]
+            if not new_rows:
+                continue
+            ids = await add_trackers(interaction.guild_id, new_rows)
+            # Rows tracked by something else in the meantime come back without an id
+            skipped += len(new_rows) - len(ids)
+            new_rows = [row for row in new_rows if row[1] in ids]
+            if not new_rows:
+                continue
+            created[row_kind] = [(ids[cid], channel_id, cid) for channel_id, cid, _, _ in new_rows]
+            cog = self.bot.get_cog(cog_name)
+            if cog:
+                for _, cid, _, _ in new_rows:
+                    cog.tracker_index.add(interaction.guild_id, cid)
+
+        summary = [f"✅ Imported {len(created.get('pilot', []))} pilot and {len(created.get('controller', []))} controller trackers."]
+        if skipped:
+            summary.append(f"Skipped {skipped} already tracked in this server.")
+        if created:
+            summary.append("*Their messages are being posted now and will fill in on the next update.*")
+        if errors:
+            shown = "\n".join(errors[:10])
+            more = f"\n…and {len(errors) - 10} more" if len(errors) > 10 else ""
+            summary.append(f"⚠️ {len(errors)} row(s) were not imported:\n{shown}{more}")
+        await interaction.followup.send("\n".join(summary)[:2000], ephemeral=True)
+
+        if created:
+            job = asyncio.create_task(self.post_placeholders(created))
+            self.jobs.add(job)
+            job.add_done_callback(self.jobs.discard)
+
+    async def post_placeholders(self, created: dict):
+        """Posts each new tracker's placeholder through the paced sender, one queue per channel."""
+        by_channel = {}
+        for row_kind, trackers in created.items():
+            for tracker_id, channel_id, cid in trackers:
+                by_channel.setdefault(channel_id, []).append((row_kind, tracker_id, cid))
+
+        async def post_channel(channel_id: int, trackers: list):
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                return
+            pending = []
+            for row_kind, tracker_id, cid in trackers:
+                try:
+                    message = await self.bot.sender.send(channel, embed=placeholder_embed(row_kind, cid))
+                except discord.HTTPException as e:
+                    # Left without a message, the update loop posts one once the member is online
+                    log.warning("Error posting tracker placeholder", kind=row_kind, tracker_id=tracker_id, channel_id=channel_id, cid=cid, error=e)
+                    continue
+                pending.append((row_kind, tracker_id, message))
+                if len(pending) >= FILL_BATCH:
+                    await self.attach_placeholders(pending)
+                    pending = []
+            await self.attach_placeholders(pending)
+
+        await asyncio.gather(*(post_channel(channel_id, trackers) for channel_id, trackers in by_channel.items()))
+
+    async def attach_placeholders(self, pending: list):
+        """Records a batch of (kind, tracker_id, message) placeholders, deleting any a tracker no longer needs."""
+        fills = {
+            "pilot": self.db_manager.fill_flight_tracker_messages,
+            "controller": self.db_manager.fill_controller_tracker_messages,
+        }
+        for row_kind, fill in fills.items():
+            batch = [(tracker_id, message) for kind, tracker_id, message in pending if kind == row_kind]
+            if not batch:
+                continue
+            filled = set(await fill([(tracker_id, message.id) for tracker_id, message in batch]))
+            for tracker_id, message in batch:
+                if tracker_id not in filled:
+                    # The update loop posted for it first, or it was untracked meanwhile
+                    try:
+                        await message.delete()
+                    except discord.HTTPException:
+                        pass
+
+    @trackers.command(name="export", description="Download this server's trackers as a file you can edit and import again.")
+    @app_commands.describe(format="The file format.")
+    @app_commands.choices(format=[app_commands.Choice(name="CSV", value="csv"), app_commands.Choice(name="JSON", value="json")])
+    @app_commands.check(check_manager_permissions)
+    async def export_trackers(self, interaction: discord.Interaction, format: str = "csv"):
+        await interaction.response.defer(ephemeral=True)
+        rows = []
+        for row_kind, trackers in (
+            ("pilot", await self.db_manager.get_all_flight_trackers()),
+            ("controller", await self.db_manager.get_all_controller_trackers()),
+        ):
+            for tracker in trackers:
+                if tracker[1] == interaction.guild_id:
+                    rows.append({
+                        "type": row_kind,
+                        "cid": tracker[4],
+                        "channel_id": str(tracker[2]),
+                        "role_id": str(tracker[6]) if tracker[6] else "",
+                        "delete_on_offline": bool(tracker[5]),
+                    })
+
+        if not rows:
+            await interaction.followup.send("This server has no trackers to export.", ephemeral=True)
+            return
+
+        if format == "json":
+            data = json.dumps(rows, indent=2).encode()
+        else:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows({**row, "delete_on_offline": str(row["delete_on_offline"]).lower()} for row in rows)
+            data = buffer.getvalue().encode()
+        file = discord.File(io.BytesIO(data), filename=f"trackers-{interaction.guild_id}.{format}")
+        await interaction.followup.send(f"✅ Exported {len(rows)} trackers.", file=file, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(TrackerIOCog(bot))
@@ -1,8 +1,32 @@
 import discord
 import datetime
+from typing import Optional
 
-def create_controller_embed(controller_data: dict) -> discord.Embed:
-    """Creates a standardized embed for online VATSIM controller data."""
+import airports
+
+def stale_notice(snapshot) -> Optional[str]:
+    """A warning to send alongside data served from an old snapshot while the VATSIM feed is unreachable."""
+    if not snapshot.stale:
+        return None
+    return f"⚠️ The VATSIM feed can't be reached right now, so this is data from {snapshot.age / 60:.0f} minute(s) ago."
+
+def transceiver_coverage(transceivers: list, visual_range: Optional[int] = None) -> Optional[str]:
+    """Summarises where a station's transceivers are: how many, their centre and how far apart they spread."""
+    positions = [(t['latDeg'], t['lonDeg']) for t in transceivers if t.get('latDeg') is not None and t.get('lonDeg') is not None]
+    if not positions:
+        return None
+    latitude = sum(p[0] for p in positions) / len(positions)
+    longitude = sum(p[1] for p in positions) / len(positions)
+    text = f"{len(positions)} transceiver{'s' if len(positions) != 1 else ''} around {abs(latitude):.2f}°{'N' if latitude >= 0 else 'S'} {abs(longitude):.2f}°{'E' if longitude >= 0 else 'W'}"
+    if len(positions) > 1:
+        spread = max(airports.distance_nm(latitude, longitude, lat, lon) for lat, lon in positions)
+        text += f", spread over {spread:.0f} nm"
+    if visual_range:
+        text += f"\nVisual range {visual_range} nm"
+    return text
+
+def create_controller_embed(controller_data: dict, transceivers: Optional[list] = None) -> discord.Embed:
+    """Creates a standardized embed for online VATSIM controller data, with transceiver coverage if it is known."""
     logon_time = datetime.datetime.fromisoformat(controller_data['logon_time'].replace('Z', '+00:00'))
     
     embed = discord.Embed(
@@ -13,6 +37,9 @@ def create_controller_embed(controller_data: dict) -> discord.Embed:
     )
     embed.add_field(name="Frequency", value=f"`{controller_data['frequency']}`", inline=True)
     embed.add_field(name="Online Since", value=discord.utils.format_dt(logon_time, style='R'), inline=True)
+    coverage = transceiver_coverage(transceivers, controller_data.get('visual_range')) if transceivers else None
+    if coverage:
+        embed.add_field(name="Coverage", value=coverage, inline=False)
     
     if controller_data.get('text_atis'):
         login_message = "\n".join(controller_data['text_atis'])
@@ -21,8 +48,8 @@ def create_controller_embed(controller_data: dict) -> discord.Embed:
     embed.set_footer(text="Last Updated")
     return embed
 
-def create_pilot_embed(pilot_data: dict) -> discord.Embed:
-    """Creates a standardized embed for online VATSIM pilot data."""
+def create_pilot_embed(pilot_data: dict, phase: Optional[str] = None) -> discord.Embed:
+    """Creates a standardized embed for online VATSIM pilot data, with the flight phase if it is known."""
     flight_plan = pilot_data.get('flight_plan')
     logon_time = datetime.datetime.fromisoformat(pilot_data['logon_time'].replace('Z', '+00:00'))
 
@@ -43,6 +70,38 @@ def create_pilot_embed(pilot_data: dict) -> discord.Embed:
     embed.add_field(name="Altitude", value=f"`{pilot_data['altitude']}` ft", inline=True)
     embed.add_field(name="Speed", value=f"`{pilot_data['groundspeed']}` kts", inline=True)
     embed.add_field(name="Heading", value=f"`{pilot_data['heading']}°`", inline=True)
+    if phase:
+        embed.add_field(name="Phase", value=f"`{phase}`", inline=True)
+
+    arrival = airports.lookup(flight_plan['arrival']) if flight_plan else None
+    if arrival and pilot_data.get('latitude') is not None:
+        remaining = airports.distance_nm(pilot_data['latitude'], pilot_data['longitude'], arrival.latitude, arrival.longitude)
+        embed.add_field(name="Distance Remaining", value=f"`{remaining:,.0f}` nm", inline=True)
+        # Straight-line distance at the current groundspeed; only meaningful once airborne
+        if pilot_data['groundspeed'] >= 50 and remaining >= 1:
+            eta = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=remaining / pilot_data['groundspeed'])
+            embed.add_field(name="ETA", value=f"{discord.utils.format_dt(eta, style='t')} ({discord.utils.format_dt(eta, style='R')})", inline=True)
     
     embed.set_footer(text=f"Online Since: {logon_time.strftime('%Y-%m-%d %H:%M:%S')} UTC | Last Updated")
-    return embed
\ No newline at end of file
+    return embed
+
+
+def create_atis_board_embed(airport: str, atis_list: list) -> discord.Embed:
+    """Creates the embed for an ATIS board: every ATIS at the airport with its letter and text."""
+    embed = discord.Embed(
+        title=f"📄 ATIS Board: {airport}",
+        color=discord.Color.dark_green(),
+        timestamp=datetime.datetime.now(datetime.timezone.utc)
+    )
+    if not atis_list:
+        embed.description = "No ATIS is currently online."
+
+    for atis in sorted(atis_list, key=lambda a: a['callsign']):
+        letter = f" - Information {atis['atis_code']}" if atis.get('atis_code') else ""
+        atis_text = "\n".join(atis.get('text_atis') or []) or "ATIS information not available."
+        if len(atis_text) > 1000: # Field values are capped at 1024 characters
+            atis_text = atis_text[:1000] + "..."
+        embed.add_field(name=f"{atis['callsign']} ({atis['frequency']}){letter}", value=f"```\n{atis_text}\n```", inline=False)
+
+    embed.set_footer(text="Updates when the ATIS changes | Last Updated")
+    return embed
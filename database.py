@@ -1,235 +1,918 @@
+import asyncio
+import contextlib
+import itertools
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
 import aiosqlite
 import discord
-from typing import Optional
+
+import metrics
+from log import get_logger
+
+log = get_logger(__name__)
 
 DB_FILE = "vatsim_bot.db"
+# Tables whose rows belong to a guild and post into one of its channels
+CHANNEL_TABLES = ("notifications", "flight_trackers", "controller_trackers", "atis_subscriptions", "boards")
+# Values bound into one IN (...) list; older SQLite builds allow 999 parameters per statement
+MAX_BOUND_IDS = 500
+
+
+# --- Schema Migrations ---
+# Each migration runs once, in order; the number applied is stored in PRAGMA user_version.
+# Never edit a migration that has shipped, append a new one instead.
+async def _create_tables(db: aiosqlite.Connection):
+    """Create the original tables"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            airport_icao TEXT NOT NULL,
+            channel_id INTEGER NOT NULL,
+            role_id INTEGER,
+            delete_on_offline BOOLEAN DEFAULT FALSE NOT NULL
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS permissions (
+            guild_id INTEGER PRIMARY KEY,
+            role_id INTEGER NOT NULL
+        )
+    """)
+    for table in ("flight_trackers", "controller_trackers"):
+        await db.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                message_id INTEGER,
+                vatsim_cid TEXT NOT NULL,
+                delete_on_offline BOOLEAN DEFAULT FALSE NOT NULL,
+                role_id INTEGER
+            )
+        """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS active_notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rule_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            callsign TEXT NOT NULL UNIQUE,
+            FOREIGN KEY (rule_id) REFERENCES notifications(id) ON DELETE CASCADE
+        )
+    """)
+
+async def _add_ping_sent(db: aiosqlite.Connection):
+    """Add ping_sent to the tracker tables"""
+    for table in ("flight_trackers", "controller_trackers"):
+        async with db.execute(f"PRAGMA table_info({table})") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        # Databases created before migrations existed may already have the column
+        if "ping_sent" not in columns:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN ping_sent BOOLEAN NOT NULL DEFAULT 0")
+
+async def _add_lookup_indexes(db: aiosqlite.Connection):
+    """Index the columns every lookup filters on"""
+    # Covers get_notifications_by_guild (the rowid id comes free) and notification_exists
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_notifications_guild ON notifications (guild_id, airport_icao, channel_id, role_id)")
+    # Lets COUNT(DISTINCT airport_icao) walk the index instead of sorting the table
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_notifications_airport ON notifications (airport_icao)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_flight_trackers_guild_cid ON flight_trackers (guild_id, vatsim_cid)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_controller_trackers_guild_cid ON controller_trackers (guild_id, vatsim_cid)")
+    # Keeps the ON DELETE CASCADE from notifications from scanning the table if foreign keys are switched on
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_active_notifications_rule ON active_notifications (rule_id)")
+    await db.execute("ANALYZE")
+
+async def _add_atis_subscriptions(db: aiosqlite.Connection):
+    """Add ATIS board subscriptions"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS atis_subscriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            airport_icao TEXT NOT NULL,
+            message_id INTEGER,
+            atis_hash TEXT
+        )
+    """)
+    await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_atis_subscriptions_guild_airport ON atis_subscriptions (guild_id, airport_icao, channel_id)")
+
+async def _add_boards(db: aiosqlite.Connection):
+    """Add roster boards and their members"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS boards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            message_id INTEGER,
+            fingerprint TEXT
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS board_members (
+            board_id INTEGER NOT NULL,
+            vatsim_cid TEXT NOT NULL,
+            PRIMARY KEY (board_id, vatsim_cid),
+            FOREIGN KEY (board_id) REFERENCES boards(id) ON DELETE CASCADE
+        )
+    """)
+    await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_boards_guild_name ON boards (guild_id, name)")
+
+MIGRATIONS = [
+    _create_tables,
+    _add_ping_sent,
+    _add_lookup_indexes,
+    _add_atis_subscriptions,
+    _add_boards,
+]
 
-class DatabaseManager:
-    """Manages the bot's SQLite database."""
+
+class Storage(ABC):
+    """Everything the cogs need to persist. Rows come back as tuples in the column order of the SQLite schema."""
     async def setup(self):
-        """Initializes the database and creates tables if they don't exist."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS notifications (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER NOT NULL,
-                    airport_icao TEXT NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    role_id INTEGER,
-                    delete_on_offline BOOLEAN DEFAULT FALSE NOT NULL
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS permissions (
-                    guild_id INTEGER PRIMARY KEY,
-                    role_id INTEGER NOT NULL
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS flight_trackers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    message_id INTEGER,
-                    vatsim_cid TEXT NOT NULL,
-                    delete_on_offline BOOLEAN DEFAULT FALSE NOT NULL,
-                    role_id INTEGER,
-                    ping_sent BOOLEAN NOT NULL DEFAULT 0
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS controller_trackers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    message_id INTEGER,
-                    vatsim_cid TEXT NOT NULL,
-                    delete_on_offline BOOLEAN DEFAULT FALSE NOT NULL,
-                    role_id INTEGER,
-                    ping_sent BOOLEAN NOT NULL DEFAULT 0
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS active_notifications (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    rule_id INTEGER NOT NULL,
-                    message_id INTEGER NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    callsign TEXT NOT NULL UNIQUE,
-                    FOREIGN KEY (rule_id) REFERENCES notifications(id) ON DELETE CASCADE
-                )
-            """)
-            await db.commit()
-            print("Database setup complete.")
+        pass
+
+    async def close(self):
+        pass
+
+    # --- Notification Methods ---
+    @abstractmethod
+    async def add_notification(self, guild_id: int, airport: str, channel_id: int, role_id: Optional[int], delete_on_offline: bool): ...
+    @abstractmethod
+    async def get_notifications_by_guild(self, guild_id: int) -> list:
+        """Returns (id, airport_icao, channel_id, role_id) rows."""
+    @abstractmethod
+    async def get_all_notifications(self) -> list:
+        """Returns (id, guild_id, airport_icao, channel_id, role_id, delete_on_offline) rows."""
+    @abstractmethod
+    async def remove_notification(self, notification_id: int): ...
+    @abstractmethod
+    async def notification_exists(self, guild_id: int, airport: str, channel_id: int, role_id: Optional[int]) -> bool: ...
+    @abstractmethod
+    async def get_watched_airport_count(self) -> int: ...
+
+    # --- Active Notification Methods ---
+    @abstractmethod
+    async def add_active_notification(self, rule_id: int, message_id: int, channel_id: int, callsign: str):
+        """Ignored if the callsign already has an active notification."""
+    @abstractmethod
+    async def get_active_notification_by_callsign(self, callsign: str) -> tuple | None:
+        """Returns (id, message_id, channel_id)."""
+    @abstractmethod
+    async def get_all_active_rule_callsign_pairs(self) -> list: ...
+    @abstractmethod
+    async def remove_active_notification_by_callsign(self, callsign: str): ...
+
+    # --- Permission Methods ---
+    @abstractmethod
+    async def set_management_role(self, guild_id: int, role_id: int): ...
+    @abstractmethod
+    async def get_management_role(self, guild_id: int) -> int | None: ...
+
+    # --- Tracker Methods ---
+    # Tracker rows are (id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent)
+    @abstractmethod
+    async def add_flight_tracker(self, guild_id: int, channel_id: int, message_id: int, vatsim_cid: str, delete_on_offline: bool, role_id: Optional[int]): ...
+    @abstractmethod
+    async def get_all_flight_trackers(self) -> list: ...
+    @abstractmethod
+    async def get_flight_tracker_by_cid(self, guild_id: int, vatsim_cid: str) -> tuple | None: ...
+    @abstractmethod
+    async def remove_flight_tracker(self, tracker_id: int): ...
+    @abstractmethod
+    async def update_flight_tracker_message(self, tracker_id: int, new_message_id: int): ...
+    @abstractmethod
+    async def clear_flight_tracker_message(self, tracker_id: int): ...
+    @abstractmethod
+    async def set_flight_tracker_ping_status(self, tracker_id: int, status: bool): ...
+    @abstractmethod
+    async def add_controller_tracker(self, guild_id: int, channel_id: int, message_id: int, vatsim_cid: str, delete_on_offline: bool, role_id: Optional[int]): ...
+    @abstractmethod
+    async def get_all_controller_trackers(self) -> list: ...
+    @abstractmethod
+    async def get_controller_tracker_by_cid(self, guild_id: int, vatsim_cid: str) -> tuple | None: ...
+    @abstractmethod
+    async def remove_controller_tracker(self, tracker_id: int): ...
+    @abstractmethod
+    async def update_tracker_message(self, tracker_id: int, new_message_id: int): ...
+    @abstractmethod
+    async def clear_tracker_message(self, tracker_id: int): ...
+    @abstractmethod
+    async def set_controller_tracker_ping_status(self, tracker_id: int, status: bool): ...
+
+    # Bulk import: one query to validate, one transaction to insert, placeholders attached afterwards
+    @abstractmethod
+    async def get_tracked_flight_cids(self, guild_id: int, vatsim_cids: Iterable[str]) -> set:
+        """Returns which of the CIDs already have a flight tracker in the guild."""
+    @abstractmethod
+    async def add_flight_trackers(self, guild_id: int, rows: list) -> dict:
+        """Adds (channel_id, vatsim_cid, delete_on_offline, role_id) rows without messages, skipping CIDs the guild
+        already tracks. Returns {vatsim_cid: tracker_id} for the rows added."""
+    @abstractmethod
+    async def fill_flight_tracker_messages(self, messages: list) -> list:
+        """Sets (tracker_id, message_id) pairs on trackers that still have no message. Returns the tracker ids that took one."""
+    @abstractmethod
+    async def get_tracked_controller_cids(self, guild_id: int, vatsim_cids: Iterable[str]) -> set: ...
+    @abstractmethod
+    async def add_controller_trackers(self, guild_id: int, rows: list) -> dict: ...
+    @abstractmethod
+    async def fill_controller_tracker_messages(self, messages: list) -> list: ...
+
+    # --- ATIS Subscription Methods ---
+    # Subscription rows are (id, guild_id, channel_id, airport_icao, message_id, atis_hash)
+    @abstractmethod
+    async def add_atis_subscription(self, guild_id: int, channel_id: int, airport: str, message_id: Optional[int], atis_hash: Optional[str]) -> int:
+        """Returns the new subscription's id."""
+    @abstractmethod
+    async def get_all_atis_subscriptions(self) -> list: ...
+    @abstractmethod
+    async def get_atis_subscriptions_by_guild(self, guild_id: int) -> list: ...
+    @abstractmethod
+    async def remove_atis_subscription(self, subscription_id: int): ...
+    @abstractmethod
+    async def update_atis_subscription(self, subscription_id: int, message_id: Optional[int], atis_hash: Optional[str]):
+        """Records the board message and the hash of what it currently shows."""
+
+    # --- Board Methods ---
+    # Board rows are (id, guild_id, channel_id, name, message_id, fingerprint)
+    @abstractmethod
+    async def add_board(self, guild_id: int, channel_id: int, name: str, message_id: Optional[int]) -> int:
+        """Returns the new board's id."""
+    @abstractmethod
+    async def get_all_boards(self) -> list: ...
+    @abstractmethod
+    async def remove_board(self, board_id: int):
+        """Removes the board and its members."""
+    @abstractmethod
+    async def update_board_message(self, board_id: int, message_id: Optional[int], fingerprint: Optional[str]): ...
+    @abstractmethod
+    async def add_board_member(self, board_id: int, vatsim_cid: str): ...
+    @abstractmethod
+    async def remove_board_member(self, board_id: int, vatsim_cid: str): ...
+    @abstractmethod
+    async def get_all_board_members(self) -> list:
+        """Returns (board_id, vatsim_cid) rows."""
+
+    # --- Maintenance Methods ---
+    @abstractmethod
+    async def get_referenced_channels(self) -> list:
+        """Returns every distinct (guild_id, channel_id) the stored rows refer to; channel_id is None for guild-only rows."""
+    @abstractmethod
+    async def purge(self, guild_ids: Iterable[int] = (), channel_ids: Iterable[int] = ()) -> int:
+        """Deletes everything belonging to the given guilds or channels. Returns the number of rows deleted."""
+    @abstractmethod
+    async def compact(self, min_free_ratio: float = 0.2) -> int:
+        """Reclaims free space if at least `min_free_ratio` of the store is unused. Returns the pages freed."""
+
+
+@metrics.timed_methods(metrics.DB_QUERY_SECONDS)
+class DatabaseManager(Storage):
+    """Manages the bot's SQLite database over a single connection kept open for the bot's lifetime.
+
+    Every cog shares that connection, so each write goes through `_transaction()`: one coroutine's
+    statements can't be committed or rolled back halfway by another's."""
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DB_FILE
+        self._db: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+
+    @contextlib.asynccontextmanager
+    async def _transaction(self):
+        """Holds the connection for a group of statements, committing them together or rolling them all back."""
+        async with self._lock:
+            try:
+                yield
+            except BaseException:
+                await self._db.rollback()
+                raise
+            await self._db.commit()
+
+    async def setup(self):
+        """Opens the database and brings its schema up to date."""
+        self._db = await aiosqlite.connect(self.path)
+        # WAL lets readers run alongside a write; NORMAL sync is still crash-safe in WAL mode
+        await self._db.execute("PRAGMA journal_mode = WAL")
+        await self._db.execute("PRAGMA synchronous = NORMAL")
+        await self._db.execute("PRAGMA temp_store = MEMORY")
+        await self._db.execute("PRAGMA cache_size = -16000")
+
+        async with self._db.execute("PRAGMA user_version") as cursor:
+            version = (await cursor.fetchone())[0]
+        for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            async with self._transaction():
+                await migration(self._db)
+                # PRAGMA doesn't take parameters; target is always one of our own integers
+                await self._db.execute(f"PRAGMA user_version = {target}")
+            log.info("Applied database migration", version=target, migration=migration.__doc__)
+        log.info("Database setup complete", schema_version=len(MIGRATIONS))
+
+    async def close(self):
+        if self._db is not None:
+            # Waits for a write in progress to finish
+            async with self._lock:
+                await self._db.execute("PRAGMA optimize")
+                await self._db.close()
+                self._db = None
 
     # --- Notification Methods ---
     async def add_notification(self, guild_id: int, airport: str, channel_id: int, role_id: Optional[int], delete_on_offline: bool):
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute(
+        async with self._transaction():
+            await self._db.execute(
                 "INSERT INTO notifications (guild_id, airport_icao, channel_id, role_id, delete_on_offline) VALUES (?, ?, ?, ?, ?)",
                 (guild_id, airport.upper(), channel_id, role_id, delete_on_offline)
             )
-            await db.commit()
 
     async def get_notifications_by_guild(self, guild_id: int) -> list:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT id, airport_icao, channel_id, role_id FROM notifications WHERE guild_id = ?", (guild_id,)) as cursor:
-                return await cursor.fetchall()
+        async with self._db.execute("SELECT id, airport_icao, channel_id, role_id FROM notifications WHERE guild_id = ?", (guild_id,)) as cursor:
+            return await cursor.fetchall()
 
     async def get_all_notifications(self) -> list:
-         async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT id, guild_id, airport_icao, channel_id, role_id, delete_on_offline FROM notifications") as cursor:
-                return await cursor.fetchall()
+        async with self._db.execute("SELECT id, guild_id, airport_icao, channel_id, role_id, delete_on_offline FROM notifications") as cursor:
+            return await cursor.fetchall()
 
     async def remove_notification(self, notification_id: int):
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("DELETE FROM notifications WHERE id = ?", (notification_id,))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("DELETE FROM notifications WHERE id = ?", (notification_id,))
 
     async def notification_exists(self, guild_id: int, airport: str, channel_id: int, role_id: Optional[int]) -> bool:
         """Checks if an identical notification rule already exists."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            query = "SELECT 1 FROM notifications WHERE guild_id = ? AND airport_icao = ? AND channel_id = ? AND "
-            params = [guild_id, airport.upper(), channel_id]
-            if role_id is None:
-                query += "role_id IS NULL"
-            else:
-                query += "role_id = ?"
-                params.append(role_id)
-
-            async with db.execute(query, tuple(params)) as cursor:
-                return await cursor.fetchone() is not None
-    
+        query = "SELECT 1 FROM notifications WHERE guild_id = ? AND airport_icao = ? AND channel_id = ? AND "
+        params = [guild_id, airport.upper(), channel_id]
+        if role_id is None:
+            query += "role_id IS NULL"
+        else:
+            query += "role_id = ?"
+            params.append(role_id)
+
+        async with self._db.execute(query, tuple(params)) as cursor:
+            return await cursor.fetchone() is not None
+
     # --- Active Notification Methods (for message deletion) ---
     async def add_active_notification(self, rule_id: int, message_id: int, channel_id: int, callsign: str):
         """Stores a sent notification message so it can be deleted later."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute(
+        async with self._transaction():
+            await self._db.execute(
                 "INSERT OR IGNORE INTO active_notifications (rule_id, message_id, channel_id, callsign) VALUES (?, ?, ?, ?)",
                 (rule_id, message_id, channel_id, callsign)
             )
-            await db.commit()
 
     async def get_active_notification_by_callsign(self, callsign: str) -> tuple | None:
         """Retrieves an active notification's details using the controller's callsign."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT id, message_id, channel_id FROM active_notifications WHERE callsign = ?", (callsign,)) as cursor:
-                return await cursor.fetchone()
-    
+        async with self._db.execute("SELECT id, message_id, channel_id FROM active_notifications WHERE callsign = ?", (callsign,)) as cursor:
+            return await cursor.fetchone()
+
     async def get_all_active_rule_callsign_pairs(self) -> list:
         """Gets all (rule_id, callsign) pairs to rehydrate the bot's memory."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT rule_id, callsign FROM active_notifications") as cursor:
-                return await cursor.fetchall()
+        async with self._db.execute("SELECT rule_id, callsign FROM active_notifications") as cursor:
+            return await cursor.fetchall()
 
     async def remove_active_notification_by_callsign(self, callsign: str):
         """Removes an active notification record from the database."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("DELETE FROM active_notifications WHERE callsign = ?", (callsign,))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("DELETE FROM active_notifications WHERE callsign = ?", (callsign,))
 
     # --- Permission Methods ---
     async def set_management_role(self, guild_id: int, role_id: int):
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute(
+        async with self._transaction():
+            await self._db.execute(
                 "INSERT OR REPLACE INTO permissions (guild_id, role_id) VALUES (?, ?)",
                 (guild_id, role_id)
             )
-            await db.commit()
 
     async def get_management_role(self, guild_id: int) -> int | None:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT role_id FROM permissions WHERE guild_id = ?", (guild_id,)) as cursor:
-                result = await cursor.fetchone()
-                return result[0] if result else None
-            
+        async with self._db.execute("SELECT role_id FROM permissions WHERE guild_id = ?", (guild_id,)) as cursor:
+            result = await cursor.fetchone()
+            return result[0] if result else None
+        
     async def get_watched_airport_count(self) -> int:
         """Counts the number of unique airports being watched."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT COUNT(DISTINCT airport_icao) FROM notifications") as cursor:
-                result = await cursor.fetchone()
-                return result[0] if result else 0
+        async with self._db.execute("SELECT COUNT(DISTINCT airport_icao) FROM notifications") as cursor:
+            result = await cursor.fetchone()
+            return result[0] if result else 0
 
     # --- Flight Tracker Methods ---
     async def add_flight_tracker(self, guild_id: int, channel_id: int, message_id: int, vatsim_cid: str, delete_on_offline: bool, role_id: Optional[int]):
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute(
+        async with self._transaction():
+            await self._db.execute(
                 "INSERT INTO flight_trackers (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id) VALUES (?, ?, ?, ?, ?, ?)",
                 (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id)
             )
-            await db.commit()
 
     async def get_all_flight_trackers(self) -> list:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent FROM flight_trackers") as cursor:
-                return await cursor.fetchall()
+        async with self._db.execute("SELECT id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent FROM flight_trackers") as cursor:
+            return await cursor.fetchall()
 
     async def get_flight_tracker_by_cid(self, guild_id: int, vatsim_cid: str) -> tuple | None:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent FROM flight_trackers WHERE guild_id = ? AND vatsim_cid = ?", (guild_id, vatsim_cid)) as cursor:
-                return await cursor.fetchone()
+        async with self._db.execute("SELECT id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent FROM flight_trackers WHERE guild_id = ? AND vatsim_cid = ?", (guild_id, vatsim_cid)) as cursor:
+            return await cursor.fetchone()
 
     async def remove_flight_tracker(self, tracker_id: int):
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("DELETE FROM flight_trackers WHERE id = ?", (tracker_id,))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("DELETE FROM flight_trackers WHERE id = ?", (tracker_id,))
 
     async def update_flight_tracker_message(self, tracker_id: int, new_message_id: int):
         """Updates the message ID for a flight tracker, used after re-posting."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("UPDATE flight_trackers SET message_id = ? WHERE id = ?", (new_message_id, tracker_id))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("UPDATE flight_trackers SET message_id = ? WHERE id = ?", (new_message_id, tracker_id))
 
     async def clear_flight_tracker_message(self, tracker_id: int):
         """Sets a flight tracker's message ID to NULL, used after deleting a message."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("UPDATE flight_trackers SET message_id = NULL WHERE id = ?", (tracker_id,))
-            await db.commit()
-            
+        async with self._transaction():
+            await self._db.execute("UPDATE flight_trackers SET message_id = NULL WHERE id = ?", (tracker_id,))
+        
     async def set_flight_tracker_ping_status(self, tracker_id: int, status: bool):
         """Sets the ping_sent status for a flight tracker."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("UPDATE flight_trackers SET ping_sent = ? WHERE id = ?", (status, tracker_id))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("UPDATE flight_trackers SET ping_sent = ? WHERE id = ?", (status, tracker_id))
 
     # --- Controller Tracker Methods ---
     async def add_controller_tracker(self, guild_id: int, channel_id: int, message_id: int, vatsim_cid: str, delete_on_offline: bool, role_id: Optional[int]):
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute(
+        async with self._transaction():
+            await self._db.execute(
                 "INSERT INTO controller_trackers (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id) VALUES (?, ?, ?, ?, ?, ?)",
                 (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id)
             )
-            await db.commit()
 
     async def get_all_controller_trackers(self) -> list:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent FROM controller_trackers") as cursor:
-                return await cursor.fetchall()
+        async with self._db.execute("SELECT id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent FROM controller_trackers") as cursor:
+            return await cursor.fetchall()
 
     async def get_controller_tracker_by_cid(self, guild_id: int, vatsim_cid: str) -> tuple | None:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent FROM controller_trackers WHERE guild_id = ? AND vatsim_cid = ?", (guild_id, vatsim_cid)) as cursor:
-                return await cursor.fetchone()
+        async with self._db.execute("SELECT id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent FROM controller_trackers WHERE guild_id = ? AND vatsim_cid = ?", (guild_id, vatsim_cid)) as cursor:
+            return await cursor.fetchone()
 
     async def remove_controller_tracker(self, tracker_id: int):
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("DELETE FROM controller_trackers WHERE id = ?", (tracker_id,))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("DELETE FROM controller_trackers WHERE id = ?", (tracker_id,))
 
     async def update_tracker_message(self, tracker_id: int, new_message_id: int):
         """Updates the message ID for a controller tracker, used after re-posting."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("UPDATE controller_trackers SET message_id = ? WHERE id = ?", (new_message_id, tracker_id))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("UPDATE controller_trackers SET message_id = ? WHERE id = ?", (new_message_id, tracker_id))
 
     async def clear_tracker_message(self, tracker_id: int):
         """Sets a tracker's message ID to NULL, used after deleting a message."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("UPDATE controller_trackers SET message_id = NULL WHERE id = ?", (tracker_id,))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("UPDATE controller_trackers SET message_id = NULL WHERE id = ?", (tracker_id,))
 
     async def set_controller_tracker_ping_status(self, tracker_id: int, status: bool):
         """Sets the ping_sent status for a controller tracker."""
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("UPDATE controller_trackers SET ping_sent = ? WHERE id = ?", (status, tracker_id))
-            await db.commit()
+        async with self._transaction():
+            await self._db.execute("UPDATE controller_trackers SET ping_sent = ? WHERE id = ?", (status, tracker_id))
+
+    # --- Bulk Tracker Methods ---
+    async def get_tracked_flight_cids(self, guild_id: int, vatsim_cids: Iterable[str]) -> set:
+        return await self._tracked_cids("flight_trackers", guild_id, vatsim_cids)
+
+    async def add_flight_trackers(self, guild_id: int, rows: list) -> dict:
+        return await self._add_trackers("flight_trackers", guild_id, rows)
+
+    async def fill_flight_tracker_messages(self, messages: list) -> list:
+        return await self._fill_tracker_messages("flight_trackers", messages)
+
+    async def get_tracked_controller_cids(self, guild_id: int, vatsim_cids: Iterable[str]) -> set:
+        return await self._tracked_cids("controller_trackers", guild_id, vatsim_cids)
+
+    async def add_controller_trackers(self, guild_id: int, rows: list) -> dict:
+        return await self._add_trackers("controller_trackers", guild_id, rows)
+
+    async def fill_controller_tracker_messages(self, messages: list) -> list:
+        return await self._fill_tracker_messages("controller_trackers", messages)
+
+    async def _tracked_cids(self, table: str, guild_id: int, vatsim_cids: Iterable[str]) -> set:
+        # Bound IN lists, in chunks that stay under SQLite's limit on parameters per statement
+        vatsim_cids = list(vatsim_cids)
+        tracked = set()
+        for start in range(0, len(vatsim_cids), MAX_BOUND_IDS):
+            chunk = vatsim_cids[start:start + MAX_BOUND_IDS]
+            query = f"SELECT vatsim_cid FROM {table} WHERE guild_id = ? AND vatsim_cid IN ({', '.join('?' * len(chunk))})"
+            async with self._db.execute(query, (guild_id, *chunk)) as cursor:
+                tracked.update(row[0] for row in await cursor.fetchall())
+        return tracked
+
+    async def _add_trackers(self, table: str, guild_id: int, rows: list) -> dict:
+        # One insert per row so each id comes straight from lastrowid; an import is at most a few hundred rows.
+        # A CID tracked since the caller checked (another import, /track) is skipped rather than duplicated.
+        ids = {}
+        async with self._transaction():
+            for channel_id, cid, delete_on_offline, role_id in rows:
+                cursor = await self._db.execute(
+                    f"""INSERT INTO {table} (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id)
+                        SELECT ?, ?, NULL, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE guild_id = ? AND vatsim_cid = ?)""",
+                    (guild_id, channel_id, cid, delete_on_offline, role_id, guild_id, cid)
+                )
+                if cursor.rowcount:
+                    ids[cid] = cursor.lastrowid
+        return ids
+
+    async def _fill_tracker_messages(self, table: str, messages: list) -> list:
+        # The update loop may have posted for a tracker while its placeholder was queued; that message wins
+        filled = []
+        async with self._transaction():
+            for tracker_id, message_id in messages:
+                cursor = await self._db.execute(f"UPDATE {table} SET message_id = ? WHERE id = ? AND message_id IS NULL", (message_id, tracker_id))
+                if cursor.rowcount:
+                    filled.append(tracker_id)
+        return filled
+
+    # --- ATIS Subscription Methods ---
+    async def add_atis_subscription(self, guild_id: int, channel_id: int, airport: str, message_id: Optional[int], atis_hash: Optional[str]) -> int:
+        async with self._transaction():
+            cursor = await self._db.execute(
+                "INSERT INTO atis_subscriptions (guild_id, channel_id, airport_icao, message_id, atis_hash) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, channel_id, airport.upper(), message_id, atis_hash)
+            )
+        return cursor.lastrowid
+
+    async def get_all_atis_subscriptions(self) -> list:
+        async with self._db.execute("SELECT id, guild_id, channel_id, airport_icao, message_id, atis_hash FROM atis_subscriptions") as cursor:
+            return await cursor.fetchall()
+
+    async def get_atis_subscriptions_by_guild(self, guild_id: int) -> list:
+        async with self._db.execute("SELECT id, guild_id, channel_id, airport_icao, message_id, atis_hash FROM atis_subscriptions WHERE guild_id = ?", (guild_id,)) as cursor:
+            return await cursor.fetchall()
+
+    async def remove_atis_subscription(self, subscription_id: int):
+        async with self._transaction():
+            await self._db.execute("DELETE FROM atis_subscriptions WHERE id = ?", (subscription_id,))
+
+    async def update_atis_subscription(self, subscription_id: int, message_id: Optional[int], atis_hash: Optional[str]):
+        async with self._transaction():
+            await self._db.execute("UPDATE atis_subscriptions SET message_id = ?, atis_hash = ? WHERE id = ?", (message_id, atis_hash, subscription_id))
+
+    # --- Board Methods ---
+    async def add_board(self, guild_id: int, channel_id: int, name: str, message_id: Optional[int]) -> int:
+        async with self._transaction():
+            cursor = await self._db.execute(
+                "INSERT INTO boards (guild_id, channel_id, name, message_id) VALUES (?, ?, ?, ?)",
+                (guild_id, channel_id, name, message_id)
+            )
+        return cursor.lastrowid
+
+    async def get_all_boards(self) -> list:
+        async with self._db.execute("SELECT id, guild_id, channel_id, name, message_id, fingerprint FROM boards") as cursor:
+            return await cursor.fetchall()
+
+    async def remove_board(self, board_id: int):
+        async with self._transaction():
+            # Foreign keys aren't enforced, so members are removed explicitly
+            await self._db.execute("DELETE FROM board_members WHERE board_id = ?", (board_id,))
+            await self._db.execute("DELETE FROM boards WHERE id = ?", (board_id,))
+
+    async def update_board_message(self, board_id: int, message_id: Optional[int], fingerprint: Optional[str]):
+        async with self._transaction():
+            await self._db.execute("UPDATE boards SET message_id = ?, fingerprint = ? WHERE id = ?", (message_id, fingerprint, board_id))
+
+    async def add_board_member(self, board_id: int, vatsim_cid: str):
+        async with self._transaction():
+            await self._db.execute("INSERT OR IGNORE INTO board_members (board_id, vatsim_cid) VALUES (?, ?)", (board_id, vatsim_cid))
+
+    async def remove_board_member(self, board_id: int, vatsim_cid: str):
+        async with self._transaction():
+            await self._db.execute("DELETE FROM board_members WHERE board_id = ? AND vatsim_cid = ?", (board_id, vatsim_cid))
+
+    async def get_all_board_members(self) -> list:
+        async with self._db.execute("SELECT board_id, vatsim_cid FROM board_members") as cursor:
+            return await cursor.fetchall()
+
+    # --- Maintenance Methods ---
+    async def get_referenced_channels(self) -> list:
+        query = " UNION ".join(f"SELECT guild_id, channel_id FROM {table}" for table in CHANNEL_TABLES)
+        async with self._db.execute(query + " UNION SELECT guild_id, NULL FROM permissions") as cursor:
+            return await cursor.fetchall()
+
+    async def purge(self, guild_ids: Iterable[int] = (), channel_ids: Iterable[int] = ()) -> int:
+        # The ids go through temp tables so any number of them costs one statement per table
+        statements = [
+            # Foreign keys aren't enforced, so dependent rows go first, while their parents can still be found
+            """DELETE FROM active_notifications WHERE channel_id IN (SELECT id FROM temp.purge_channels)
+               OR rule_id IN (SELECT id FROM notifications WHERE guild_id IN (SELECT id FROM temp.purge_guilds))""",
+            """DELETE FROM board_members WHERE board_id IN (SELECT id FROM boards
+               WHERE guild_id IN (SELECT id FROM temp.purge_guilds) OR channel_id IN (SELECT id FROM temp.purge_channels))""",
+            *(
+                f"""DELETE FROM {table} WHERE guild_id IN (SELECT id FROM temp.purge_guilds)
+                    OR channel_id IN (SELECT id FROM temp.purge_channels)"""
+                for table in CHANNEL_TABLES
+            ),
+            "DELETE FROM permissions WHERE guild_id IN (SELECT id FROM temp.purge_guilds)",
+        ]
+        deleted = 0
+        # The temp tables are shared by every caller on this connection, so the whole purge holds the lock
+        async with self._transaction():
+            await self._db.execute("CREATE TEMP TABLE IF NOT EXISTS purge_guilds (id INTEGER PRIMARY KEY)")
+            await self._db.execute("CREATE TEMP TABLE IF NOT EXISTS purge_channels (id INTEGER PRIMARY KEY)")
+            await self._db.execute("DELETE FROM temp.purge_guilds")
+            await self._db.execute("DELETE FROM temp.purge_channels")
+            await self._db.executemany("INSERT OR IGNORE INTO temp.purge_guilds VALUES (?)", ((i,) for i in guild_ids))
+            await self._db.executemany("INSERT OR IGNORE INTO temp.purge_channels VALUES (?)", ((i,) for i in channel_ids))
+            for statement in statements:
+                cursor = await self._db.execute(statement)
+                deleted += cursor.rowcount
+            await self._db.execute("DELETE FROM temp.purge_guilds")
+            await self._db.execute("DELETE FROM temp.purge_channels")
+        return deleted
+
+    async def compact(self, min_free_ratio: float = 0.2) -> int:
+        async with self._db.execute("PRAGMA page_count") as cursor:
+            page_count = (await cursor.fetchone())[0]
+        async with self._db.execute("PRAGMA freelist_count") as cursor:
+            free_pages = (await cursor.fetchone())[0]
+
+        freed = 0
+        # VACUUM can't run inside a transaction, so this holds the lock itself rather than using _transaction()
+        async with self._lock:
+            if page_count and free_pages / page_count >= min_free_ratio:
+                await self._db.commit()
+                await self._db.execute("VACUUM")
+                # VACUUM goes through the WAL in WAL mode; truncate it so the disk space actually comes back
+                await self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                freed = free_pages
+            await self._db.execute("PRAGMA optimize")
+        return freed
+
+
+class _MemoryTrackers:
+    """One tracker table held as {id: row list}, with a (guild_id, vatsim_cid) index."""
+    def __init__(self):
+        self.rows = {}
+        self.by_cid = {}
+        self._ids = itertools.count(1)
+
+    def add(self, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id):
+        tracker_id = next(self._ids)
+        self.rows[tracker_id] = [tracker_id, guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, False]
+        self.by_cid.setdefault((guild_id, vatsim_cid), tracker_id)
+        return tracker_id
+
+    def add_many(self, guild_id, rows) -> dict:
+        return {
+            cid: self.add(guild_id, channel_id, None, cid, delete_on_offline, role_id)
+            for channel_id, cid, delete_on_offline, role_id in rows
+            if (guild_id, cid) not in self.by_cid
+        }
+
+    def tracked(self, guild_id, vatsim_cids) -> set:
+        return {cid for cid in vatsim_cids if (guild_id, cid) in self.by_cid}
+
+    def fill_messages(self, messages) -> list:
+        filled = []
+        for tracker_id, message_id in messages:
+            row = self.rows.get(tracker_id)
+            if row and row[3] is None:
+                row[3] = message_id
+                filled.append(tracker_id)
+        return filled
+
+    def all(self) -> list:
+        return [tuple(row) for row in self.rows.values()]
+
+    def by_guild_cid(self, guild_id, vatsim_cid) -> tuple | None:
+        tracker_id = self.by_cid.get((guild_id, vatsim_cid))
+        return tuple(self.rows[tracker_id]) if tracker_id else None
+
+    def remove(self, tracker_id):
+        row = self.rows.pop(tracker_id, None)
+        if row and self.by_cid.get((row[1], row[4])) == tracker_id:
+            del self.by_cid[(row[1], row[4])]
+            # Duplicates are possible in the SQLite schema too; the next oldest takes over
+            for other in self.rows.values():
+                if (other[1], other[4]) == (row[1], row[4]):
+                    self.by_cid[(row[1], row[4])] = other[0]
+                    break
+
+    def set(self, tracker_id, column, value):
+        if tracker_id in self.rows:
+            self.rows[tracker_id][column] = value
+
+
+@metrics.timed_methods(metrics.DB_QUERY_SECONDS)
+class MemoryStorage(Storage):
+    """Keeps everything in dicts and loses it on exit. Used by the benchmarks to take storage out of the picture."""
+    def __init__(self):
+        self.notifications = {}
+        self.active_notifications = {}
+        self.permissions = {}
+        self.flight_trackers = _MemoryTrackers()
+        self.controller_trackers = _MemoryTrackers()
+        self._notification_ids = itertools.count(1)
+        self._active_ids = itertools.count(1)
+        self.atis_subscriptions = {}
+        self._subscription_ids = itertools.count(1)
+        self.boards = {}
+        self.board_members = {}
+        self._board_ids = itertools.count(1)
+
+    # --- Notification Methods ---
+    async def add_notification(self, guild_id: int, airport: str, channel_id: int, role_id: Optional[int], delete_on_offline: bool):
+        notification_id = next(self._notification_ids)
+        self.notifications[notification_id] = (notification_id, guild_id, airport.upper(), channel_id, role_id, delete_on_offline)
+
+    async def get_notifications_by_guild(self, guild_id: int) -> list:
+        return [(n[0], n[2], n[3], n[4]) for n in self.notifications.values() if n[1] == guild_id]
+
+    async def get_all_notifications(self) -> list:
+        return list(self.notifications.values())
+
+    async def remove_notification(self, notification_id: int):
+        self.notifications.pop(notification_id, None)
+
+    async def notification_exists(self, guild_id: int, airport: str, channel_id: int, role_id: Optional[int]) -> bool:
+        return any(n[1:5] == (guild_id, airport.upper(), channel_id, role_id) for n in self.notifications.values())
+
+    async def get_watched_airport_count(self) -> int:
+        return len({n[2] for n in self.notifications.values()})
+
+    # --- Active Notification Methods ---
+    async def add_active_notification(self, rule_id: int, message_id: int, channel_id: int, callsign: str):
+        if callsign not in self.active_notifications:
+            self.active_notifications[callsign] = (next(self._active_ids), rule_id, message_id, channel_id)
+
+    async def get_active_notification_by_callsign(self, callsign: str) -> tuple | None:
+        active = self.active_notifications.get(callsign)
+        return (active[0], active[2], active[3]) if active else None
+
+    async def get_all_active_rule_callsign_pairs(self) -> list:
+        return [(active[1], callsign) for callsign, active in self.active_notifications.items()]
+
+    async def remove_active_notification_by_callsign(self, callsign: str):
+        self.active_notifications.pop(callsign, None)
+
+    # --- Permission Methods ---
+    async def set_management_role(self, guild_id: int, role_id: int):
+        self.permissions[guild_id] = role_id
+
+    async def get_management_role(self, guild_id: int) -> int | None:
+        return self.permissions.get(guild_id)
+
+    # --- Flight Tracker Methods ---
+    async def add_flight_tracker(self, guild_id: int, channel_id: int, message_id: int, vatsim_cid: str, delete_on_offline: bool, role_id: Optional[int]):
+        self.flight_trackers.add(guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id)
+
+    async def get_all_flight_trackers(self) -> list:
+        return self.flight_trackers.all()
+
+    async def get_flight_tracker_by_cid(self, guild_id: int, vatsim_cid: str) -> tuple | None:
+        return self.flight_trackers.by_guild_cid(guild_id, vatsim_cid)
+
+    async def remove_flight_tracker(self, tracker_id: int):
+        self.flight_trackers.remove(tracker_id)
+
+    async def update_flight_tracker_message(self, tracker_id: int, new_message_id: int):
+        self.flight_trackers.set(tracker_id, 3, new_message_id)
+
+    async def clear_flight_tracker_message(self, tracker_id: int):
+        self.flight_trackers.set(tracker_id, 3, None)
+
+    async def set_flight_tracker_ping_status(self, tracker_id: int, status: bool):
+        self.flight_trackers.set(tracker_id, 7, status)
+
+    # --- Controller Tracker Methods ---
+    async def add_controller_tracker(self, guild_id: int, channel_id: int, message_id: int, vatsim_cid: str, delete_on_offline: bool, role_id: Optional[int]):
+        self.controller_trackers.add(guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id)
+
+    async def get_all_controller_trackers(self) -> list:
+        return self.controller_trackers.all()
+
+    async def get_controller_tracker_by_cid(self, guild_id: int, vatsim_cid: str) -> tuple | None:
+        return self.controller_trackers.by_guild_cid(guild_id, vatsim_cid)
+
+    async def remove_controller_tracker(self, tracker_id: int):
+        self.controller_trackers.remove(tracker_id)
+
+    async def update_tracker_message(self, tracker_id: int, new_message_id: int):
+        self.controller_trackers.set(tracker_id, 3, new_message_id)
+
+    async def clear_tracker_message(self, tracker_id: int):
+        self.controller_trackers.set(tracker_id, 3, None)
+
+    async def set_controller_tracker_ping_status(self, tracker_id: int, status: bool):
+        self.controller_trackers.set(tracker_id, 7, status)
+
+    # --- Bulk Tracker Methods ---
+    async def get_tracked_flight_cids(self, guild_id: int, vatsim_cids: Iterable[str]) -> set:
+        return self.flight_trackers.tracked(guild_id, vatsim_cids)
+
+    async def add_flight_trackers(self, guild_id: int, rows: list) -> dict:
+        return self.flight_trackers.add_many(guild_id, rows)
+
+    async def fill_flight_tracker_messages(self, messages: list) -> list:
+        return self.flight_trackers.fill_messages(messages)
+
+    async def get_tracked_controller_cids(self, guild_id: int, vatsim_cids: Iterable[str]) -> set:
+        return self.controller_trackers.tracked(guild_id, vatsim_cids)
+
+    async def add_controller_trackers(self, guild_id: int, rows: list) -> dict:
+        return self.controller_trackers.add_many(guild_id, rows)
+
+    async def fill_controller_tracker_messages(self, messages: list) -> list:
+        return self.controller_trackers.fill_messages(messages)
+
+    # --- ATIS Subscription Methods ---
+    async def add_atis_subscription(self, guild_id: int, channel_id: int, airport: str, message_id: Optional[int], atis_hash: Optional[str]) -> int:
+        subscription_id = next(self._subscription_ids)
+        self.atis_subscriptions[subscription_id] = (subscription_id, guild_id, channel_id, airport.upper(), message_id, atis_hash)
+        return subscription_id
+
+    async def get_all_atis_subscriptions(self) -> list:
+        return list(self.atis_subscriptions.values())
+
+    async def get_atis_subscriptions_by_guild(self, guild_id: int) -> list:
+        return [s for s in self.atis_subscriptions.values() if s[1] == guild_id]
+
+    async def remove_atis_subscription(self, subscription_id: int):
+        self.atis_subscriptions.pop(subscription_id, None)
+
+    async def update_atis_subscription(self, subscription_id: int, message_id: Optional[int], atis_hash: Optional[str]):
+        subscription = self.atis_subscriptions.get(subscription_id)
+        if subscription:
+            self.atis_subscriptions[subscription_id] = subscription[:4] + (message_id, atis_hash)
+
+    # --- Board Methods ---
+    async def add_board(self, guild_id: int, channel_id: int, name: str, message_id: Optional[int]) -> int:
+        board_id = next(self._board_ids)
+        self.boards[board_id] = (board_id, guild_id, channel_id, name, message_id, None)
+        self.board_members[board_id] = {}
+        return board_id
+
+    async def get_all_boards(self) -> list:
+        return list(self.boards.values())
+
+    async def remove_board(self, board_id: int):
+        self.boards.pop(board_id, None)
+        self.board_members.pop(board_id, None)
+
+    async def update_board_message(self, board_id: int, message_id: Optional[int], fingerprint: Optional[str]):
+        board = self.boards.get(board_id)
+        if board:
+            self.boards[board_id] = board[:4] + (message_id, fingerprint)
+
+    async def add_board_member(self, board_id: int, vatsim_cid: str):
+        # A dict keeps insertion order, like rowid order in SQLite
+        self.board_members.setdefault(board_id, {})[vatsim_cid] = None
+
+    async def remove_board_member(self, board_id: int, vatsim_cid: str):
+        self.board_members.get(board_id, {}).pop(vatsim_cid, None)
+
+    async def get_all_board_members(self) -> list:
+        return [(board_id, cid) for board_id, members in self.board_members.items() for cid in members]
+
+    # --- Maintenance Methods ---
+    async def get_referenced_channels(self) -> list:
+        rows = [(n[1], n[3]) for n in self.notifications.values()]
+        for trackers in (self.flight_trackers, self.controller_trackers):
+            rows.extend((t[1], t[2]) for t in trackers.rows.values())
+        rows.extend((s[1], s[2]) for s in self.atis_subscriptions.values())
+        rows.extend((b[1], b[2]) for b in self.boards.values())
+        rows.extend((guild_id, None) for guild_id in self.permissions)
+        return list(dict.fromkeys(rows))
+
+    async def purge(self, guild_ids: Iterable[int] = (), channel_ids: Iterable[int] = ()) -> int:
+        guild_ids, channel_ids = set(guild_ids), set(channel_ids)
+
+        def doomed(guild_id, channel_id):
+            return guild_id in guild_ids or channel_id in channel_ids
+
+        deleted = 0
+        doomed_rules = {n[0] for n in self.notifications.values() if n[1] in guild_ids}
+        for callsign, active in list(self.active_notifications.items()):
+            if active[3] in channel_ids or active[1] in doomed_rules:
+                del self.active_notifications[callsign]
+                deleted += 1
+        for board_id, board in list(self.boards.items()):
+            if doomed(board[1], board[2]):
+                deleted += len(self.board_members.pop(board_id, {})) + 1
+                del self.boards[board_id]
+        for table, guild_column, channel_column in ((self.notifications, 1, 3), (self.atis_subscriptions, 1, 2)):
+            for row_id, row in list(table.items()):
+                if doomed(row[guild_column], row[channel_column]):
+                    del table[row_id]
+                    deleted += 1
+        for trackers in (self.flight_trackers, self.controller_trackers):
+            for tracker_id, row in list(trackers.rows.items()):
+                if doomed(row[1], row[2]):
+                    trackers.remove(tracker_id)
+                    deleted += 1
+        for guild_id in guild_ids & self.permissions.keys():
+            del self.permissions[guild_id]
+            deleted += 1
+        return deleted
+
+    async def compact(self, min_free_ratio: float = 0.2) -> int:
+        return 0
+
+
+STORAGE_BACKENDS = {
+    "sqlite": DatabaseManager,
+    "memory": MemoryStorage,
+}
+
+
+async def create_storage(backend: str = "sqlite") -> Storage:
+    """Builds and sets up the named storage backend."""
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend {backend!r}, expected one of: {', '.join(STORAGE_BACKENDS)}")
+    storage = STORAGE_BACKENDS[backend]()
+    await storage.setup()
+    return storage
@@ -0,0 +1,160 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict
+
+from log import get_logger
+
+log = get_logger(__name__)
+
+# The feed fields the bot reads. msgspec decodes straight into plain dicts of this shape, skipping every
+# other field, so the rest of the code keeps indexing dicts whichever backend is in use.
+# total=False: a field the feed leaves out is simply absent, as it would be with json.loads.
+class FlightPlan(TypedDict, total=False):
+    flight_rules: str
+    aircraft: str
+    aircraft_faa: str
+    aircraft_short: str
+    departure: str
+    arrival: str
+    alternate: str
+    cruise_tas: Any
+    altitude: Any
+    deptime: str
+    enroute_time: str
+    fuel_time: str
+    remarks: str
+    route: str
+    revision_id: int
+    assigned_transponder: str
+
+
+class Pilot(TypedDict, total=False):
+    cid: int
+    name: str
+    callsign: str
+    server: str
+    pilot_rating: int
+    military_rating: int
+    latitude: float
+    longitude: float
+    altitude: int
+    groundspeed: int
+    transponder: str
+    heading: int
+    qnh_i_hg: float
+    qnh_mb: int
+    flight_plan: Optional[FlightPlan]
+    logon_time: str
+    last_updated: str
+
+
+class Controller(TypedDict, total=False):
+    cid: int
+    name: str
+    callsign: str
+    frequency: str
+    facility: int
+    rating: int
+    server: str
+    visual_range: int
+    atis_code: Optional[str]
+    text_atis: Optional[List[str]]
+    last_updated: str
+    logon_time: str
+
+
+class VatsimData(TypedDict, total=False):
+    general: Dict[str, Any]
+    pilots: List[Pilot]
+    controllers: List[Controller]
+    atis: List[Controller]
+
+
+# transceivers-data.json: a list of these, one per connected callsign
+class Transceiver(TypedDict, total=False):
+    id: int
+    frequency: int
+    latDeg: float
+    lonDeg: float
+    heightMslM: float
+    heightAglM: float
+
+
+class TransceiverStation(TypedDict, total=False):
+    callsign: str
+    transceivers: List[Transceiver]
+
+
+def _json(schema) -> Callable[[bytes], Any]:
+    return json.loads
+
+
+def _orjson(schema) -> Callable[[bytes], Any]:
+    import orjson
+    return orjson.loads
+
+
+def _msgspec(schema) -> Callable[[bytes], Any]:
+    import msgspec
+    typed = msgspec.json.Decoder(schema)
+    untyped = msgspec.json.Decoder()
+
+    def decode(raw: bytes) -> Any:
+        try:
+            return typed.decode(raw)
+        except msgspec.ValidationError as e:
+            # A field changing type upstream shouldn't take the bot down; decode everything as-is instead
+            log.warning("VATSIM feed didn't match the expected schema, decoding without it", error=e)
+            return untyped.decode(raw)
+    return decode
+
+
+# In order of preference
+DECODERS = {
+    "msgspec": _msgspec,
+    "orjson": _orjson,
+    "json": _json,
+}
+
+
+def available(schema=VatsimData) -> Dict[str, Callable[[bytes], Any]]:
+    """Every decoder whose library is installed, fastest first."""
+    decoders = {}
+    for name, factory in DECODERS.items():
+        try:
+            decoders[name] = factory(schema)
+        except ImportError:
+            continue
+    return decoders
+
+
+def select(name: Optional[str] = None, schema=VatsimData) -> Tuple[str, Callable[[bytes], Any]]:
+    """Returns (name, decode) for the named backend, or for the fastest installed one."""
+    decoders = available(schema)
+    if not name:
+        return next(iter(decoders.items()))
+    if name not in DECODERS:
+        raise ValueError(f"Unknown JSON decoder {name!r}, expected one of: {', '.join(DECODERS)}")
+    if name not in decoders:
+        raise ValueError(f"The {name} JSON decoder is not installed")
+    return name, decoders[name]
+
+
+BACKEND, _decode = select()
+_, _decode_transceivers = select(BACKEND, List[TransceiverStation])
+
+
+def use(name: Optional[str] = None):
+    """Switches the feed decoder; None picks the fastest installed."""
+    global BACKEND, _decode, _decode_transceivers
+    BACKEND, _decode = select(name)
+    _, _decode_transceivers = select(BACKEND, List[TransceiverStation])
+
+
+def decode_feed(raw: bytes) -> dict:
+    """Decodes a vatsim-data.json payload."""
+    return _decode(raw)
+
+
+def decode_transceivers(raw: bytes) -> list:
+    """Decodes a transceivers-data.json payload."""
+    return _decode_transceivers(raw)
@@ -0,0 +1,94 @@
+import numpy as np
+
+PREFLIGHT, TAXI, CLIMB, CRUISE, DESCENT, ARRIVED = range(6)
+UNKNOWN = -1
+PHASE_NAMES = {
+    PREFLIGHT: "Preflight",
+    TAXI: "Taxi",
+    CLIMB: "Climb",
+    CRUISE: "Cruise",
+    DESCENT: "Descent",
+    ARRIVED: "Arrived",
+}
+
+# Below this a pilot is parked; between the two they are taxiing (or rolling out); above it they are flying
+TAXI_SPEED = 5
+AIRBORNE_SPEED = 50
+# Feet per minute either side of level flight
+VERTICAL_RATE = 300
+
+GROUND_PHASES = np.array([PREFLIGHT, TAXI])
+AIRBORNE_PHASES = np.array([CLIMB, CRUISE, DESCENT])
+
+
+def classify(groundspeed: np.ndarray, altitude: np.ndarray, previous_altitude: np.ndarray,
+             previous_phase: np.ndarray, elapsed: np.ndarray) -> np.ndarray:
+    """Assigns a phase to every pilot at once from this snapshot and the previous one.
+
+    `previous_altitude` is NaN and `previous_phase` UNKNOWN for pilots seen for the first time."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vertical_rate = np.where(elapsed > 0, (altitude - previous_altitude) / elapsed * 60, 0.0)
+    vertical_rate = np.nan_to_num(vertical_rate)
+
+    airborne = groundspeed >= AIRBORNE_SPEED
+    moving = groundspeed >= TAXI_SPEED
+    was_on_ground = np.isin(previous_phase, GROUND_PHASES)
+    # Once a flight has been airborne it stays "arrived" on the ground, including the taxi in
+    was_airborne = np.isin(previous_phase, AIRBORNE_PHASES) | (previous_phase == ARRIVED)
+
+    return np.select(
+        [
+            # The takeoff roll counts as the climb
+            airborne & ((vertical_rate > VERTICAL_RATE) | was_on_ground | (previous_phase == ARRIVED)),
+            airborne & (vertical_rate < -VERTICAL_RATE),
+            airborne,
+            was_airborne,
+            moving,
+        ],
+        [CLIMB, DESCENT, CRUISE, ARRIVED, TAXI],
+        default=PREFLIGHT,
+    ).astype(np.int8)
+
+
+class FlightPhaseTracker:
+    """Remembers each tracked pilot's altitude and phase between snapshots and reports departures and landings."""
+    def __init__(self):
+        self.phases = {}
+        self._altitudes = {}
+        self._seen_at = {}
+        self._fetched_at = None
+
+    def update(self, pilots: list, fetched_at: float) -> dict:
+        """Classifies `pilots` (the tracked ones online in this snapshot) and returns {cid: "departed" | "landed"}."""
+        if fetched_at == self._fetched_at:
+            return {} # The same snapshot again (served while the feed is down) has nothing new to classify
+        self._fetched_at = fetched_at
+        if not pilots:
+            self.phases, self._altitudes, self._seen_at = {}, {}, {}
+            return {}
+        cids = [str(pilot['cid']) for pilot in pilots]
+        count = len(cids)
+        groundspeed = np.fromiter((pilot['groundspeed'] for pilot in pilots), dtype=np.float64, count=count)
+        altitude = np.fromiter((pilot['altitude'] for pilot in pilots), dtype=np.float64, count=count)
+        previous_altitude = np.fromiter((self._altitudes.get(cid, np.nan) for cid in cids), dtype=np.float64, count=count)
+        previous_phase = np.fromiter((self.phases.get(cid, UNKNOWN) for cid in cids), dtype=np.int8, count=count)
+        elapsed = fetched_at - np.fromiter((self._seen_at.get(cid, fetched_at) for cid in cids), dtype=np.float64, count=count)
+
+        phase = classify(groundspeed, altitude, previous_altitude, previous_phase, elapsed)
+
+        # Leaving the ground again after an arrival (a new leg without reconnecting) is a departure too
+        departed = (np.isin(previous_phase, GROUND_PHASES) | (previous_phase == ARRIVED)) & np.isin(phase, AIRBORNE_PHASES)
+        landed = np.isin(previous_phase, AIRBORNE_PHASES) & (phase == ARRIVED)
+
+        # Pilots who logged off are forgotten so a reconnect starts fresh
+        self.phases = dict(zip(cids, phase.tolist()))
+        self._altitudes = dict(zip(cids, altitude.tolist()))
+        self._seen_at = dict.fromkeys(cids, fetched_at)
+
+        events = {cids[i]: "departed" for i in np.flatnonzero(departed)}
+        events.update({cids[i]: "landed" for i in np.flatnonzero(landed)})
+        return events
+
+    def phase_name(self, cid: str) -> str | None:
+        phase = self.phases.get(cid)
+        return PHASE_NAMES.get(phase) if phase is not None else None
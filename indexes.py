@@ -0,0 +1,177 @@
+import bisect
+import re
+from collections import Counter, defaultdict
+from typing import Hashable, Iterable, List, Optional, Tuple
+
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+
+class PrefixIndex:
+    """A sorted list of (key, value) pairs answering prefix queries with a binary search."""
+    def __init__(self, items: Iterable[Tuple[str, str]] = ()):
+        self._entries = sorted((key.lower(), value) for key, value in items)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: str, value: str):
+        entry = (key.lower(), value)
+        position = bisect.bisect_left(self._entries, entry)
+        if position == len(self._entries) or self._entries[position] != entry:
+            self._entries.insert(position, entry)
+
+    def remove(self, key: str, value: str):
+        entry = (key.lower(), value)
+        position = bisect.bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def search(self, prefix: str, limit: int = 25) -> List[str]:
+        """Returns up to `limit` distinct values whose key starts with `prefix`."""
+        prefix = prefix.lower()
+        position = bisect.bisect_left(self._entries, (prefix, ""))
+        results = []
+        seen = set()
+        while position < len(self._entries) and len(results) < limit:
+            key, value = self._entries[position]
+            if not key.startswith(prefix):
+                break
+            if value not in seen:
+                seen.add(value)
+                results.append(value)
+            position += 1
+        return results
+
+
+class GuildPrefixIndex:
+    """One PrefixIndex per guild, used to serve tracker autocomplete without touching the database.
+
+    Keys are counted per guild, one per tracker row: a guild can hold several rows for the same CID
+    (older databases have duplicates), and the CID stays searchable until the last of them is removed."""
+    def __init__(self):
+        self._guilds = defaultdict(PrefixIndex)
+        self._counts = Counter()
+
+    def load(self, rows: Iterable[Tuple[int, str]]):
+        """Replaces the index contents with (guild_id, key) rows, sorting each guild's keys once."""
+        self._counts = Counter(rows)
+        items = defaultdict(list)
+        for guild_id, key in self._counts:
+            items[guild_id].append((key, key))
+        self._guilds = defaultdict(PrefixIndex, {guild_id: PrefixIndex(pairs) for guild_id, pairs in items.items()})
+
+    def add(self, guild_id: int, key: str):
+        self._counts[guild_id, key] += 1
+        if self._counts[guild_id, key] == 1:
+            self._guilds[guild_id].add(key, key)
+
+    def remove(self, guild_id: int, key: str):
+        count = self._counts.get((guild_id, key), 0)
+        if count > 1:
+            self._counts[guild_id, key] = count - 1
+        elif count == 1:
+            del self._counts[guild_id, key]
+            self._guilds[guild_id].remove(key, key)
+
+    def search(self, guild_id: int, prefix: str, limit: int = 25) -> List[str]:
+        if guild_id not in self._guilds:
+            return []
+        return self._guilds[guild_id].search(prefix, limit)
+
+
+
+def trigrams(text: str) -> set:
+    """The lowercased three-character slices of each word, padded so word starts and ends count too."""
+    grams = set()
+    for word in _SEPARATORS.split(text.lower()):
+        if word:
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Fuzzy search over (key, value) pairs by the trigrams they share with the query.
+
+    Matches are ranked by how much of the query they contain, then by how little else they contain,
+    so "smith" finds every Smith and puts plain "Smith" ahead of "Smithson".
+
+    Pass the index built from the previous snapshot as `previous` and its postings are taken over
+    and patched with only the keys that came or went, rather than rebuilt. The previous index keeps
+    answering from its own keys, though it may miss ones that have since gone."""
+    def __init__(self, items: Iterable[Tuple[str, Hashable]] = (), previous: Optional["TrigramIndex"] = None):
+        # key -> its first value; the rare key with several values keeps the rest in _more.
+        # No container per key: at tens of thousands of keys the allocations alone set off the GC.
+        self._values = {}
+        self._more = {}
+        for key, value in items:
+            first = self._values.setdefault(key, value)
+            if first != value:
+                self._more.setdefault(key, set()).add(value)
+
+        if previous is None:
+            # gram -> keys containing it, key -> its trigram count, and the keys the postings currently cover
+            self._postings = defaultdict(set)
+            self._sizes = {}
+            self._indexed = set()
+        else:
+            self._postings = previous._postings
+            self._sizes = previous._sizes
+            self._indexed = previous._indexed
+        keys = self._values.keys()
+        removed = self._indexed - keys
+        added = keys - self._indexed
+        for key in removed:
+            self._sizes.pop(key, None)
+            for gram in trigrams(key):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(key)
+                    if not postings:
+                        del self._postings[gram]
+        for key in added:
+            grams = trigrams(key)
+            self._sizes[key] = len(grams)
+            for gram in grams:
+                self._postings[gram].add(key)
+        # In place, as the previous index shares these
+        self._indexed -= removed
+        self._indexed |= added
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.5) -> List[Tuple[Hashable, str, float]]:
+        """Returns up to `limit` (value, matched key, score) triples, best first, one per value.
+
+        score is the share of the query's trigrams found in the key; below `min_score` a key isn't a match."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        # Counted in C over the postings rather than per candidate key in Python
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        needed = len(grams) * min_score
+        # Grouped by how many trigrams they share, so a common word doesn't mean ranking every key
+        levels = defaultdict(list)
+        for key, count in shared.items():
+            if count >= needed and key in self._values: # Not in _values: indexed for a newer snapshot
+                levels[count].append(key)
+
+        results = []
+        seen = set()
+        for count in sorted(levels, reverse=True):
+            keys = levels[count]
+            # Among equals, the key with the fewest trigrams of its own is the closest (best Jaccard similarity)
+            keys.sort()
+            keys.sort(key=self._sizes.__getitem__)
+            for key in keys:
+                for value in (self._values[key], *self._more.get(key, ())):
+                    if value not in seen:
+                        seen.add(value)
+                        results.append((value, key, count / len(grams)))
+                if len(results) >= limit:
+                    return results[:limit]
+        return results
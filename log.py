@@ -0,0 +1,189 @@
+"""Structured logging that never blocks the event loop.
+
+A call only builds a record and puts it on a queue; a background thread formats and writes it,
+so a slow terminal, pipe or disk can't stall the loop. Context goes in as keyword fields:
+
+    log = get_logger(__name__)
+    log.info("Deleted notification message", message_id=message_id, callsign=callsign)
+
+A message repeated more than BURST times in WINDOW seconds is held back, and the next one that
+gets through says how many were suppressed.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Optional
+
+import metrics
+
+# Per message: this many records per window, then the rest are counted and dropped
+BURST = 10
+WINDOW = 60.0
+# Records waiting for the writer; past this they are dropped rather than making the caller wait
+QUEUE_SIZE = 10000
+
+LOG_RECORDS_DROPPED = metrics.Counter("bot_log_records_dropped_total", "Log records not written, by reason (rate_limited, queue_full).")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+
+class StructuredLogger:
+    """A logging.Logger that takes keyword fields, with `bind` to carry fields along."""
+    def __init__(self, logger: logging.Logger, fields: Optional[dict] = None):
+        self._logger = logger
+        self._fields = fields or {}
+
+    def bind(self, **fields) -> "StructuredLogger":
+        return StructuredLogger(self._logger, {**self._fields, **fields})
+
+    def _log(self, level: int, message: str, exc_info=None, **fields):
+        if self._logger.isEnabledFor(level):
+            # stacklevel=3 reports the line that called info()/error(), not this wrapper
+            self._logger.log(level, message, exc_info=exc_info, extra={"fields": {**self._fields, **fields}}, stacklevel=3)
+
+    def debug(self, message: str, **fields):
+        self._log(logging.DEBUG, message, **fields)
+
+    def info(self, message: str, **fields):
+        self._log(logging.INFO, message, **fields)
+
+    def warning(self, message: str, **fields):
+        self._log(logging.WARNING, message, **fields)
+
+    def error(self, message: str, **fields):
+        self._log(logging.ERROR, message, **fields)
+
+    def exception(self, message: str, **fields):
+        """Logs at ERROR with the traceback of the exception being handled."""
+        self._log(logging.ERROR, message, exc_info=True, **fields)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(logging.getLogger(name))
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets each distinct message through BURST times per WINDOW, then counts the rest.
+
+    Keyed on the message before formatting, which is why the fields stay out of the message text."""
+    def __init__(self, burst: int = BURST, window: float = WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        # (logger, level, message) -> [window start, records let through, records suppressed]
+        self._seen = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        entry = self._seen.get(key)
+        if entry is None or now - entry[0] >= self.window:
+            if len(self._seen) > 10000:
+                # Many one-off messages; drop the bookkeeping rather than let it grow
+                self._seen.clear()
+            suppressed = entry[2] if entry else 0
+            self._seen[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+        if entry[1] < self.burst:
+            entry[1] += 1
+            return True
+        entry[2] += 1
+        LOG_RECORDS_DROPPED.inc(reason="rate_limited")
+        return False
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the writer thread; only the traceback has to be rendered here,
+        # while the exception is still around
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(reason="queue_full")
+
+
+class TextFormatter(logging.Formatter):
+    """`2026-01-01 12:00:00 INFO cogs.atc_cog: Sent notification guild_id=1 rule_id=2`"""
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            line += f" (suppressed {suppressed} similar)"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log collectors."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+FORMATTERS = {"text": TextFormatter, "json": JsonFormatter}
+
+
+def setup(level: str = "INFO", fmt: str = "text", stream=None):
+    """Routes every logger, discord.py's included, through the queue to `stream` (stdout by default).
+
+    Safe to call again, e.g. when the bot is restarted in the same process; the old writer is flushed first."""
+    global _listener, _handler
+    if fmt not in FORMATTERS:
+        raise ValueError(f"Unknown log format {fmt!r}, expected one of: {', '.join(FORMATTERS)}")
+    shutdown()
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(FORMATTERS[fmt]())
+    records = queue.Queue(QUEUE_SIZE)
+    _handler = _NonBlockingQueueHandler(records)
+    _handler.addFilter(RateLimitFilter())
+    _listener = logging.handlers.QueueListener(records, writer, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(level.upper())
+
+
+def shutdown():
+    """Writes out whatever is still queued and stops the writer thread."""
+    global _listener, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown)
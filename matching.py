@@ -0,0 +1,151 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import airports
+
+MAX_TERMS = 20
+_TERM = re.compile(r"^[A-Z0-9]{2,7}\*?$")
+
+
+def parse_identifier(identifier: str) -> List[str]:
+    """Splits a rule identifier like "KJFK, klga,EG*" into normalised terms.
+
+    Raises ValueError with a user-facing message if a term is malformed."""
+    terms = []
+    for term in identifier.upper().split(","):
+        term = term.strip()
+        if not term:
+            continue
+        if not _TERM.match(term):
+            raise ValueError(f"`{term}` is not a valid identifier. Use 2-7 letters or digits, optionally ending in `*` (e.g. `KJFK`, `ZNY`, `EG*`).")
+        if term not in terms:
+            terms.append(term)
+    if not terms:
+        raise ValueError("Please provide at least one identifier.")
+    if len(terms) > MAX_TERMS:
+        raise ValueError(f"A rule can cover at most {MAX_TERMS} identifiers.")
+    return terms
+
+
+def airport_aliases(term: str) -> Optional[Set[str]]:
+    """The callsign identifiers of the airport whose 4-letter ICAO code is `term` (KJFK -> KJFK, JFK), else None.
+
+    Shorter terms are never looked up: centre and FIR prefixes such as TOR or ZNY share their letters with
+    unrelated FAA identifiers (TOR is also KTOR)."""
+    if len(term) != 4:
+        return None
+    database = airports.database()
+    airport = database.lookup(term) if database else None
+    if airport is None or airport.icao != term:
+        return None
+    return database.aliases(term)
+
+
+def exact_aliases(term: str) -> Set[str]:
+    """The callsign bases an exact term matches: an ICAO-identified airport's ICAO code and FAA identifier.
+
+    Other identifiers (ARTCC/FIR prefixes like ZNY, 3-letter codes) match themselves, and a 4-letter
+    identifier missing from the airport table still matches its 3-letter form as it always has."""
+    aliases = airport_aliases(term)
+    if aliases:
+        return aliases
+    aliases = {term}
+    if len(term) == 4:
+        aliases.add(term[1:])
+    return aliases
+
+
+def atis_prefixes(identifier: str) -> Set[str]:
+    """Callsign prefixes whose ATIS belongs to a rule: the ICAO code and FAA identifier of each ICAO-identified airport.
+
+    Other terms keep the original guess: 3-letter codes also get their K-prefixed form and K codes their 3-letter form."""
+    prefixes = set()
+    for term in identifier.upper().split(","):
+        term = term.strip()
+        if not term:
+            continue
+        if term.endswith("*"):
+            prefixes.add(term[:-1])
+            continue
+        aliases = airport_aliases(term)
+        if aliases:
+            prefixes |= aliases
+            continue
+        prefixes.add(term)
+        if len(term) == 3:
+            prefixes.add(f"K{term}")
+        elif len(term) == 4 and term.startswith("K"):
+            prefixes.add(term[1:])
+    return prefixes
+
+
+def callsign_prefixes(identifier: str) -> Tuple[str, ...]:
+    """atis_prefixes as `str.startswith` arguments: an exact code must be followed by '_', as in RuleMatcher,
+    so KJFK doesn't pick up KJFKX_TWR; a wildcard's prefix stands on its own."""
+    prefixes = set()
+    for term in identifier.upper().split(","):
+        term = term.strip()
+        if term.endswith("*"):
+            prefixes.add(term[:-1])
+        elif term:
+            prefixes.update(f"{prefix}_" for prefix in atis_prefixes(term))
+    return tuple(prefixes)
+
+
+class _Node:
+    __slots__ = ("children", "exact", "prefix")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Rules whose base identifier ends exactly here (the callsign's next character must be '_' or the end)
+        self.exact: List[int] = []
+        # Wildcard rules matching any callsign that passes through here
+        self.prefix: List[int] = []
+
+
+class RuleMatcher:
+    """Every notification rule compiled into one character trie, so a callsign is matched against all of them in one walk.
+
+    Terms are matched the way the single-airport rules always were: `KJFK` matches callsigns whose part before
+    the first '_' is KJFK or JFK; `EG*` matches any callsign starting with EG."""
+    def __init__(self, rules: Iterable[Tuple[int, str]] = ()):
+        self._root = _Node()
+        for rule_id, identifier in rules:
+            self.add(rule_id, identifier)
+
+    def _node(self, key: str) -> _Node:
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+        return node
+
+    def add(self, rule_id: int, identifier: str):
+        for term in identifier.upper().split(","):
+            term = term.strip()
+            if not term:
+                continue
+            if term.endswith("*"):
+                self._node(term[:-1]).prefix.append(rule_id)
+            else:
+                for alias in exact_aliases(term):
+                    self._node(alias).exact.append(rule_id)
+
+    def match(self, callsign: str) -> List[int]:
+        """Returns the ids of every rule the callsign matches, each once."""
+        callsign = callsign.upper()
+        base_length = callsign.find("_")
+        if base_length == -1:
+            base_length = len(callsign)
+
+        matched = []
+        node = self._root
+        matched.extend(node.prefix)
+        for depth, char in enumerate(callsign, start=1):
+            node = node.children.get(char)
+            if node is None:
+                break
+            matched.extend(node.prefix)
+            if depth == base_length:
+                matched.extend(node.exact)
+        # A rule listing both KJFK and JFK, or EG* and EGLL, would otherwise match twice
+        return list(dict.fromkeys(matched))
@@ -0,0 +1,233 @@
+import functools
+import inspect
+import math
+import re
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import aiohttp
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 240.0, 480.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        (registry or REGISTRY).register(self)
+
+    @staticmethod
+    def _key(labels: dict) -> tuple:
+        return tuple(sorted(labels.items()))
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label set."""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, registry: Optional["Registry"] = None):
+        super().__init__(name, documentation, registry)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = super().render()
+        lines.extend(f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items())
+        return lines
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, or be computed at scrape time with set_function."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, registry: Optional["Registry"] = None):
+        super().__init__(name, documentation, registry)
+        self._values = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float]):
+        self._function = function
+
+    def render(self) -> list:
+        lines = super().render()
+        if self._function is not None:
+            lines.append(f"{self.name} {_format_value(self._function())}")
+        lines.extend(f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items())
+        return lines
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple = DEFAULT_BUCKETS, registry: Optional["Registry"] = None):
+        super().__init__(name, documentation, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["counts"][index] += 1
+                break
+        series["sum"] += value
+        series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list:
+        lines = super().render()
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    """Holds every metric and renders them in the Prometheus text exposition format."""
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric: _Metric):
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- Bot metrics ---
+FEED_DOWNLOAD_SECONDS = Histogram("vatsim_feed_download_seconds", "Time to download the VATSIM data feed.")
+FEED_PARSE_SECONDS = Histogram("vatsim_feed_parse_seconds", "Time to decode the VATSIM data feed.")
+FEED_INDEX_SECONDS = Histogram("vatsim_feed_index_seconds", "Time to build a VATSIM snapshot's lookup and search indexes.")
+FEED_FAILURES = Counter("vatsim_feed_failures_total", "Failed VATSIM feed download attempts by reason.")
+FEED_CIRCUIT_OPEN = Gauge("vatsim_feed_circuit_open", "1 while fetches are paused after repeated feed failures.")
+SNAPSHOT_AGE_SECONDS = Gauge("vatsim_snapshot_age_seconds", "Seconds since the current VATSIM snapshot was fetched.")
+LOOP_CYCLE_SECONDS = Histogram("bot_loop_cycle_seconds", "Duration of one background loop cycle.", LOOP_BUCKETS)
+DB_QUERY_SECONDS = Histogram("bot_db_query_seconds", "Latency of storage backend methods.")
+DISCORD_REQUESTS = Counter("bot_discord_requests_total", "Discord REST requests by route and status.")
+DISCORD_RATE_LIMITED = Counter("bot_discord_rate_limited_total", "Discord REST 429 responses by route.")
+TRACKERS = Gauge("bot_trackers", "Configured trackers by kind.")
+NOTIFICATION_RULES = Gauge("bot_notification_rules", "Configured ATC notification rules.")
+ATIS_SUBSCRIPTIONS = Gauge("bot_atis_subscriptions", "Configured ATIS boards.")
+BOARDS = Gauge("bot_roster_boards", "Configured roster boards.")
+PURGED_ROWS = Counter("bot_purged_rows_total", "Rows deleted for departed guilds and deleted channels, by reason.")
+CACHE_REQUESTS = Counter("bot_cache_requests_total", "In-memory cache lookups by cache and result (hit/miss).")
+
+
+def timed_loop(name: str):
+    """Decorates a tasks.loop body so each cycle lands in LOOP_CYCLE_SECONDS."""
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            with LOOP_CYCLE_SECONDS.time(loop=name):
+                return await function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_methods(histogram: Histogram, label: str = "method"):
+    """Class decorator timing every public coroutine method into `histogram`."""
+    def decorator(cls):
+        for name, function in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.iscoroutinefunction(function):
+                continue
+
+            def wrap(function, name):
+                @functools.wraps(function)
+                async def wrapper(*args, **kwargs):
+                    with histogram.time(**{label: name}):
+                        return await function(*args, **kwargs)
+                return wrapper
+            setattr(cls, name, wrap(function, name))
+        return cls
+    return decorator
+
+
+_SNOWFLAKE = re.compile(r"/\d{15,21}")
+_TOKEN = re.compile(r"(/(?:webhooks|interactions)/\{id\})/[^/]+")
+
+
+def discord_route(method: str, path: str) -> str:
+    """Turns /api/v10/channels/123/messages/456 into 'PATCH /channels/{id}/messages/{id}'."""
+    path = re.sub(r"^/api/v\d+", "", path)
+    path = _TOKEN.sub(r"\1/{token}", _SNOWFLAKE.sub("/{id}", path))
+    return f"{method} {path}"
+
+
+def discord_trace_config() -> aiohttp.TraceConfig:
+    """An aiohttp trace hook for discord.py's HTTP session, counting requests and 429s by route."""
+    async def on_request_end(session, context, params):
+        route = discord_route(params.method, params.url.path)
+        DISCORD_REQUESTS.inc(route=route, status=params.response.status)
+        if params.response.status == 429:
+            DISCORD_RATE_LIMITED.inc(route=route)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+async def start_server(host: str, port: int, registry: Registry = REGISTRY) -> web.AppRunner:
+    """Serves GET /metrics on host:port and returns the runner so it can be cleaned up."""
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """Samples the Python stack of one thread at a fixed interval from a background thread.
+
+    Output uses the collapsed ("folded") format read by flamegraph.pl, speedscope and inferno:
+    one line per unique stack, frames root-first separated by ';', followed by the sample count."""
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if stack:
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write_folded(self, path: str) -> int:
+        """Writes the collected stacks and returns the total number of samples."""
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return sum(self.samples.values())
+
+
+_profile_lock = asyncio.Lock()
+
+
+def is_running() -> bool:
+    return _profile_lock.locked()
+
+
+async def profile_event_loop(seconds: float, directory: str = "profiles", interval: float = 0.005) -> tuple:
+    """Profiles the thread running the current event loop for `seconds` and writes a .folded file.
+
+    Returns (path, sample_count). Only one profile runs at a time."""
+    async with _profile_lock:
+        profiler = SamplingProfiler(threading.get_ident(), interval)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+        sample_count = await asyncio.to_thread(profiler.write_folded, path)
+        return path, sample_count
@@ -0,0 +1,33 @@
+import asyncio
+import time
+from collections import deque
+
+import discord
+
+# Discord lets a bot post about 5 messages per 5 seconds in one channel
+CHANNEL_LIMIT = 5
+CHANNEL_WINDOW = 5.0
+
+
+class PacedSender:
+    """Sends messages at most `limit` per `window` seconds per channel, waiting its turn instead of
+    tripping 429s. Each channel has its own queue, so a bulk job in one channel doesn't hold up another."""
+    def __init__(self, limit: int = CHANNEL_LIMIT, window: float = CHANNEL_WINDOW):
+        self.limit = limit
+        self.window = window
+        # Channel id -> monotonic times of its last `limit` sends, and the lock that queues its senders
+        self._sent = {}
+        self._locks = {}
+
+    async def send(self, channel: discord.abc.Messageable, **kwargs) -> discord.Message:
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            sent = self._sent.setdefault(channel.id, deque(maxlen=self.limit))
+            if len(sent) == self.limit:
+                wait = sent[0] + self.window - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            try:
+                return await channel.send(**kwargs)
+            finally:
+                sent.append(time.monotonic())
@@ -1,11 +1,48 @@
-import os
-import sys
+import argparse
+import asyncio
+import random
 import time
 
+import log
+from bot import MyBot, DISCORD_TOKEN, LOG_FORMAT, LOG_LEVEL
+
+INITIAL_BACKOFF = 5
+MAX_BACKOFF = 300
+# A run that lasted this long counts as healthy, so the next crash starts from the initial backoff again
+STABLE_UPTIME = 600
+
+logger = log.get_logger("startbot")
+
+
+async def run_once(bot: MyBot):
+    async with bot:
+        await bot.start(DISCORD_TOKEN)
+
+
+parser = argparse.ArgumentParser(description="Run the VATSIM ATC bot, restarting it if it crashes.")
+parser.add_argument("--sync", action="store_true", help="Sync slash commands with Discord even if they have not changed.")
+args = parser.parse_args()
+
+log.setup(LOG_LEVEL, LOG_FORMAT)
+backoff = INITIAL_BACKOFF
+# --sync forces one sync; once a start has got that far the stored fingerprint is current again
+force_sync = args.sync
 while True:
-    print("Starting bot...")
-    exit_code = os.system("python bot.py")
-    if exit_code == 0:
+    logger.info("Starting bot")
+    started = time.monotonic()
+    bot = MyBot(force_sync=force_sync)
+    try:
+        asyncio.run(run_once(bot))
+        break
+    except KeyboardInterrupt:
         break
-    print("Bot stopped with code", exit_code, ". Restarting in 5 seconds...")
-    time.sleep(5)
\ No newline at end of file
+    except Exception as e:
+        if time.monotonic() - started >= STABLE_UPTIME:
+            backoff = INITIAL_BACKOFF
+        # Jitter so several instances don't all hammer Discord and the feed at the same moment
+        delay = backoff * random.uniform(0.5, 1.0)
+        logger.exception("Bot stopped, restarting", delay_s=round(delay))
+        if "sync" in bot.startup_timings:
+            force_sync = False
+        time.sleep(delay)
+        backoff = min(backoff * 2, MAX_BACKOFF)
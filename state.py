@@ -0,0 +1,135 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+import discord
+
+from log import get_logger
+
+log = get_logger(__name__)
+
+STATE_DIR = "runtime_state"
+# State older than this is treated as a cold start; the world has moved on too far to trust it
+WARM_RESTART_MAX_AGE = 15 * 60
+
+
+def embed_fingerprint(content: Optional[str], embed: discord.Embed) -> str:
+    """Hashes what a tracker message would show, ignoring the "Last Updated" timestamp."""
+    payload = embed.to_dict()
+    payload.pop('timestamp', None)
+    return hashlib.sha1(json.dumps([content, payload], sort_keys=True).encode()).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+class RuntimeState:
+    """In-memory runtime state that survives restarts by being written to disk after every loop cycle.
+
+    With `directory=None` nothing is persisted, which is what the benchmarks use."""
+    def __init__(self, directory: Optional[str] = STATE_DIR):
+        self.directory = directory
+        self.tracker_fingerprints = {}
+        self.loop_cursors = {}
+        self.previously_notified = set()
+        self.saved_at = None
+        self._saved_snapshot_version = None
+        self._lock = asyncio.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def load(self, feed=None) -> bool:
+        """Restores state (and the last snapshot into `feed`) if it is recent enough. Returns True on a warm start."""
+        if not self.directory:
+            return False
+        try:
+            with open(self._path("state.json"), "rb") as f:
+                saved = json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return False
+
+        if time.time() - saved.get("saved_at", 0) > WARM_RESTART_MAX_AGE:
+            log.info("Saved runtime state is too old, starting cold")
+            return False
+
+        self.tracker_fingerprints = saved.get("tracker_fingerprints", {})
+        self.loop_cursors = saved.get("loop_cursors", {})
+        self.previously_notified = {tuple(pair) for pair in saved.get("previously_notified", [])}
+        self.saved_at = saved["saved_at"]
+
+        if feed is not None and saved.get("snapshot_fetched_at"):
+            try:
+                with open(self._path("snapshot.json"), "rb") as f:
+                    feed.restore(f.read(), saved["snapshot_fetched_at"])
+                self._saved_snapshot_version = feed.snapshot.version
+            except (FileNotFoundError, ValueError):
+                pass
+        log.info("Warm start", tracker_fingerprints=len(self.tracker_fingerprints), notified_controllers=len(self.previously_notified))
+        return True
+
+    async def save(self, feed=None):
+        """Writes state to disk off the event loop; the snapshot is only rewritten when it has changed."""
+        if not self.directory:
+            return
+        async with self._lock:
+            self.saved_at = time.time()
+            snapshot = feed.snapshot if feed is not None else None
+            payload = {
+                "saved_at": self.saved_at,
+                "tracker_fingerprints": self.tracker_fingerprints,
+                "loop_cursors": self.loop_cursors,
+                "previously_notified": sorted(self.previously_notified),
+                "snapshot_fetched_at": snapshot.fetched_at if snapshot else None,
+            }
+            state_bytes = json.dumps(payload).encode()
+            raw_snapshot = None
+            if snapshot is not None and feed.last_raw is not None and snapshot.version != self._saved_snapshot_version:
+                raw_snapshot = feed.last_raw
+                self._saved_snapshot_version = snapshot.version
+
+            def write():
+                os.makedirs(self.directory, exist_ok=True)
+                if raw_snapshot is not None:
+                    _write_atomic(self._path("snapshot.json"), raw_snapshot)
+                _write_atomic(self._path("state.json"), state_bytes)
+            await asyncio.to_thread(write)
+
+    def tracker_unchanged(self, kind: str, tracker_id: int, message_id: int, fingerprint: str) -> bool:
+        """True if the tracker's current message already shows exactly this content."""
+        return self.tracker_fingerprints.get(f"{kind}:{tracker_id}") == [message_id, fingerprint]
+
+    def remember_tracker(self, kind: str, tracker_id: int, message_id: int, fingerprint: str):
+        self.tracker_fingerprints[f"{kind}:{tracker_id}"] = [message_id, fingerprint]
+
+    async def wait_for_cursor(self, loop_name: str, interval: float):
+        """After a warm restart, waits out the rest of the interval the crashed process had already started."""
+        last_run = self.loop_cursors.get(loop_name)
+        if last_run is None:
+            return
+        remaining = interval - (time.time() - last_run)
+        if remaining > 0:
+            log.info("Resuming loop where the last process left off", loop=loop_name, delay_s=round(remaining))
+            await asyncio.sleep(remaining)
+
+
+def checkpoint(loop_name: str):
+    """Decorates a cog's tasks.loop body to record its cursor and persist runtime state after each cycle."""
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(cog, *args, **kwargs):
+            try:
+                return await function(cog, *args, **kwargs)
+            finally:
+                cog.bot.state.loop_cursors[loop_name] = time.time()
+                await cog.bot.state.save(cog.bot.vatsim)
+        return wrapper
+    return decorator
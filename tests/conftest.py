@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# The bot's modules sit at the top of the repository rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import airports
+
+# A handful of rows in the bundled CSV's format; KTOR shares its FAA code with the Toronto centre prefix
+AIRPORTS_CSV = """icao,iata,faa,name,latitude,longitude,elevation_ft
+KJFK,JFK,JFK,John F Kennedy International Airport,40.639447,-73.779317,13
+KLAX,LAX,LAX,Los Angeles International Airport,33.942536,-118.408075,125
+KTOR,TOR,TOR,Torrington Municipal Airport,42.064422,-104.152679,4207
+EGLL,LHR,,London Heathrow Airport,51.4706,-0.461941,83
+07FA,OCA,07FA,Ocean Reef Club Airport,25.324307,-80.275729,6.4
+"""
+
+
+@pytest.fixture
+def airport_table(tmp_path, monkeypatch):
+    """Loads a small airport table for the test, and unloads it afterwards."""
+    csv_path = tmp_path / "airports.csv"
+    csv_path.write_text(AIRPORTS_CSV)
+    monkeypatch.setattr(airports, "_database", None)
+    database = airports.load(str(csv_path), str(tmp_path / "airports.bin"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def no_airport_table(monkeypatch):
+    monkeypatch.setattr(airports, "_database", None)
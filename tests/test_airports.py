@@ -0,0 +1,119 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import airports
+from airports import AirportDatabase, compile_airports, distance_nm
+from cogs.airport_cog import airport_traffic
+
+
+def test_lookup_by_any_identifier(airport_table):
+    assert len(airport_table) == 5
+    assert airport_table.lookup("KJFK").name == "John F Kennedy International Airport"
+    assert airport_table.lookup(" jfk ").icao == "KJFK"
+    assert airport_table.lookup("LHR").icao == "EGLL"
+    egll = airport_table.lookup("EGLL")
+    assert (egll.iata, egll.faa, egll.elevation_ft) == ("LHR", "", 83)
+    assert egll.latitude == pytest.approx(51.4706)
+    for missing in ("ZZZZ", "", "KJFKX"):
+        assert airport_table.lookup(missing) is None
+
+
+def test_icao_codes_win_over_other_identifiers(airport_table):
+    # 07FA is both an ICAO and an FAA code; OCA is only its IATA code
+    assert airport_table.lookup("07FA").icao == "07FA"
+    assert airport_table.lookup("OCA").icao == "07FA"
+
+
+def test_normalize_and_aliases(airport_table):
+    assert airport_table.normalize("lax") == "KLAX"
+    assert airport_table.normalize(" zzz ") == "ZZZ"
+    assert airport_table.aliases("KJFK") == {"KJFK", "JFK"}
+    # Looked up by any code, but only the ICAO code and FAA identifier are callsign prefixes
+    assert airport_table.aliases("lhr") == {"EGLL"}
+    assert airport_table.aliases("OCA") == {"07FA"}
+    assert airport_table.aliases("zzzz") == {"ZZZZ"}
+    # The module-level helpers use the loaded table
+    assert airports.normalize("LHR") == "EGLL"
+    assert airports.lookup("TOR").icao == "KTOR"
+
+
+def test_helpers_without_a_table(no_airport_table):
+    assert airports.database() is None
+    assert airports.normalize(" lax ") == "LAX"
+    assert airports.lookup("LAX") is None
+
+
+def test_load_recompiles_when_the_csv_is_newer(airport_table, tmp_path):
+    csv_path, bin_path = tmp_path / "airports.csv", tmp_path / "airports.bin"
+    with open(csv_path, "a") as f:
+        f.write("EHAM,AMS,,Amsterdam Airport Schiphol,52.308601,4.76389,-11\n")
+    built = os.path.getmtime(bin_path)
+    os.utime(csv_path, (built + 10, built + 10))
+
+    database = airports.load(str(csv_path), str(bin_path))
+    try:
+        assert airports.database() is database
+        assert len(database) == 6
+        assert database.lookup("AMS").elevation_ft == -11
+    finally:
+        database.close()
+
+
+def test_load_keeps_an_up_to_date_table(airport_table, tmp_path):
+    csv_path, bin_path = tmp_path / "airports.csv", tmp_path / "airports.bin"
+    built = os.path.getmtime(bin_path)
+    os.utime(csv_path, (built - 10, built - 10))
+    database = airports.load(str(csv_path), str(bin_path))
+    try:
+        assert os.path.getmtime(bin_path) == built
+    finally:
+        database.close()
+
+
+def test_rejects_a_file_that_is_not_an_airport_table(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not an airport table"):
+        AirportDatabase(str(path))
+
+
+def test_compile_handles_many_airports(tmp_path):
+    csv_path, bin_path = tmp_path / "many.csv", tmp_path / "many.bin"
+    rows = [f"K{i:03},,,Field {i},0,0," for i in range(1000)]
+    csv_path.write_text("icao,iata,faa,name,latitude,longitude,elevation_ft\n" + "\n".join(rows) + "\n")
+    assert compile_airports(str(csv_path), str(bin_path)) == 1000
+    database = AirportDatabase(str(bin_path))
+    try:
+        assert all(database.lookup(f"K{i:03}").name == f"Field {i}" for i in range(1000))
+        assert database.lookup("K1000") is None
+    finally:
+        database.close()
+
+
+def test_distance_nm():
+    assert distance_nm(51.4706, -0.461941, 51.4706, -0.461941) == 0
+    # KJFK to EGLL is a little under 3,000 nm
+    assert distance_nm(40.639447, -73.779317, 51.4706, -0.461941) == pytest.approx(2991, abs=5)
+
+
+def test_airport_traffic_matches_whole_callsign_bases(airport_table):
+    def controller(callsign, frequency="118.700"):
+        return {"callsign": callsign, "frequency": frequency}
+
+    snapshot = SimpleNamespace(
+        controllers=[controller("KJFK_TWR"), controller("JFK_APP"), controller("JFKA_OBS"), controller("KJFKX_GND"),
+                     controller("KJFK_OBS", frequency="199.998")],
+        atis=[controller("KJFK_ATIS"), controller("KJFKX_ATIS")],
+        pilots=[
+            {"callsign": "DAL1", "flight_plan": {"departure": "KJFK", "arrival": "EGLL"}},
+            {"callsign": "BAW1", "flight_plan": {"departure": "EGLL", "arrival": "KJFK"}},
+            {"callsign": "N123", "flight_plan": None},
+        ],
+    )
+    controllers, atis_list, departures, arrivals = airport_traffic("KJFK", snapshot)
+    assert [c["callsign"] for c in controllers] == ["JFK_APP", "KJFK_TWR"]
+    assert [a["callsign"] for a in atis_list] == ["KJFK_ATIS"]
+    assert [p["callsign"] for p in departures] == ["DAL1"]
+    assert [p["callsign"] for p in arrivals] == ["BAW1"]
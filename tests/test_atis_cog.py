@@ -0,0 +1,32 @@
+import asyncio
+from types import SimpleNamespace
+
+from cogs.atis_cog import AtisCog, board_hash
+
+
+class CountingFeed:
+    def __init__(self):
+        self.fetches = 0
+
+    async def fetch(self):
+        self.fetches += 1
+        return None
+
+
+def test_board_loop_does_not_fetch_without_subscriptions():
+    feed = CountingFeed()
+    cog = SimpleNamespace(bot=SimpleNamespace(vatsim=feed), subscriptions={})
+    asyncio.run(AtisCog.update_atis_boards.coro(cog))
+    assert feed.fetches == 0
+
+    cog.subscriptions[1] = [1, 1, 10, "KJFK", None, None]
+    asyncio.run(AtisCog.update_atis_boards.coro(cog))
+    assert feed.fetches == 1
+
+
+def test_board_hash_ignores_order_and_follows_the_atis_text():
+    atis = [{"callsign": "KJFK_ATIS"}, {"callsign": "KJFK_D_ATIS"}]
+    hashes = {"KJFK_ATIS": "a", "KJFK_D_ATIS": "b"}
+    assert board_hash(atis, hashes) == board_hash(atis[::-1], hashes)
+    assert board_hash(atis, hashes) != board_hash(atis, {**hashes, "KJFK_D_ATIS": "c"})
+    assert board_hash(atis[:1], hashes) != board_hash(atis, hashes)
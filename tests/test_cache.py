@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import cache
+from cache import GuildSettingsCache, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A manual clock for the cache module; advance it with clock.now += seconds."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    entries = TTLCache(maxsize=10, ttl=30)
+    entries.set("a", 1)
+    clock.now += 29
+    assert entries.get("a") == 1
+    clock.now += 2
+    assert entries.get("a") is None
+    assert entries.get("a", "default") == "default"
+    assert len(entries) == 0
+
+
+def test_setting_again_restarts_the_ttl(clock):
+    entries = TTLCache(maxsize=10, ttl=30)
+    entries.set("a", 1)
+    clock.now += 20
+    entries.set("a", 2)
+    clock.now += 20
+    assert entries.get("a") == 2
+
+
+def test_least_recently_used_is_evicted(clock):
+    entries = TTLCache(maxsize=2, ttl=30)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a") # Now b is the least recently used
+    entries.set("c", 3)
+    assert entries.get("b") is None
+    assert entries.get("a") == 1
+    assert entries.get("c") == 3
+    assert len(entries) == 2
+
+
+def test_cached_none_is_a_hit(clock):
+    entries = TTLCache()
+    entries.set("a", None)
+    missing = object()
+    assert entries.get("a", missing) is None
+
+
+def test_invalidate_and_clear(clock):
+    entries = TTLCache()
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.invalidate("a")
+    entries.invalidate("missing") # Ignored
+    assert entries.get("a") is None
+    assert entries.get("b") == 2
+    entries.clear()
+    assert len(entries) == 0
+
+
+class CountingStorage:
+    def __init__(self):
+        self.roles = {}
+        self.reads = 0
+
+    async def get_management_role(self, guild_id):
+        self.reads += 1
+        return self.roles.get(guild_id)
+
+    async def set_management_role(self, guild_id, role_id):
+        self.roles[guild_id] = role_id
+
+
+def test_guild_settings_read_through_and_invalidate_on_write(clock):
+    storage = CountingStorage()
+    settings = GuildSettingsCache(storage, ttl=60)
+
+    async def scenario():
+        assert await settings.get_management_role(1) is None
+        assert await settings.get_management_role(1) is None
+        assert storage.reads == 1 # A guild without a role is cached too
+
+        await settings.set_management_role(1, 42)
+        assert await settings.get_management_role(1) == 42
+        assert storage.reads == 2
+
+        clock.now += 61
+        assert await settings.get_management_role(1) == 42
+        assert storage.reads == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,177 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import database
+from database import MIGRATIONS, DatabaseManager
+
+# The schema as it was before migrations existed: tables only, user_version 0
+BASELINE_SCHEMA = """
+CREATE TABLE notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    airport_icao TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    role_id INTEGER,
+    delete_on_offline BOOLEAN DEFAULT FALSE NOT NULL
+);
+CREATE TABLE permissions (
+    guild_id INTEGER PRIMARY KEY,
+    role_id INTEGER NOT NULL
+);
+CREATE TABLE flight_trackers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER,
+    vatsim_cid TEXT NOT NULL,
+    delete_on_offline BOOLEAN DEFAULT FALSE NOT NULL,
+    role_id INTEGER,
+    ping_sent BOOLEAN NOT NULL DEFAULT 0
+);
+CREATE TABLE controller_trackers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER,
+    vatsim_cid TEXT NOT NULL,
+    delete_on_offline BOOLEAN DEFAULT FALSE NOT NULL,
+    role_id INTEGER
+);
+CREATE TABLE active_notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rule_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    callsign TEXT NOT NULL UNIQUE,
+    FOREIGN KEY (rule_id) REFERENCES notifications(id) ON DELETE CASCADE
+);
+INSERT INTO notifications (guild_id, airport_icao, channel_id, role_id, delete_on_offline) VALUES (1, 'KJFK', 10, NULL, 0);
+INSERT INTO flight_trackers (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id, ping_sent) VALUES (1, 10, 100, '1234567', 1, NULL, 1);
+INSERT INTO controller_trackers (guild_id, channel_id, message_id, vatsim_cid, delete_on_offline, role_id) VALUES (1, 10, 101, '7654321', 0, NULL);
+"""
+
+
+def migrate(path: str):
+    async def setup():
+        manager = DatabaseManager(str(path))
+        try:
+            await manager.setup()
+        finally:
+            await manager.close()
+    asyncio.run(setup())
+
+
+def inspect(path: str) -> tuple:
+    """Returns (user_version, table names, index names, {table: column names})."""
+    with sqlite3.connect(path) as db:
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        tables = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")}
+        columns = {table: {row[1] for row in db.execute(f"PRAGMA table_info({table})")} for table in tables}
+    return version, tables, indexes, columns
+
+
+def test_fresh_database_gets_every_migration(tmp_path):
+    path = tmp_path / "fresh.db"
+    migrate(path)
+    version, tables, indexes, columns = inspect(path)
+    assert version == len(MIGRATIONS)
+    assert {"notifications", "permissions", "flight_trackers", "controller_trackers", "active_notifications",
+            "atis_subscriptions", "boards", "board_members"} <= tables
+    assert {"idx_notifications_guild", "idx_flight_trackers_guild_cid", "idx_boards_guild_name"} <= indexes
+    assert "ping_sent" in columns["flight_trackers"]
+    assert "ping_sent" in columns["controller_trackers"]
+
+
+def test_baseline_database_is_upgraded_in_place(tmp_path):
+    path = tmp_path / "baseline.db"
+    with sqlite3.connect(path) as db:
+        db.executescript(BASELINE_SCHEMA)
+
+    migrate(path)
+    version, tables, indexes, columns = inspect(path)
+    assert version == len(MIGRATIONS)
+    assert {"atis_subscriptions", "boards", "board_members"} <= tables
+    assert "idx_notifications_airport" in indexes
+    # Present already on one table and missing on the other; both end up with it
+    assert "ping_sent" in columns["flight_trackers"]
+    assert "ping_sent" in columns["controller_trackers"]
+
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT airport_icao FROM notifications").fetchall() == [("KJFK",)]
+        assert db.execute("SELECT vatsim_cid, ping_sent FROM flight_trackers").fetchall() == [("1234567", 1)]
+        assert db.execute("SELECT vatsim_cid, ping_sent FROM controller_trackers").fetchall() == [("7654321", 0)]
+
+
+def test_migrating_twice_changes_nothing(tmp_path):
+    path = tmp_path / "twice.db"
+    migrate(path)
+    first = inspect(path)
+    migrate(path)
+    assert inspect(path) == first
+
+
+def test_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    path = tmp_path / "failed.db"
+    migrate(path)
+
+    async def broken(db):
+        """Insert a row, then fail"""
+        await db.execute("INSERT INTO permissions (guild_id, role_id) VALUES (1, 2)")
+        raise RuntimeError("migration failed")
+
+    monkeypatch.setattr(database, "MIGRATIONS", MIGRATIONS + [broken])
+    with pytest.raises(RuntimeError):
+        migrate(path)
+
+    version, _, _, _ = inspect(path)
+    assert version == len(MIGRATIONS)
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT COUNT(*) FROM permissions").fetchone()[0] == 0
+
+
+def run_with_database(path, scenario):
+    async def run():
+        manager = DatabaseManager(str(path))
+        await manager.setup()
+        try:
+            return await scenario(manager)
+        finally:
+            await manager.close()
+    return asyncio.run(run())
+
+
+def test_overlapping_imports_add_each_cid_once(tmp_path):
+    async def scenario(manager):
+        first = [(10, str(cid), False, None) for cid in range(1000, 1600)]
+        second = [(20, str(cid), False, None) for cid in range(1300, 1900)]
+        results = await asyncio.gather(manager.add_flight_trackers(1, first), manager.add_flight_trackers(1, second))
+        return results, await manager.get_all_flight_trackers()
+
+    (first_ids, second_ids), trackers = run_with_database(tmp_path / "imports.db", scenario)
+    assert not first_ids.keys() & second_ids.keys()
+    assert first_ids.keys() | second_ids.keys() == {str(cid) for cid in range(1000, 1900)}
+    # The ids handed back are the rows that were actually written
+    assert {row[4]: row[0] for row in trackers} == {**first_ids, **second_ids}
+
+
+def test_tracked_cids_are_looked_up_in_chunks(tmp_path):
+    async def scenario(manager):
+        await manager.add_flight_trackers(1, [(10, str(cid), False, None) for cid in range(0, 1200, 2)])
+        return await manager.get_tracked_flight_cids(1, (str(cid) for cid in range(1200)))
+
+    assert run_with_database(tmp_path / "lookup.db", scenario) == {str(cid) for cid in range(0, 1200, 2)}
+
+
+def test_concurrent_purges_each_delete_their_own_rows(tmp_path):
+    async def scenario(manager):
+        for guild_id in (1, 2, 3):
+            await manager.add_flight_trackers(guild_id, [(guild_id * 10, str(cid), False, None) for cid in range(50)])
+        deleted = await asyncio.gather(manager.purge(guild_ids=[1]), manager.purge(channel_ids=[20]))
+        return deleted, await manager.get_all_flight_trackers()
+
+    deleted, trackers = run_with_database(tmp_path / "purge.db", scenario)
+    assert deleted == [50, 50]
+    assert {row[1] for row in trackers} == {3}
@@ -0,0 +1,144 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from flight_phase import ARRIVED, CLIMB, CRUISE, DESCENT, PREFLIGHT, TAXI, UNKNOWN, FlightPhaseTracker, classify
+from cogs.flight_tracker_cog import FlightTrackerCog
+
+NEW = np.nan # No previous altitude: the pilot wasn't in the last snapshot
+
+# (previous phase, groundspeed, altitude, previous altitude, expected phase), one snapshot a minute apart
+TRANSITIONS = [
+    # First sighting: no vertical rate to go on
+    (UNKNOWN, 0, 100, NEW, PREFLIGHT),
+    (UNKNOWN, 15, 100, NEW, TAXI),
+    (UNKNOWN, 450, 35000, NEW, CRUISE),
+    (UNKNOWN, 250, 8000, NEW, CRUISE),
+    # On the ground
+    (PREFLIGHT, 0, 100, 100, PREFLIGHT),
+    (PREFLIGHT, 15, 100, 100, TAXI),
+    (TAXI, 15, 100, 100, TAXI),
+    (TAXI, 2, 100, 100, PREFLIGHT),
+    # The takeoff roll counts as the climb even before the altitude moves
+    (TAXI, 140, 100, 100, CLIMB),
+    (PREFLIGHT, 140, 100, 100, CLIMB),
+    # In the air
+    (CLIMB, 300, 12000, 10000, CLIMB),
+    (CLIMB, 450, 35000, 35000, CRUISE),
+    (CRUISE, 450, 35100, 35000, CRUISE), # Within VERTICAL_RATE of level
+    (CRUISE, 450, 37000, 35000, CLIMB), # Step climb
+    (CRUISE, 400, 33000, 35000, DESCENT),
+    (DESCENT, 250, 8000, 10000, DESCENT),
+    (DESCENT, 180, 3000, 3000, CRUISE), # Level off on the approach
+    # Touchdown, the roll-out and the taxi in all stay arrived
+    (DESCENT, 40, 100, 400, ARRIVED),
+    (CRUISE, 20, 100, 100, ARRIVED),
+    (ARRIVED, 20, 100, 100, ARRIVED),
+    (ARRIVED, 0, 100, 100, ARRIVED),
+    # A new leg without reconnecting: the takeoff roll is a climb again
+    (ARRIVED, 140, 100, 100, CLIMB),
+]
+
+
+@pytest.mark.parametrize("previous_phase, groundspeed, altitude, previous_altitude, expected", TRANSITIONS)
+def test_classify(previous_phase, groundspeed, altitude, previous_altitude, expected):
+    phase = classify(np.array([groundspeed], dtype=np.float64), np.array([altitude], dtype=np.float64),
+                     np.array([previous_altitude], dtype=np.float64), np.array([previous_phase], dtype=np.int8),
+                     np.array([0.0 if np.isnan(previous_altitude) else 60.0]))
+    assert phase.tolist() == [expected]
+
+
+def test_classify_is_vectorised():
+    previous_phase, groundspeed, altitude, previous_altitude, expected = map(list, zip(*TRANSITIONS))
+    elapsed = [0.0 if np.isnan(value) else 60.0 for value in previous_altitude]
+    phase = classify(np.array(groundspeed, dtype=np.float64), np.array(altitude, dtype=np.float64),
+                     np.array(previous_altitude, dtype=np.float64), np.array(previous_phase, dtype=np.int8),
+                     np.array(elapsed))
+    assert phase.tolist() == expected
+
+
+def pilot(cid, groundspeed, altitude, flight_plan=None):
+    # Pilots without a flight plan come through the feed with flight_plan set to null
+    return {"cid": cid, "callsign": f"TST{cid}", "groundspeed": groundspeed, "altitude": altitude, "flight_plan": flight_plan}
+
+
+def fly(tracker, *legs):
+    """Feeds (groundspeed, altitude) snapshots for pilot 1, a minute apart; returns the phase name and events of each."""
+    results = []
+    for minute, (groundspeed, altitude) in enumerate(legs):
+        events = tracker.update([pilot(1, groundspeed, altitude)], minute * 60.0)
+        results.append((tracker.phase_name("1"), events.get("1")))
+    return results
+
+
+def test_tracker_reports_a_departure_and_a_landing():
+    tracker = FlightPhaseTracker()
+    assert fly(tracker, (0, 100), (15, 100), (150, 1500), (450, 35000), (300, 20000), (30, 100), (10, 100)) == [
+        ("Preflight", None),
+        ("Taxi", None),
+        ("Climb", "departed"),
+        ("Climb", None),
+        ("Descent", None),
+        ("Arrived", "landed"),
+        ("Arrived", None),
+    ]
+
+
+def test_tracker_rearms_departures_after_arriving():
+    tracker = FlightPhaseTracker()
+    results = fly(tracker, (15, 100), (150, 1500), (30, 100), (0, 100), (150, 1500), (30, 100))
+    assert [event for _, event in results] == [None, "departed", "landed", None, "departed", "landed"]
+
+
+def test_tracker_does_not_report_pilots_first_seen_in_the_air():
+    tracker = FlightPhaseTracker()
+    assert fly(tracker, (450, 35000), (450, 35000)) == [("Cruise", None), ("Cruise", None)]
+
+
+def test_tracker_ignores_a_repeated_snapshot():
+    tracker = FlightPhaseTracker()
+    tracker.update([pilot(1, 15, 100)], 0.0)
+    assert tracker.update([pilot(1, 150, 1500)], 60.0) == {"1": "departed"}
+    assert tracker.update([pilot(1, 150, 1500)], 60.0) == {}
+
+
+def test_tracker_forgets_pilots_who_log_off():
+    tracker = FlightPhaseTracker()
+    tracker.update([pilot(1, 15, 100), pilot(2, 15, 100)], 0.0)
+    tracker.update([pilot(2, 15, 100)], 60.0)
+    assert tracker.phase_name("1") is None
+    # Back online in the air: a fresh start, not a departure
+    assert tracker.update([pilot(1, 450, 35000), pilot(2, 150, 1500)], 120.0) == {"2": "departed"}
+    tracker.update([], 180.0)
+    assert tracker.phases == {}
+
+
+class Channel:
+    id = 10
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+def alert(pilot_data, event):
+    cog = SimpleNamespace(bot=SimpleNamespace(get_guild=lambda guild_id: None))
+    channel = Channel()
+    asyncio.run(FlightTrackerCog.send_phase_alert(cog, channel, 1, None, pilot_data, event))
+    return channel.sent
+
+
+@pytest.mark.parametrize("flight_plan", [None, {}, {"departure": "", "arrival": ""}])
+def test_phase_alerts_without_a_flight_plan(flight_plan):
+    assert alert(pilot(1, 150, 1500, flight_plan), "departed") == ["🛫 **TST1** has departed."]
+    assert alert(pilot(1, 30, 100, flight_plan), "landed") == ["🛬 **TST1** has landed."]
+
+
+def test_phase_alerts_name_the_airports():
+    flight_plan = {"departure": "KJFK", "arrival": "EGLL"}
+    assert alert(pilot(1, 150, 1500, flight_plan), "departed") == ["🛫 **TST1** has departed KJFK for EGLL."]
+    assert alert(pilot(1, 30, 100, flight_plan), "landed") == ["🛬 **TST1** has landed at EGLL."]
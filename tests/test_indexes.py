@@ -0,0 +1,121 @@
+from indexes import GuildPrefixIndex, PrefixIndex, TrigramIndex, trigrams
+
+
+def test_prefix_search_is_case_insensitive_and_sorted():
+    index = PrefixIndex([("KLAX", "KLAX"), ("KLGA", "KLGA"), ("EGLL", "EGLL"), ("klas", "KLAS")])
+    assert index.search("kl") == ["KLAS", "KLAX", "KLGA"]
+    assert index.search("EG") == ["EGLL"]
+    assert index.search("X") == []
+
+
+def test_prefix_search_returns_each_value_once():
+    # A pilot is indexed by callsign, CID and each name; several keys can point at the same value
+    index = PrefixIndex([("DAL12", "1"), ("dave", "1"), ("davis", "1"), ("dan", "2")])
+    assert index.search("da") == ["1", "2"]
+
+
+def test_prefix_search_respects_limit():
+    index = PrefixIndex((f"K{i:03}", f"K{i:03}") for i in range(100))
+    assert index.search("K", limit=5) == ["K000", "K001", "K002", "K003", "K004"]
+
+
+def test_empty_prefix_matches_everything():
+    index = PrefixIndex([("b", "b"), ("a", "a")])
+    assert index.search("") == ["a", "b"]
+
+
+def test_add_and_remove_keep_the_index_sorted():
+    index = PrefixIndex([("KJFK", "KJFK")])
+    index.add("KJFA", "KJFA")
+    index.add("KJFK", "KJFK") # Already there; not duplicated
+    assert len(index) == 2
+    assert index.search("KJF") == ["KJFA", "KJFK"]
+
+    index.remove("kjfk", "KJFK")
+    index.remove("KSFO", "KSFO") # Not there; ignored
+    assert index.search("KJF") == ["KJFA"]
+
+
+def test_guild_index_keeps_guilds_apart():
+    index = GuildPrefixIndex()
+    index.load([(1, "1234567"), (1, "1234999"), (2, "1234000")])
+    assert index.search(1, "1234") == ["1234567", "1234999"]
+    assert index.search(2, "1234") == ["1234000"]
+    assert index.search(3, "1234") == []
+
+
+def test_guild_index_add_and_remove():
+    index = GuildPrefixIndex()
+    index.add(1, "1111")
+    index.add(1, "1112")
+    index.add(2, "1113")
+    index.remove(1, "1111")
+    index.remove(3, "1111") # Unknown guild; ignored
+    assert index.search(1, "11") == ["1112"]
+    assert index.search(2, "11") == ["1113"]
+
+
+def test_guild_index_keeps_a_key_until_its_last_row_is_removed():
+    index = GuildPrefixIndex()
+    # Two tracker rows for the same CID, as older databases can have
+    index.load([(1, "1111"), (1, "1111"), (1, "2222")])
+    assert index.search(1, "") == ["1111", "2222"]
+    index.remove(1, "1111")
+    assert index.search(1, "") == ["1111", "2222"]
+    index.remove(1, "1111")
+    assert index.search(1, "") == ["2222"]
+    index.remove(1, "1111") # Already gone; ignored
+    index.add(1, "1111")
+    assert index.search(1, "") == ["1111", "2222"]
+
+    index.add(1, "2222")
+    index.remove(1, "2222")
+    assert index.search(1, "2") == ["2222"]
+
+
+def test_guild_index_load_replaces_contents():
+    index = GuildPrefixIndex()
+    index.add(1, "1111")
+    index.load([(2, "2222")])
+    assert index.search(1, "") == []
+    assert index.search(2, "") == ["2222"]
+
+
+def test_trigrams_pad_each_word():
+    assert trigrams("Ab") == {"  a", " ab", "ab "}
+    assert trigrams("AB-c") == trigrams("ab c") == {"  a", " ab", "ab ", "  c", " c "}
+    assert trigrams(" - ") == set()
+
+
+def test_trigram_search_ranks_the_closest_key_first():
+    index = TrigramIndex([("John Smithson", "1"), ("John Smith", "2"), ("Jane Doe", "3")])
+    assert [value for value, _, _ in index.search("smith")] == ["2", "1"]
+    assert index.search("smith")[0] == ("2", "John Smith", 1.0)
+    assert index.search("zzz") == []
+
+
+def test_trigram_search_returns_every_value_of_a_key_once():
+    index = TrigramIndex([("Smith", "1"), ("Smith", "2"), ("Smith", "1")])
+    assert sorted(value for value, _, _ in index.search("smith")) == ["1", "2"]
+    assert index.search("smith", limit=1) == [("1", "Smith", 1.0)]
+
+
+def test_trigram_index_reuses_the_previous_postings():
+    first = TrigramIndex([("John Smith", "1"), ("Jane Doe", "2"), ("Jim Beam", "3")])
+    second = TrigramIndex([("John Smith", "1"), ("Jim Beam", "3"), ("Jane Dough", "4")], previous=first)
+    assert second._postings is first._postings
+
+    fresh = TrigramIndex([("John Smith", "1"), ("Jim Beam", "3"), ("Jane Dough", "4")])
+    for query in ("smith", "jane", "doe", "dough", "beam", "j"):
+        assert second.search(query) == fresh.search(query)
+    assert [value for value, _, _ in second.search("dough")] == ["4"]
+    assert second.search("doe", min_score=1.0) == []
+    assert dict(second._postings) == dict(fresh._postings)
+
+
+def test_previous_trigram_index_only_answers_with_its_own_keys():
+    first = TrigramIndex([("John Smith", "1"), ("Jane Doe", "2")])
+    TrigramIndex([("John Smith", "1"), ("Jane Dough", "4")], previous=first)
+    # Jane Dough is in the shared postings now, but was never one of first's keys
+    assert [value for value, _, _ in first.search("dough")] == []
+    assert [value for value, _, _ in first.search("smith")] == ["1"]
@@ -0,0 +1,120 @@
+import pytest
+
+import airports
+from matching import MAX_TERMS, RuleMatcher, atis_prefixes, callsign_prefixes, exact_aliases, parse_identifier
+
+
+def test_parse_identifier_normalises_terms():
+    assert parse_identifier(" kjfk, KLGA ,eg*, KJFK,") == ["KJFK", "KLGA", "EG*"]
+
+
+@pytest.mark.parametrize("identifier", ["K-JFK", "A", "ABCDEFGH", "EG**", "*", "KJ FK", "E*G"])
+def test_parse_identifier_rejects_malformed_terms(identifier):
+    with pytest.raises(ValueError, match="not a valid identifier"):
+        parse_identifier(identifier)
+
+
+def test_parse_identifier_needs_a_term():
+    with pytest.raises(ValueError, match="at least one"):
+        parse_identifier(" , ,")
+
+
+def test_parse_identifier_limits_the_number_of_terms():
+    parse_identifier(",".join(f"K{i:03}" for i in range(MAX_TERMS)))
+    with pytest.raises(ValueError, match=f"at most {MAX_TERMS}"):
+        parse_identifier(",".join(f"K{i:03}" for i in range(MAX_TERMS + 1)))
+
+
+def test_exact_term_matches_the_callsign_base(no_airport_table):
+    matcher = RuleMatcher([(1, "KJFK"), (2, "ZNY")])
+    assert matcher.match("KJFK_TWR") == [1]
+    assert matcher.match("kjfk_gnd") == [1]
+    # Without an airport table a 4-letter term still matches its 3-letter form
+    assert matcher.match("JFK_APP") == [1]
+    assert matcher.match("ZNY_CTR") == [2]
+    assert matcher.match("ZNY") == [2]
+    # The whole base has to match, not just start the same way
+    assert matcher.match("KJFKX_TWR") == []
+    assert matcher.match("KJF_TWR") == []
+    assert matcher.match("ZNYA_CTR") == []
+
+
+def test_wildcard_matches_any_callsign_with_the_prefix(no_airport_table):
+    matcher = RuleMatcher([(1, "EG*")])
+    assert matcher.match("EGLL_TWR") == [1]
+    assert matcher.match("EGTT_CTR") == [1]
+    assert matcher.match("EG_CTR") == [1]
+    assert matcher.match("EHAM_TWR") == []
+
+
+def test_one_rule_with_several_terms(no_airport_table):
+    matcher = RuleMatcher([(1, "KJFK, KLGA, EG*")])
+    assert matcher.match("LGA_DEL") == [1]
+    assert matcher.match("EGKK_APP") == [1]
+
+
+def test_each_matching_rule_is_returned_once(no_airport_table):
+    matcher = RuleMatcher([(1, "KJFK,JFK"), (2, "K*"), (3, "EGLL"), (4, "EG*,EGLL")])
+    assert sorted(matcher.match("KJFK_TWR")) == [1, 2]
+    assert sorted(matcher.match("EGLL_TWR")) == [3, 4]
+
+
+def test_icao_terms_match_the_icao_code_and_faa_identifier(airport_table):
+    matcher = RuleMatcher([(1, "EGLL"), (2, "KJFK")])
+    assert matcher.match("EGLL_TWR") == [1]
+    assert matcher.match("JFK_APP") == [2]
+    # IATA codes aren't callsign prefixes
+    assert matcher.match("LHR_TWR") == []
+    assert exact_aliases("EGLL") == {"EGLL"}
+
+
+def test_three_letter_terms_stay_literal(airport_table):
+    # TOR is the Toronto centre prefix as well as the FAA code of KTOR; it mustn't pick up KTOR
+    matcher = RuleMatcher([(1, "TOR"), (2, "LAX")])
+    assert matcher.match("TOR_CTR") == [1]
+    assert matcher.match("KTOR_TWR") == []
+    assert matcher.match("KLAX_TWR") == []
+    assert exact_aliases("TOR") == {"TOR"}
+
+
+def test_four_letter_terms_use_the_table_when_they_can(airport_table):
+    assert exact_aliases("KTOR") == {"KTOR", "TOR"}
+    assert exact_aliases("07FA") == {"07FA"}
+    # Not an airport in the table: the 3-letter guess still applies
+    assert exact_aliases("ZZZZ") == {"ZZZZ", "ZZZ"}
+
+
+def test_atis_prefixes(airport_table):
+    assert atis_prefixes("EGLL") == {"EGLL"}
+    assert atis_prefixes("KJFK, EG*") == {"KJFK", "JFK", "EG"}
+    # Other terms keep the K-prefix guess the ATIS lookups have always made
+    assert atis_prefixes("LAX") == {"LAX", "KLAX"}
+
+
+def test_callsign_prefixes_need_the_separator_after_exact_codes(airport_table):
+    assert sorted(callsign_prefixes("KJFK, EG*")) == ["EG", "JFK_", "KJFK_"]
+    prefixes = callsign_prefixes("KJFK")
+    assert "JFK_ATIS".startswith(prefixes)
+    assert not "KJFKX_TWR".startswith(prefixes)
+    assert not "JFKA_OBS".startswith(prefixes)
+
+
+@pytest.fixture(scope="module")
+def bundled_airport_table(tmp_path_factory):
+    """The real bundled table, compiled once for the module."""
+    bin_path = str(tmp_path_factory.mktemp("airports") / "airports.bin")
+    airports.compile_airports(airports.CSV_PATH, bin_path)
+    database = airports.AirportDatabase(bin_path)
+    yield database
+    database.close()
+
+
+def test_iata_codes_never_match_callsigns(bundled_airport_table, monkeypatch):
+    monkeypatch.setattr(airports, "_database", bundled_airport_table)
+    # Aktau's IATA code is Scottish Control's callsign, Frankfurt's is a different prefix altogether
+    assert RuleMatcher([(1, "UATE")]).match("SCO_CTR") == []
+    assert RuleMatcher([(1, "EDDF")]).match("FRA_TWR") == []
+    assert RuleMatcher([(1, "EDDF")]).match("EDDF_TWR") == [1]
+    assert atis_prefixes("EDDF") == {"EDDF"}
+    assert atis_prefixes("UATE") == {"UATE"}
+    assert atis_prefixes("KJFK") == {"KJFK", "JFK"}
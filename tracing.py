@@ -0,0 +1,50 @@
+import time
+
+import discord
+
+import metrics
+
+COMMAND_PHASE_SECONDS = metrics.Histogram(
+    "bot_command_phase_seconds", "Time spent in each phase of a slash command, by command and shard."
+)
+COMMAND_SECONDS = metrics.Histogram("bot_command_seconds", "Total slash command latency, by command and shard.")
+
+
+class CommandTrace:
+    """Lap timer for one interaction; each lap() records the time since the previous one as a span.
+
+        trace = CommandTrace(interaction)
+        await interaction.response.defer()
+        trace.lap("defer")
+        ...
+        trace.finish()
+    """
+    def __init__(self, interaction: discord.Interaction):
+        self.command = interaction.command.qualified_name if interaction.command else "unknown"
+        self.shard = interaction.guild.shard_id if interaction.guild else 0
+        self.spans = []
+        self._started = self._last = time.perf_counter()
+
+    def _record(self, phase: str, duration: float):
+        self.spans.append((phase, duration))
+        COMMAND_PHASE_SECONDS.observe(duration, command=self.command, phase=phase, shard=self.shard)
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self._record(phase, now - self._last)
+        self._last = now
+
+    def lap_fetch(self, snapshot):
+        """Closes the fetch phase, reporting the feed decode as "parse" and the snapshot's index build as "index"."""
+        now = time.perf_counter()
+        parse = snapshot.parse_seconds if snapshot else 0.0
+        index = snapshot.index_seconds if snapshot else 0.0
+        self._record("fetch", now - self._last - parse - index)
+        self._record("parse", parse)
+        self._record("index", index)
+        self._last = now
+
+    def finish(self, phase: str = "followup"):
+        """Closes the last span and records the command's total latency."""
+        self.lap(phase)
+        COMMAND_SECONDS.observe(time.perf_counter() - self._started, command=self.command, shard=self.shard)
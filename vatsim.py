@@ -0,0 +1,321 @@
+import aiohttp
+import asyncio
+import hashlib
+import json
+import random
+import time
+from functools import cached_property
+from typing import Optional
+
+import decoding
+import metrics
+from indexes import PrefixIndex, TrigramIndex
+from log import get_logger
+
+VATSIM_DATA_URL = "https://data.vatsim.net/v3/vatsim-data.json"
+# Where every connected client's radios are, and what they are tuned to
+TRANSCEIVERS_URL = "https://data.vatsim.net/v3/transceivers-data.json"
+# The feed updates every 15 seconds; a snapshot this much older than that came from a failed fetch
+STALE_AFTER = 60
+# Connecting is quick when the feed is healthy; the body is a few MB
+FETCH_TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5, sock_read=10)
+FETCH_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+# Consecutive failed fetches that open the circuit, and how long it stays open
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60
+# How old a snapshot may be and still be served when the feed can't be reached
+MAX_STALE_AGE = 15 * 60
+# Worth retrying; anything else (404, 403) will fail the same way again
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+log = get_logger(__name__)
+
+
+class FeedUnavailable(Exception):
+    pass
+
+
+def format_frequency(value) -> Optional[str]:
+    """Normalises a frequency to the feed's "118.500" form, from MHz ("118.5", 118.5) or Hz (118500000)."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number >= 1e6:
+        number /= 1e6
+    return f"{number:.3f}"
+
+
+class Snapshot:
+    """A decoded VATSIM data feed plus lookup indexes built once per snapshot.
+
+    `transceivers` is the decoded transceivers feed, empty when it isn't being fetched. Passing the
+    `previous` snapshot lets the search index be patched from its index instead of rebuilt."""
+    def __init__(self, data: dict, transceivers: Optional[list] = None, previous: Optional["Snapshot"] = None):
+        self.data = data
+        # Only the index is kept, not the snapshot, so old snapshots aren't chained together
+        self._previous_search_index = previous.__dict__.get('search_index') if previous else None
+        self.transceivers = transceivers or []
+        self.pilots = data.get('pilots', [])
+        self.controllers = data.get('controllers', [])
+        self.atis = data.get('atis', [])
+        self.version = data.get('general', {}).get('update_timestamp')
+        self.fetched_at = time.time()
+        self.parse_seconds = 0.0
+        self.index_seconds = 0.0
+
+    @property
+    def age(self) -> float:
+        """Seconds since this snapshot was fetched."""
+        return time.time() - self.fetched_at
+
+    @property
+    def stale(self) -> bool:
+        """True when this is an old snapshot served because the feed couldn't be reached."""
+        return self.age > STALE_AFTER
+
+    @cached_property
+    def pilots_by_cid(self) -> dict:
+        return {str(p['cid']): p for p in self.pilots}
+
+    @cached_property
+    def controllers_by_cid(self) -> dict:
+        return {str(c['cid']): c for c in self.controllers}
+
+    @cached_property
+    def controllers_by_callsign(self) -> dict:
+        return {c['callsign'].upper(): c for c in self.controllers}
+
+    @cached_property
+    def callsign_index(self) -> PrefixIndex:
+        """Controller callsigns, for /lookup atc autocomplete."""
+        return PrefixIndex((c['callsign'], c['callsign']) for c in self.controllers)
+
+    @cached_property
+    def pilot_index(self) -> PrefixIndex:
+        """Pilot CIDs, full names and each name word, all pointing back at the CID."""
+        entries = []
+        for pilot in self.pilots:
+            cid = str(pilot['cid'])
+            entries.append((cid, cid))
+            name = pilot.get('name') or ""
+            entries.append((name, cid))
+            entries.extend((word, cid) for word in name.split()[1:])
+        return PrefixIndex(entries)
+
+    @cached_property
+    def pilots_by_callsign(self) -> dict:
+        return {p['callsign'].upper(): p for p in self.pilots}
+
+    @cached_property
+    def search_index(self) -> TrigramIndex:
+        """Pilot and controller names and callsigns for /lookup search, each pointing at the callsign."""
+        # A generator: one list of every entry would be enough new objects to set off a GC pass
+        entries = (
+            (key, station['callsign'].upper())
+            for station in self.pilots + self.controllers
+            for key in (station['callsign'], station.get('name'))
+            if key
+        )
+        index = TrigramIndex(entries, self._previous_search_index)
+        self._previous_search_index = None
+        return index
+
+    @cached_property
+    def airport_index(self) -> PrefixIndex:
+        """Every airport seen in a flight plan or as a controller/ATIS callsign prefix."""
+        airports = set()
+        for pilot in self.pilots:
+            flight_plan = pilot.get('flight_plan')
+            if flight_plan:
+                airports.add(flight_plan['departure'])
+                airports.add(flight_plan['arrival'])
+        for station in self.controllers + self.atis:
+            airports.add(station['callsign'].split('_')[0])
+        airports.discard("")
+        return PrefixIndex((icao, icao) for icao in airports)
+
+    @cached_property
+    def atis_hashes(self) -> dict:
+        """Callsign -> hash of the ATIS letter, frequency and text, so changes can be spotted without comparing text."""
+        return {
+            atis['callsign']: hashlib.sha1(json.dumps([atis.get('atis_code'), atis.get('frequency'), atis.get('text_atis')]).encode()).hexdigest()
+            for atis in self.atis
+        }
+
+    @cached_property
+    def transceivers_by_callsign(self) -> dict:
+        return {station['callsign'].upper(): station.get('transceivers') or [] for station in self.transceivers}
+
+    @cached_property
+    def frequency_index(self) -> dict:
+        """Frequency ("118.500") -> sorted callsigns of the controllers and ATIS on it and every client tuned to it."""
+        index = {}
+        for station in self.controllers + self.atis:
+            frequency = format_frequency(station.get('frequency'))
+            if frequency:
+                index.setdefault(frequency, set()).add(station['callsign'])
+        for station in self.transceivers:
+            for transceiver in station.get('transceivers') or []:
+                frequency = format_frequency(transceiver.get('frequency'))
+                if frequency:
+                    index.setdefault(frequency, set()).add(station['callsign'])
+        return {frequency: sorted(callsigns) for frequency, callsigns in index.items()}
+
+    @cached_property
+    def frequency_choices(self) -> PrefixIndex:
+        """Frequencies a controller or ATIS is on, for /lookup frequency autocomplete."""
+        return PrefixIndex((c['frequency'], c['frequency']) for c in self.controllers + self.atis if c.get('frequency'))
+
+    def build_indexes(self):
+        """Builds every lazy index up front so autocomplete never pays for it."""
+        self.pilots_by_cid, self.pilots_by_callsign, self.controllers_by_cid, self.controllers_by_callsign
+        self.callsign_index, self.pilot_index, self.airport_index, self.search_index
+        self.transceivers_by_callsign, self.frequency_index, self.frequency_choices
+
+
+class VatsimFeed:
+    """Fetches the VATSIM data feed and keeps the most recent snapshot in memory.
+
+    Each fetch has timeout budgets and a few jittered retries. After BREAKER_THRESHOLD failed fetches in a
+    row the circuit opens and, for BREAKER_COOLDOWN seconds, fetches don't touch the network at all.
+    Whenever the feed can't be reached, the last good snapshot is served for up to MAX_STALE_AGE
+    (check `snapshot.stale` / `snapshot.age`)."""
+    def __init__(self, url: str = VATSIM_DATA_URL, transceivers_url: Optional[str] = None):
+        self.url = url
+        # Optional; without it frequency lookups only know each controller's primary frequency
+        self.transceivers_url = transceivers_url
+        self.snapshot: Optional[Snapshot] = None
+        self.last_raw: Optional[bytes] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._failures = 0
+        self._open_until = 0.0
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def circuit_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    async def fetch(self) -> Optional[Snapshot]:
+        """Returns a fresh snapshot, or the last good one if the feed can't be reached.
+
+        Returns None only when there is nothing recent enough to fall back on. Never raises for network errors or an undecodable body.
+        Callers arriving while a download is in flight share it."""
+        if self.circuit_open:
+            return self._fallback("circuit open")
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+            self._inflight.add_done_callback(self._clear_inflight)
+        try:
+            # Shielded so one caller being cancelled doesn't cancel the download for the others
+            return await asyncio.shield(self._inflight)
+        except FeedUnavailable as e:
+            return self._fallback(str(e))
+
+    def _clear_inflight(self, task: asyncio.Task):
+        self._inflight = None
+        if not task.cancelled():
+            task.exception() # Marks it retrieved when every caller was cancelled
+
+    def _fallback(self, reason: str) -> Optional[Snapshot]:
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.age <= MAX_STALE_AGE:
+            log.warning("VATSIM feed unavailable, serving the last snapshot", reason=reason, age_s=round(snapshot.age))
+            return snapshot
+        log.error("VATSIM feed unavailable and no recent snapshot to fall back on", reason=reason)
+        return None
+
+    async def _refresh(self) -> Snapshot:
+        downloads = [self._download(self.url, "data")]
+        if self.transceivers_url:
+            downloads.append(self._download(self.transceivers_url, "transceivers"))
+        raw, *transceivers_raw = await asyncio.gather(*downloads, return_exceptions=True)
+
+        if isinstance(raw, BaseException):
+            if isinstance(raw, FeedUnavailable):
+                self._record_failure()
+            raise raw
+
+        parse_started = time.perf_counter()
+        transceivers = None
+        if transceivers_raw:
+            try:
+                if isinstance(transceivers_raw[0], BaseException):
+                    raise transceivers_raw[0]
+                transceivers = decoding.decode_transceivers(transceivers_raw[0])
+            except Exception as e:
+                # The transceivers feed is a nice-to-have; keep the last copy rather than fail the snapshot
+                log.warning("Error fetching VATSIM transceivers, keeping the previous ones", error=e)
+                transceivers = self.snapshot.transceivers if self.snapshot else None
+        try:
+            data = decoding.decode_feed(raw)
+            if not isinstance(data, dict):
+                raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+        except ValueError as e:
+            # A 200 with a truncated or garbled body is as unusable as a failed download
+            metrics.FEED_FAILURES.inc(feed="data", reason="invalid body")
+            self._record_failure()
+            raise FeedUnavailable(f"invalid body: {e}") from e
+        self._failures = 0
+        metrics.FEED_CIRCUIT_OPEN.set(0)
+
+        snapshot = Snapshot(data, transceivers, self.snapshot)
+        index_started = time.perf_counter()
+        snapshot.parse_seconds = index_started - parse_started
+        metrics.FEED_PARSE_SECONDS.observe(snapshot.parse_seconds)
+        # Timed on its own: the search and airport indexes can cost more than the decode itself
+        snapshot.build_indexes()
+        snapshot.index_seconds = time.perf_counter() - index_started
+        metrics.FEED_INDEX_SECONDS.observe(snapshot.index_seconds)
+        self.last_raw = raw
+        self.snapshot = snapshot
+        return snapshot
+
+    def _record_failure(self):
+        self._failures += 1
+        if self._failures >= BREAKER_THRESHOLD:
+            # Half-open after the cooldown: the next fetch is a single probe that closes or reopens it
+            self._open_until = time.monotonic() + BREAKER_COOLDOWN
+            metrics.FEED_CIRCUIT_OPEN.set(1)
+            log.warning("VATSIM feed keeps failing, pausing fetches", failures=self._failures, cooldown_s=BREAKER_COOLDOWN)
+
+    async def _download(self, url: str, feed: str) -> bytes:
+        """Downloads a feed body, retrying transient failures. Raises FeedUnavailable once out of attempts."""
+        if self._session is None or self._session.closed:
+            # One session for the feed's lifetime keeps the connection (and its TLS handshake) alive between fetches
+            self._session = aiohttp.ClientSession(timeout=FETCH_TIMEOUT)
+
+        for attempt in range(1, FETCH_ATTEMPTS + 1):
+            try:
+                with metrics.FEED_DOWNLOAD_SECONDS.time(feed=feed):
+                    async with self._session.get(url) as response:
+                        if response.status == 200:
+                            return await response.read()
+                        reason = f"status {response.status}"
+                        retryable = response.status in RETRY_STATUSES
+            except asyncio.TimeoutError:
+                reason, retryable = "timed out", True
+            except aiohttp.ClientError as e:
+                reason, retryable = f"{type(e).__name__}: {e}", True
+
+            metrics.FEED_FAILURES.inc(feed=feed, reason=reason.split(":")[0])
+            if not retryable or attempt == FETCH_ATTEMPTS:
+                raise FeedUnavailable(reason)
+            # Full jitter, so shards and restarts don't retry in lockstep
+            delay = random.uniform(0, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            log.warning("Error fetching VATSIM feed, retrying", feed=feed, reason=reason, attempt=attempt, delay_s=round(delay, 1))
+            await asyncio.sleep(delay)
+
+    def restore(self, raw: bytes, fetched_at: float):
+        """Reinstates a snapshot saved by a previous process, keeping its original fetch time."""
+        snapshot = Snapshot(decoding.decode_feed(raw))
+        snapshot.fetched_at = fetched_at
+        snapshot.build_indexes()
+        self.snapshot = snapshot
+        self.last_raw = raw